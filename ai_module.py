@@ -1,65 +1,168 @@
 # ai_module.py
 from transformers.models.distilbert import DistilBertTokenizer, DistilBertForSequenceClassification
-from transformers.pipelines import pipeline
 from transformers.trainer import Trainer
 from transformers.training_args import TrainingArguments
-from datasets import load_dataset # Dataset class itself is not directly used here
+from transformers.trainer_callback import TrainerCallback
+from transformers.data.data_collator import DataCollatorWithPadding
+from datasets import load_dataset, load_from_disk
 import torch
+import numpy as np
+import hashlib
 import os
+import shutil
+import time
+from inference_backends import BACKENDS, PARITY_TEXTS, TorchBackend, QuantizedBackend, OnnxBackend, check_parity
+
+
+def _memory_mb():
+    """Resident memory of this process (peak, where only that is available), or None."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        import resource  # Unix only; ru_maxrss is the peak, in KiB on Linux
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+class EpochStatsCallback(TrainerCallback):
+    """Prints and records wall time and memory use of each training epoch."""
+
+    def __init__(self):
+        self.epochs = []  # one dict per finished epoch
+        self._started = None
+
+    def on_epoch_begin(self, args, state, control, **kwargs):
+        self._started = time.perf_counter()
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        stats = {
+            "epoch": round(state.epoch or len(self.epochs) + 1, 2),
+            "seconds": time.perf_counter() - self._started,
+            "memory_mb": _memory_mb(),
+            "gpu_peak_mb": torch.cuda.max_memory_allocated() / 2**20 if torch.cuda.is_available() else None,
+        }
+        self.epochs.append(stats)
+        memory = f", {stats['memory_mb']:.0f} MB RAM" if stats["memory_mb"] is not None else ""
+        gpu = f", {stats['gpu_peak_mb']:.0f} MB GPU peak" if stats["gpu_peak_mb"] is not None else ""
+        print(f"Epoch {stats['epoch']} took {stats['seconds']:.1f}s{memory}{gpu}")
 
 
 class AIModule:
-    def __init__(self, model_path="distilbert-free-games"):
+    def __init__(self, model_path="distilbert-free-games", batch_size=32, num_threads=None, backend="torch", onnx_dir="onnx_models", classification_cache=None):
+        """
+        backend: "torch" (full precision), "quantized" (int8 dynamic quantization, CPU)
+            or "onnx" (onnxruntime, CPU). Falls back to "torch" if the backend cannot be
+            built or its outputs drift from the torch model (see backend_parity).
+        classification_cache: optional ClassificationCache consulted by classify_batch()
+            and parse_text(); results of older model versions are dropped.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend {backend!r}; expected one of {sorted(BACKENDS)}")
         self.tokenizer = DistilBertTokenizer.from_pretrained("distilbert-base-uncased")
+        self._retrain_listeners = []
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.onnx_dir = onnx_dir
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if num_threads and self.device.type == "cpu":
+            # Intra-op threads for CPU inference; by default torch uses every core
+            torch.set_num_threads(num_threads)
         print(f"Device set to use {self.device}")
 
+        self.model_path = model_path
+        self.model, self.weights_version = self._load_model(model_path)
+        self.backend_name = backend
+        self.backend_parity = None
+        self._use_backend(backend)
+        self.classification_cache = classification_cache
+        if classification_cache is not None:
+            classification_cache.invalidate(self.model_version)
+            self.on_retrain(classification_cache.invalidate)
+
+    def _load_model(self, model_path):
+        """Returns (full-precision model on self.device, weights version)."""
         # Check if a fine-tuned model exists
         config_path = os.path.join(model_path, "config.json")
         model_weights_path = os.path.join(model_path, "pytorch_model.bin")
 
         if os.path.exists(model_path) and os.path.exists(config_path) and os.path.exists(model_weights_path):
-            self.model = DistilBertForSequenceClassification.from_pretrained(model_path)
+            model = DistilBertForSequenceClassification.from_pretrained(model_path)
+            weights_version = self._fingerprint(model_path)
             print(f"Loaded fine-tuned model from {model_path}")
         else:
             print("Initializing new model from distilbert-base-uncased for sequence classification (2 labels).")
             # Initialize for binary classification (e.g., FREE vs NOT_FREE)
-            self.model = DistilBertForSequenceClassification.from_pretrained(
+            model = DistilBertForSequenceClassification.from_pretrained(
                 "distilbert-base-uncased",
                 num_labels=2, # For "is_free": 0 or 1
-                id2label={0: "NOT_FREE", 1: "FREE"}, # Makes pipeline output more readable
+                id2label={0: "NOT_FREE", 1: "FREE"}, # classify_batch reports the FREE label as is_free
                 label2id={"NOT_FREE": 0, "FREE": 1}
             )
-        self.model.to(self.device) # type: ignore
+            weights_version = "distilbert-base-uncased"
+        model.to(self.device) # type: ignore
+        return model, weights_version
 
-        # Use integer for pipeline device: -1 for CPU, 0, 1, ... for GPU
-        pipeline_device = self.device.index if self.device.type == "cuda" else -1
-        self.nlp = pipeline(
-            "text-classification", # Correct pipeline for sequence classification
-            model=self.model,
-            tokenizer=self.tokenizer,
-            device=pipeline_device,
-        )
+    def _use_backend(self, name):
+        """Builds the inference backend `name` for self.model and sets model_version to match."""
+        self.config = self.model.config  # kept when the backend replaces or drops the torch weights
+        self.model.eval()
+        reference = TorchBackend(self.model)
+        self.backend = reference
+        if name != "torch":
+            try:
+                if name == "quantized":
+                    candidate = QuantizedBackend.from_model(self.model, self.device)
+                else:
+                    onnx_path = os.path.join(self.onnx_dir, f"{self.weights_version}.onnx")
+                    candidate = OnnxBackend.from_model(self.model, onnx_path, self.num_threads)
+            except Exception as e:
+                candidate = None
+                print(f"The {name} inference backend is unavailable ({e}); using torch.")
+            if candidate is not None:
+                batches = [inputs for _, inputs in self._length_bucketed_batches(PARITY_TEXTS, self.batch_size)]
+                self.backend_parity = check_parity(reference, candidate, batches)
+                report = ", ".join(f"{key}={value:.4f}" for key, value in self.backend_parity.items() if key != "passed")
+                if self.backend_parity["passed"]:
+                    print(f"Using the {name} inference backend ({report}).")
+                    self.backend = candidate
+                    if name == "quantized":
+                        # Keep only the int8 copy in memory; train() reloads the full-precision weights
+                        self.model = candidate.model
+                    elif name == "onnx":
+                        # The ONNX session has its own copy of the weights; train() reloads them
+                        self.model = None
+                else:
+                    print(f"The {name} inference backend failed the parity check ({report}); using torch.")
+        # Cached outputs (e.g. embeddings) of one backend are not reused by another
+        self.model_version = self.weights_version if self.backend.name == "torch" else f"{self.weights_version}-{self.backend.name}"
 
-    def train(self, dataset_path):
-        dataset = load_dataset("json", data_files=dataset_path)
-        # Example dataset format:
-        # [{"text": "Free on Epic: Dead Island 2", "labels": {"title": "Dead Island 2", "url": "https://store.epicgames.com/...", "is_free": 1}}, ...]
+    @staticmethod
+    def _fingerprint(model_path):
+        """Identifies the saved weights, so caches keyed by it go stale after retraining."""
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(model_path)):
+            stat = os.stat(os.path.join(model_path, name))
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:16]
 
-        # Tokenize and prepare data
-        def preprocess_function(examples):
-            # Tokenize the texts
-            tokenized_inputs = self.tokenizer(
-                examples["text"], padding="max_length", truncation=True, max_length=512
-            )
-            # Extract the 'is_free' field from the 'labels' dictionary to be the actual training label
-            tokenized_inputs["label"] = [label_dict["is_free"] for label_dict in examples["labels"]]
-            return tokenized_inputs
+    def on_retrain(self, callback):
+        """Registers callback(new_model_version), called after train() saves a new model."""
+        self._retrain_listeners.append(callback)
 
-        # Apply preprocessing
-        # remove_columns is important to drop the original 'text' and 'labels' (dict) columns
-        dataset = dataset.map(preprocess_function, batched=True, remove_columns=["text", "labels"])
-        dataset.set_format("torch", columns=["input_ids", "attention_mask", "label"]) # type: ignore # 'label' is now the target
+    def train(self, dataset_path, max_length=512, cache_dir="tokenized_cache"):
+        if self.model is None or isinstance(self.backend, QuantizedBackend):
+            # int8 layers cannot be trained, and the ONNX backend keeps no torch model;
+            # start from the full-precision weights
+            self.model, _ = self._load_model(self.model_path)
+        dataset = self._tokenized_dataset(dataset_path, max_length, cache_dir)
 
         # Training arguments
         training_args = TrainingArguments(
@@ -71,56 +174,148 @@ class AIModule:
             weight_decay=0.01,
             logging_dir="./logs",
             logging_steps=10,
+            # Batch texts of similar length together so dynamic padding stays short
+            group_by_length=True,
+            length_column_name="length",
         )
 
+        epoch_stats = EpochStatsCallback()
         trainer = Trainer(
             model=self.model,
             args=training_args,
             train_dataset=dataset["train"], # type: ignore
             eval_dataset=dataset.get("validation") or dataset.get("test"), # type: ignore # Use test if validation is not present
+            # Pads each batch to its own longest sample instead of always to max_length
+            data_collator=DataCollatorWithPadding(self.tokenizer),
+            callbacks=[epoch_stats],
         )
         trainer.train()
         self.model.save_pretrained("distilbert-free-games")
         self.tokenizer.save_pretrained("distilbert-free-games") # Good practice to save tokenizer with model
         print("Model training complete and saved to 'distilbert-free-games'.")
+        self.model_path = "distilbert-free-games"
+        self.weights_version = self._fingerprint(self.model_path)
+        self._use_backend(self.backend_name)
+        for callback in self._retrain_listeners:
+            callback(self.model_version)
+        return epoch_stats.epochs
 
-        # Re-initialize pipeline with the newly trained model and correct device
-        pipeline_device = self.device.index if self.device.type == "cuda" else -1
-        self.nlp = pipeline("text-classification", model=self.model, tokenizer=self.tokenizer, device=pipeline_device)
+    def _tokenized_dataset(self, dataset_path, max_length, cache_dir):
+        """
+        Loads and tokenizes `dataset_path` without padding. The result is cached on disk,
+        keyed by the file contents, the tokenizer and max_length, so unchanged datasets
+        are not re-tokenized on the next run.
+        """
+        digest = hashlib.sha256()
+        with open(dataset_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(f"{self.tokenizer.name_or_path}:{len(self.tokenizer)}:{max_length}".encode())
+        cache_path = os.path.join(cache_dir, digest.hexdigest()[:16])
+        if os.path.isdir(cache_path):
+            try:
+                dataset = load_from_disk(cache_path)
+                print(f"Using tokenized dataset cached in {cache_path}")
+                return dataset
+            except Exception as e:
+                print(f"Tokenized dataset cache {cache_path} is unreadable ({e}); rebuilding it.")
+                shutil.rmtree(cache_path, ignore_errors=True)
+
+        dataset = load_dataset("json", data_files=dataset_path)
+        # Example dataset format:
+        # [{"text": "Free on Epic: Dead Island 2", "labels": {"title": "Dead Island 2", "url": "https://store.epicgames.com/...", "is_free": 1}}, ...]
+
+        # Tokenize and prepare data
+        def preprocess_function(examples):
+            # Tokenize the texts; padding is left to the data collator
+            tokenized_inputs = self.tokenizer(examples["text"], truncation=True, max_length=max_length)
+            tokenized_inputs["length"] = [len(ids) for ids in tokenized_inputs["input_ids"]]
+            # Extract the 'is_free' field from the 'labels' dictionary to be the actual training label
+            tokenized_inputs["label"] = [label_dict["is_free"] for label_dict in examples["labels"]]
+            return tokenized_inputs
+
+        # Apply preprocessing
+        # remove_columns is important to drop the original 'text' and 'labels' (dict) columns
+        dataset = dataset.map(preprocess_function, batched=True, remove_columns=["text", "labels"])
+        # Saved under a temporary name and renamed, so an interrupted save never leaves
+        # a partial directory where the cache is expected
+        tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+        dataset.save_to_disk(tmp_path)
+        try:
+            os.replace(tmp_path, cache_path)
+            print(f"Tokenized dataset cached in {cache_path}")
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)  # another run cached it first
+        return dataset
+
+    def _length_bucketed_batches(self, texts, batch_size):
+        """
+        Tokenizes `texts` once and yields (indices, padded inputs) batches of similar
+        token length, so short titles are not padded up to the longest text in the list.
+        """
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=512)
+        order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            features = [
+                {"input_ids": encoded["input_ids"][i], "attention_mask": encoded["attention_mask"][i]}
+                for i in indices
+            ]
+            inputs = self.tokenizer.pad(features, return_tensors="pt")
+            yield indices, {k: v.to(self.device) for k, v in inputs.items()}
+
+    def classify_batch(self, texts, batch_size=None):
+        """
+        Classifies each text as announcing a free game or not.
+        Returns one {"is_free": True/False, "score": probability} per text, in input order.
+        With a classification cache, only texts not seen before with this model are run.
+        """
+        if self.classification_cache is not None:
+            return self.classification_cache.get_many(
+                texts, self.model_version, lambda missing: self._classify(missing, batch_size)
+            )
+        return self._classify(texts, batch_size)
+
+    def _classify(self, texts, batch_size=None):
+        results = [None] * len(texts)
+        if not texts:
+            return results
+        id2label = self.config.id2label
+        with torch.inference_mode():
+            for indices, inputs in self._length_bucketed_batches(texts, batch_size or self.batch_size):
+                probabilities = torch.softmax(self.backend.logits(inputs).float(), dim=-1)
+                scores, labels = probabilities.max(dim=-1)
+                for i, score, label in zip(indices, scores.tolist(), labels.tolist()):
+                    results[i] = {"is_free": id2label.get(label) == "FREE", "score": score}
+        return results
+
+    def get_embeddings(self, texts, batch_size=None):
+        """
+        Embeds each text with the model's base DistilBERT encoder.
+        Returns a float32 NumPy array of shape (len(texts), hidden_size), in input order.
+        """
+        embeddings = np.zeros((len(texts), self.config.hidden_size), dtype=np.float32)
+        if not texts:
+            return embeddings
+        with torch.inference_mode():
+            for indices, inputs in self._length_bucketed_batches(texts, batch_size or self.batch_size):
+                last_hidden_states = self.backend.last_hidden_state(inputs)
+                # Mean over real tokens only; padding positions have attention_mask == 0
+                mask = inputs["attention_mask"].unsqueeze(-1).to(last_hidden_states.dtype)
+                pooled = (last_hidden_states * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                embeddings[indices] = pooled.float().cpu().numpy()
+        return embeddings
 
     def parse_text(self, text):
         """
         Classifies if the input text indicates a free game.
         Returns a dictionary like: {"is_free": True/False, "score": probability}
         """
-        results = self.nlp(text)
-        # The 'text-classification' pipeline output is typically a list of dictionaries,
-        # e.g., [{'label': 'FREE', 'score': 0.998}]
-        if results and isinstance(results, list) and len(results) > 0:
-            top_result = results[0]
-            predicted_label_str = top_result.get("label")
-            score = top_result.get("score")
-            # Check against the 'FREE' label defined in id2label/label2id
-            is_free_prediction = (predicted_label_str == "FREE")
-            return {"is_free": is_free_prediction, "score": score}
-        # Default return if classification is inconclusive or fails
-        return {"is_free": False, "score": 0.0}
+        return self.classify_batch([text])[0]
 
     def get_embedding(self, text):
         """
         Generates a text embedding using the model's base DistilBERT encoder.
-        This is useful for semantic similarity tasks.
+        This is useful for semantic similarity tasks. Returns an array of shape (1, hidden_size).
         """
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=512)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()} # Move inputs to the correct device
-
-        self.model.eval() # Ensure model is in evaluation mode for inference
-        with torch.no_grad(): # Disable gradient calculations for inference
-            # Access the base DistilBERT model (without the classification head)
-            outputs = self.model.distilbert(**inputs)
-            last_hidden_states = outputs.last_hidden_state
-
-        # Use mean pooling of the last hidden states to get a single sentence embedding
-        # This averages the embeddings of all tokens in the sequence.
-        sentence_embedding = torch.mean(last_hidden_states, dim=1)
-        return sentence_embedding.cpu().numpy() # Return as a NumPy array on CPU
+        return self.get_embeddings([text])
@@ -1,36 +1,75 @@
 # ai_recommendations.py
-from ai_module import AIModule
+from typing import TYPE_CHECKING
 from db_manager import DBManager
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from embedding_store import EmbeddingStore
+from vector_index import create_index, rank_by_mean_similarity
+
+if TYPE_CHECKING:  # ai_module imports torch; the model may be a lazy.LazyComponent
+    from ai_module import AIModule
 
 
 class AIRecommendations:
-    def __init__(self, ai_module: AIModule, db_manager: DBManager):
+    def __init__(self, ai_module: "AIModule", db_manager: DBManager, index_backend="exact", per_owned_k=None):
+        """
+        index_backend: "exact" or "ivf" (approximate, for catalogues of tens of thousands of games).
+        per_owned_k: if set, score candidates from each owned game's per_owned_k nearest
+            neighbours instead of the exact mean similarity to the whole library.
+        """
         self.ai = ai_module
         self.db = db_manager
+        self.index_backend = index_backend
+        self.per_owned_k = per_owned_k
+        self._index = None  # active games by id, kept in sync incrementally
+        self._index_model_version = None
+        self.embeddings = EmbeddingStore(db_manager)
+        self._model_hooked = False
+
+    @property
+    def ready(self):
+        """False while a lazily loaded AI model is still warming up."""
+        return getattr(self.ai, "ready", True)
+
+    def _hook_model(self):
+        # Touching the model loads it, so this waits until embeddings are first needed
+        if not self._model_hooked:
+            self._model_hooked = True
+            # Vectors of any other model version are stale, now and after every retrain
+            self.embeddings.invalidate(self.ai.model_version)
+            self.ai.on_retrain(self.embeddings.invalidate)
 
     def get_game_embeddings(self, titles):
-        embeddings = []
-        for title in titles:
-            # Use the new get_embedding method which directly returns the embedding
-            embedding = self.ai.get_embedding(title)
-            embeddings.append(embedding[0] if embedding is not None and embedding.ndim > 1 else np.zeros(self.ai.model.config.hidden_size)) # embedding is (1, hidden_size)
-        return np.array(embeddings).reshape(-1, self.ai.model.config.hidden_size) # Ensure correct shape
-
-    def recommend_games(self):
+        """Embeddings for `titles`; only titles never seen with the current model are run through it."""
+        self._hook_model()
+        return self.embeddings.get_many(titles, self.ai.model_version, self._embed_titles).reshape(
+            -1, self.ai.config.hidden_size
+        )
+
+    def _embed_titles(self, titles):
+        # One batched, length-bucketed pass instead of a forward pass per title
+        return self.ai.get_embeddings(titles)
+
+    def _candidate_index(self, active_games):
+        if self._index is None or self._index_model_version != self.ai.model_version:
+            self._index = create_index(self.index_backend, self.ai.config.hidden_size)
+            self._index_model_version = self.ai.model_version
+        active_ids = {game["id"] for game in active_games}
+        self._index.remove([id_ for id_ in self._index.ids() if id_ not in active_ids])
+        new_games = [game for game in active_games if game["id"] not in self._index]
+        if new_games:
+            self._index.add(
+                [game["id"] for game in new_games],
+                self.get_game_embeddings([game["title"] for game in new_games]),
+            )
+        return self._index
+
+    def recommend_games(self, limit=3):
         owned_games = self.db.get_games_by_status("owned")
         active_games = self.db.get_games_by_status("active")
         if not owned_games or not active_games:
             return []
 
-        owned_titles = [g[1] for g in owned_games]
-        active_titles = [g[1] for g in active_games]
-        owned_embeddings = self.get_game_embeddings(owned_titles)
-        active_embeddings = self.get_game_embeddings(active_titles)
-
-        similarities = cosine_similarity(active_embeddings, owned_embeddings)
-        top_indices = similarities.mean(axis=1).argsort()[-3:][
-            ::-1
-        ]  # Top 3 recommendations
-        return [active_games[i] for i in top_indices]
+        owned_embeddings = self.get_game_embeddings([game["title"] for game in owned_games])
+        index = self._candidate_index(active_games)
+        games_by_id = {game["id"]: game for game in active_games}
+        ranked = rank_by_mean_similarity(index, owned_embeddings, limit, self.per_owned_k)
+        return [games_by_id[id_] for id_, _ in ranked]
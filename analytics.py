@@ -9,10 +9,8 @@ class Analytics:
     def get_platform_chart(self):
         counts = self.db.get_status_counts()
         platforms = ["Epic", "Amazon Prime", "GOG", "Steam", "Ubisoft"]
-        data = [
-            len([g for g in self.db.get_games_by_status("owned") if g[0] == p])
-            for p in platforms
-        ]
+        owned_games = self.db.get_games_by_status("owned")
+        data = [len([g for g in owned_games if g[0] == p]) for p in platforms]
         return {
             "type": "bar",
             "data": {
@@ -0,0 +1,131 @@
+# benchmarks/parse_bench.py
+"""
+Compares parse time and peak memory of the store page parsers (GameScraper.parse_*)
+across html_parser backends (html.parser, and lxml when installed), with and without
+SoupStrainer-scoped parsing.
+
+    python benchmarks/parse_bench.py [--fixtures benchmarks/fixtures] [--repeat 5]
+
+Pages are read from <fixtures>/<store>.html (save a real store page there, e.g. from
+the browser's "Save page as"). Stores without a fixture get a synthetic page: `--cards`
+game cards buried in `--noise` unrelated blocks, roughly the shape of a store listing.
+Every configuration must find the same games as unscoped html.parser.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import html_parser  # noqa: E402
+from scraper import GameScraper  # noqa: E402
+
+PARSERS = {
+    "amazon_prime": GameScraper.parse_amazon_prime,
+    "gog": GameScraper.parse_gog_games,
+    "ubisoft": GameScraper.parse_ubisoft_games,
+    "itch_io": GameScraper.parse_itch_io_games,
+    "indiegala": GameScraper.parse_indiegala_games,
+    "humble_bundle": GameScraper.parse_humble_bundle_games,
+}
+
+# One matching game card per store, formatted with the card number
+CARDS = {
+    "amazon_prime": '<div data-a-target="offer-card"><h3>Game {i}</h3><a href="/offer/{i}">Claim</a><p>Free with Prime</p></div>',
+    "gog": '<product-tile><a class="product-tile__content" href="/game/{i}"><product-tile-title><span translate>Game {i}</span></product-tile-title>'
+           '<span price-value="0.00">Free</span></a></product-tile>',
+    "ubisoft": '<a class="product-slot__main-link" href="/game/{i}"><div class="game-title">Game {i}</div><span>Play for free</span></a>',
+    "itch_io": '<div class="game_cell"><div class="game_title"><a href="/game/{i}">Game {i}</a></div><div class="price_value">Free</div></div>',
+    "indiegala": '<div class="product-row-info"><h3 class="product-title-big"><a href="/game/{i}">Game {i}</a></h3><span>Free</span></div>',
+    "humble_bundle": '<a href="/store/game-{i}"><div class="entity-details"><span class="entity-title">Game {i}</span></div></a>',
+}
+
+NOISE = (
+    '<div class="nav-item"><ul><li><a href="/section/{i}">Section {i}</a></li><li><span class="badge">New</span></li></ul>'
+    '<img src="/img/{i}.png" alt="banner {i}"><p class="blurb">Lorem ipsum dolor sit amet, consectetur adipiscing elit, '
+    'sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p></div>'
+)
+
+
+def synthetic_page(store, cards, noise):
+    blocks = [NOISE.format(i=i) for i in range(noise)]
+    step = max(1, noise // max(1, cards))
+    for i in range(cards):
+        blocks.insert(min(len(blocks), i * (step + 1)), CARDS[store].format(i=i))
+    script = "<script>window.__STATE__ = {%s};</script>" % ",".join(f'"k{i}": {i}' for i in range(noise))
+    return f"<!DOCTYPE html><html><head><title>{store}</title>{script}</head><body><main>{''.join(blocks)}</main></body></html>"
+
+
+def load_pages(fixtures, cards, noise):
+    pages = {}
+    for store in PARSERS:
+        path = os.path.join(fixtures, f"{store}.html")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages[store] = (f.read(), "fixture")
+        else:
+            pages[store] = (synthetic_page(store, cards, noise), "synthetic")
+    return pages
+
+
+def available_backends():
+    backends = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    return backends
+
+
+def measure(parse, html, repeat):
+    """Returns (games, ms per parse, peak MiB allocated during one parse)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        games = parse(html)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return games, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+    parser.add_argument("--cards", type=int, default=60)
+    parser.add_argument("--noise", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures, args.cards, args.noise)
+    configs = [(backend, scoped) for backend in available_backends() for scoped in (False, True)]
+    original = html_parser.BACKEND, html_parser.SCOPED_PARSING
+    failures = 0
+    print(f"{'store':<14} {'source':<9} {'KiB':>6}  {'backend':<11} {'scoped':<6} {'ms':>8} {'peak MiB':>9} {'games':>6}")
+    try:
+        for store, (html, source) in pages.items():
+            baseline = None
+            for backend, scoped in configs:
+                html_parser.BACKEND, html_parser.SCOPED_PARSING = backend, scoped
+                games, ms, peak = measure(PARSERS[store], html, args.repeat)
+                found = [(game.title, game.url) for game in games]
+                if baseline is None:
+                    baseline = found
+                mismatch = found != baseline
+                failures += mismatch
+                print(
+                    f"{store:<14} {source:<9} {len(html) // 1024:>6}  {backend:<11} {'yes' if scoped else 'no':<6} "
+                    f"{ms:>8.1f} {peak:>9.1f} {len(games):>6}{'  MISMATCH' if mismatch else ''}"
+                )
+    finally:
+        html_parser.BACKEND, html_parser.SCOPED_PARSING = original
+    if failures:
+        print(f"{failures} configuration(s) found different games than unscoped html.parser.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
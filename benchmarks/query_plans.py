@@ -0,0 +1,158 @@
+# benchmarks/query_plans.py
+"""
+Seeds a throwaway database with a large synthetic library (with cached prices and
+price history) and checks, with EXPLAIN QUERY PLAN, that none of the hot queries
+does a full table scan. Also reports the average latency of each query.
+
+    python benchmarks/query_plans.py [--rows 100000]
+
+Exits with status 1 if any query scans a table.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_manager import (  # noqa: E402
+    DBManager, EPITAPHS, end_date_to_ts,
+    SQL_CLAIM_BY_URL, SQL_CLAIMABLE_BY_URL, SQL_EXPIRE, SQL_EXPIRING_KEYS, SQL_EXPIRING_WITHIN, SQL_GAME_BY_KEY,
+    SQL_GAME_BY_URL, SQL_GAMES_BY_KEYS, SQL_GAMES_BY_STATUS, SQL_STALE_EXPIRED, SQL_STATUS_COUNTS,
+    SQL_UPDATE_GENRE, SQL_UPDATE_PRICE,
+)
+from game_filter import GameFilter  # noqa: E402
+from price_history import SQL_GAME_IDS, SQL_LATEST_RUNS  # noqa: E402
+from price_tracker import SQL_CACHED_PRICES  # noqa: E402
+
+PLATFORMS = ["Epic", "Amazon Prime", "GOG", "Steam", "Ubisoft", "Itch.io", "IndieGala", "Humble Bundle"]
+STATUSES = ["active", "claimed", "expired", "owned"]
+
+EXPIRY_TS = end_date_to_ts("2030-01-03T00:00:00+00:00")
+# A chunk of IN (...) values, as the batch lookups send them
+TITLES = tuple(f"Game {i}" for i in range(0, 5000, 10))
+GAME_IDS = tuple(range(1, 5001, 10))
+
+
+def placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def hot_queries(db):
+    """
+    (description, SQL, parameters) for every query the app runs on a hot path. The SQL
+    comes from the modules that run it, so this list cannot drift from the app.
+    """
+    game_filter = GameFilter(db)
+    return [
+        ("get_games_by_status", SQL_GAMES_BY_STATUS.format(columns=db.listing_columns("active")), ("active",)),
+        ("get_status_counts", SQL_STATUS_COUNTS, ()),
+        ("filter_games by platform", *game_filter.filter_query("claimed", platform="Epic")),
+        ("filter_games active not owned", *game_filter.filter_query("active")),
+        (
+            "filter_games all filters",
+            *game_filter.filter_query("active", platform="Epic", genre="RPG", search_term="Game 4"),
+        ),
+        ("mark_game_owned", SQL_GAME_BY_KEY, ("Game 42", "Steam")),
+        ("mark_game_claimed select", SQL_CLAIMABLE_BY_URL, ("https://example.com/game/42",)),
+        ("mark_game_claimed", SQL_CLAIM_BY_URL, ("now", "https://example.com/none")),
+        ("claim_game lookup", SQL_GAME_BY_URL, ("https://example.com/game/42",)),
+        ("check_expirations select", SQL_EXPIRING_KEYS, (EXPIRY_TS,)),
+        ("check_expirations stale rows", SQL_STALE_EXPIRED, (EXPIRY_TS,)),
+        ("check_expirations", SQL_EXPIRE, (*EPITAPHS, EXPIRY_TS)),
+        (
+            "get_expiring_games",
+            SQL_EXPIRING_WITHIN,
+            (end_date_to_ts("2030-01-10T00:00:00+00:00"), end_date_to_ts("2030-01-11T00:00:00+00:00")),
+        ),
+        ("update_price(s)", SQL_UPDATE_PRICE, (9.99, "Game 42", "Steam", 9.99)),
+        ("update_genre(s)", SQL_UPDATE_GENRE, ("RPG", "Game 42", "RPG")),
+        (
+            "get_games_by_keys",
+            SQL_GAMES_BY_KEYS.format(columns=db.listing_columns("active"), placeholders=placeholders(TITLES)),
+            ("active", *TITLES),
+        ),
+        ("price_cache lookup", SQL_CACHED_PRICES.format(placeholders=placeholders(TITLES)), (0, *TITLES)),
+        ("price_history game ids", SQL_GAME_IDS.format(placeholders=placeholders(TITLES)), TITLES),
+        ("price_history latest runs", SQL_LATEST_RUNS.format(placeholders=placeholders(GAME_IDS)), GAME_IDS),
+    ]
+
+
+def seed(db, rows):
+    rng = random.Random(0)
+    batch = []
+    for i in range(rows):
+        end_date = f"2030-01-{rng.randint(1, 28):02d}T00:00:00+00:00" if rng.random() < 0.5 else None
+        batch.append((
+            f"Game {i}",
+            rng.choice(PLATFORMS),
+            f"https://example.com/game/{i}",
+            end_date,
+            end_date_to_ts(end_date),
+            rng.choice(STATUSES),
+        ))
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO games (title, platform, url, end_date, end_ts, status) VALUES (?, ?, ?, ?, ?, ?)", batch
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO price_cache (title, platform, price, fetched_at, expires_at) VALUES (?, ?, ?, 0, ?)",
+            [(title, platform, rng.uniform(0, 60), rng.uniform(0, 2e9)) for title, platform, *_ in batch],
+        )
+        # A few price runs per game
+        conn.executemany(
+            "INSERT INTO price_history (game_id, ts, last_seen_ts, price) VALUES (?, ?, ?, ?)",
+            [(game_id, ts, ts + 3600, rng.uniform(0, 60)) for game_id in range(1, rows + 1) for ts in (0, 86400, 172800)],
+        )
+        conn.execute("ANALYZE")
+
+
+def full_scans(conn, sql, params):
+    """
+    Returns the plan lines that read a whole table. Scanning a covering index (e.g.
+    for GROUP BY status) is allowed: it never touches the table rows.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    details = [row[3] for row in plan]
+    return details, [d for d in details if d.startswith("SCAN ") and "COVERING INDEX" not in d]
+
+
+def time_query(conn, sql, params, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute("SAVEPOINT bench")
+        conn.execute(sql, params).fetchall()
+        conn.execute("ROLLBACK TO bench")
+        conn.execute("RELEASE bench")
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(os.path.join(tmp, "bench.db"))
+        seed(db, args.rows)
+        conn = db.connection()
+        failures = 0
+        print(f"{'query':<32} {'avg ms':>9}  plan")
+        for name, sql, params in hot_queries(db):
+            details, scans = full_scans(conn, sql, params)
+            avg_ms = time_query(conn, sql, params, args.repeat)
+            flag = "FULL SCAN " if scans else ""
+            print(f"{name:<32} {avg_ms:>9.3f}  {flag}{' | '.join(details)}")
+            failures += bool(scans)
+        db.close()
+
+    if failures:
+        print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} scan a table.")
+        sys.exit(1)
+    print("\nNo hot query scans a table.")
+
+
+if __name__ == "__main__":
+    main()
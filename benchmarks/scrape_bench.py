@@ -0,0 +1,202 @@
+# benchmarks/scrape_bench.py
+"""
+Measures per-store throughput of the three stages of a refresh, offline, from
+replay.py fixtures:
+
+  scrape  GameScraper.check_<store>() end to end: replayed request, HTTP cache, parse
+  parse   GameScraper.parse_<store>() on the recorded body alone
+  ingest  DBManager.upsert_games() of the parsed games into a fresh database
+
+    python replay.py record                                   # once, against the live sites
+    python benchmarks/scrape_bench.py --fixtures replay_fixtures
+    python benchmarks/scrape_bench.py --synthetic --save-baseline benchmarks/scrape_baseline.json
+    python benchmarks/scrape_bench.py --synthetic --baseline benchmarks/scrape_baseline.json
+
+--synthetic generates fixtures for every store instead (same pages as parse_bench.py),
+so runs are reproducible on any machine. With --server the scrape stage goes through a
+local ReplayServer over real sockets. With --baseline, any stage slower than the
+baseline by more than --tolerance is reported as a regression and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_manager import DBManager  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+from http_client import shared_client  # noqa: E402
+from parse_bench import CARDS, synthetic_page  # noqa: E402
+from rate_limit import HostPolicy, RateLimiter  # noqa: E402
+from replay import RENDER, FixtureStore, Replayer, ReplayServer  # noqa: E402
+from scraper import STORE_URLS, GameScraper  # noqa: E402
+
+# store -> (parser, fixture method, parse_bench page name)
+STORES = {
+    "Epic": (GameScraper.parse_epic_games, "GET", None),
+    "Amazon Prime": (GameScraper.parse_amazon_prime, "GET", "amazon_prime"),
+    "GOG": (GameScraper.parse_gog_games, "GET", "gog"),
+    "Ubisoft": (GameScraper.parse_ubisoft_games, RENDER, "ubisoft"),  # rendered by the browser pool
+    "Itch.io": (GameScraper.parse_itch_io_games, "GET", "itch_io"),
+    "IndieGala": (GameScraper.parse_indiegala_games, "GET", "indiegala"),
+    "Humble Bundle": (GameScraper.parse_humble_bundle_games, "GET", "humble_bundle"),
+}
+
+
+def synthetic_epic(cards):
+    elements = [
+        {
+            "id": str(i),
+            "title": f"Game {i}",
+            "productSlug": f"game-{i}",
+            "price": {"totalPrice": {"discountPrice": 0 if i % 2 == 0 else 1999}},
+            "promotions": {"promotionalOffers": [{"promotionalOffers": [{"endDate": "2030-01-01T15:00:00.000Z"}]}]},
+        }
+        for i in range(cards * 2)  # half of them are not free
+    ]
+    return json.dumps({"data": {"Catalog": {"searchStore": {"elements": elements}}}})
+
+
+def write_synthetic(directory, cards, noise):
+    store = FixtureStore(directory)
+    for name, (_, method, page) in STORES.items():
+        if page is None:
+            body, content_type = synthetic_epic(cards), "application/json"
+        else:
+            assert page in CARDS
+            body, content_type = synthetic_page(page, cards, noise), "text/html; charset=utf-8"
+        store.save(method, STORE_URLS[name], 200, {"Content-Type": content_type}, body.encode("utf-8"), "utf-8")
+
+
+def load_body(store, name):
+    parser, method, _ = STORES[name]
+    meta, body = store.load(method, STORE_URLS[name])
+    text = body.decode(meta["encoding"] or "utf-8")
+    return json.loads(text) if name == "Epic" else text
+
+
+def timed(fn, repeat):
+    """Returns (last result, best seconds of `repeat` runs); the best run is the least noisy."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+async def scrape_once(name, cache_dir):
+    # A fresh cache per run, so every scrape downloads and parses the page
+    scraper = GameScraper(http_cache=HttpCache(os.path.join(cache_dir, str(time.perf_counter_ns()))))
+    async with shared_client.cycle():
+        return await scraper.stores()[name]()
+
+
+def run(fixtures, stores, repeat, latency, use_server, workdir):
+    store = FixtureStore(fixtures)
+    results = {}
+    server = ReplayServer(fixtures)
+    loop = asyncio.new_event_loop()
+    # Repeated requests to one host would otherwise wait on its token bucket
+    limiter, shared_client.limiter = shared_client.limiter, RateLimiter(
+        HostPolicy(rate=1e6, burst=10**6, max_rate=1e6, max_concurrency=64)
+    )
+    try:
+        server_url = loop.run_until_complete(server.start()) if use_server else None
+        with Replayer(fixtures, "replay", latency=latency, server_url=server_url):
+            for name in stores:
+                try:
+                    body = load_body(store, name)
+                except Exception as e:
+                    print(f"{name}: skipped ({e})")
+                    continue
+                parser = STORES[name][0]
+                games, scrape_s = timed(lambda: loop.run_until_complete(scrape_once(name, workdir)), repeat)
+                parsed, parse_s = timed(lambda: parser(body), repeat)
+
+                def ingest():
+                    db = DBManager(os.path.join(workdir, f"ingest_{time.perf_counter_ns()}.db"))
+                    start = time.perf_counter()
+                    db.upsert_games(parsed)
+                    elapsed = time.perf_counter() - start  # migrations are not part of ingest
+                    db.close()
+                    return elapsed
+                ingest_s = min(ingest() for _ in range(repeat))
+
+                if len(games) != len(parsed):
+                    print(f"{name}: scrape returned {len(games)} games but the parser found {len(parsed)}")
+                results[name] = {
+                    "games": len(parsed),
+                    "scrape_ms": scrape_s * 1000,
+                    "parse_ms": parse_s * 1000,
+                    "ingest_ms": ingest_s * 1000,
+                }
+    finally:
+        shared_client.limiter = limiter
+        loop.run_until_complete(server.close())
+        loop.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Lists (store, stage, baseline ms, current ms) for stages slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for stage in ("scrape_ms", "parse_ms", "ingest_ms"):
+            if stage in previous and current[stage] > previous[stage] * (1 + tolerance):
+                regressions.append((name, stage[:-3], previous[stage], current[stage]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="replay_fixtures", help="Directory written by `replay.py record`")
+    parser.add_argument("--synthetic", action="store_true", help="Generate fixtures instead of reading --fixtures")
+    parser.add_argument("--cards", type=int, default=60, help="--synthetic: games per page")
+    parser.add_argument("--noise", type=int, default=3000, help="--synthetic: unrelated blocks per page")
+    parser.add_argument("--stores", nargs="*", default=list(STORES), choices=list(STORES), metavar="STORE")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every replayed request")
+    parser.add_argument("--server", action="store_true", help="Replay through a local ReplayServer")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a stage counts as regressed")
+    parser.add_argument("--save-baseline", help="Write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fixtures = args.fixtures
+        if args.synthetic:
+            fixtures = os.path.join(workdir, "fixtures")
+            write_synthetic(fixtures, args.cards, args.noise)
+        results = run(fixtures, args.stores, args.repeat, args.latency, args.server, workdir)
+
+    print(f"{'store':<14} {'games':>6} {'scrape ms':>10} {'parse ms':>9} {'ingest ms':>10} {'games/s':>9}")
+    for name, r in results.items():
+        total_s = (r["scrape_ms"] + r["ingest_ms"]) / 1000
+        print(
+            f"{name:<14} {r['games']:>6} {r['scrape_ms']:>10.1f} {r['parse_ms']:>9.1f} "
+            f"{r['ingest_ms']:>10.1f} {r['games'] / total_s if total_s else 0:>9.0f}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, stage, before, after in regressions:
+            print(f"REGRESSION {name} {stage}: {before:.1f} ms -> {after:.1f} ms (+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage regressed by more than {args.tolerance:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
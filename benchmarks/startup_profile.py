@@ -0,0 +1,87 @@
+# benchmarks/startup_profile.py
+"""
+Reports what the application's imports cost at startup, using Python's
+-X importtime in a fresh interpreter.
+
+    python benchmarks/startup_profile.py [--module main] [--top 25]
+
+Prints the total import time, the slowest imports directly triggered by the
+project's own modules, and the total self time per top-level package. Heavy
+components (transformers/torch, playwright, boto3) should not appear unless
+they are meant to load eagerly.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+HEAVY_PACKAGES = ["torch", "transformers", "datasets", "playwright", "boto3", "botocore"]
+
+
+def profile_imports(module):
+    """Returns (entries, returncode, stderr tail); entries are (depth, name, self_us, cumulative_us)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    other_lines = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((len(indent) // 2, name, int(self_us), int(cumulative_us)))
+        elif not line.startswith("import time:"):
+            other_lines.append(line)
+    return entries, result.returncode, "\n".join(other_lines[-5:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    entries, returncode, error = profile_imports(args.module)
+    project_modules = {name[:-3] for name in os.listdir(REPO_ROOT) if name.endswith(".py")}
+
+    # An import is attributed to the project if it sits directly under a project module
+    attributed = []
+    parents = []
+    for depth, name, self_us, cumulative_us in reversed(entries):  # importtime prints children first
+        del parents[depth:]
+        parent = parents[-1] if parents else None
+        if name not in project_modules and (parent is None or parent in project_modules):
+            attributed.append((cumulative_us, name, parent or "(startup)"))
+        parents.append(name)
+
+    total_us = sum(cumulative_us for depth, _, _, cumulative_us in entries if depth == 0)
+    print(f"Importing {args.module!r} took {total_us / 1000:.0f} ms ({len(entries)} modules)\n")
+
+    print(f"{'slowest imports':<40} {'ms':>8}  imported by")
+    for cumulative_us, name, parent in sorted(attributed, reverse=True)[:args.top]:
+        print(f"{name:<40} {cumulative_us / 1000:>8.1f}  {parent}")
+
+    per_package = defaultdict(int)
+    for _, name, self_us, _ in entries:
+        per_package[name.split(".")[0]] += self_us
+    print(f"\n{'self time per package':<40} {'ms':>8}")
+    for package, self_us in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<40} {self_us / 1000:>8.1f}")
+
+    heavy = sorted({name.split(".")[0] for _, name, _, _ in entries} & set(HEAVY_PACKAGES))
+    if heavy:
+        print(f"\nHeavy packages imported at startup: {', '.join(heavy)}")
+    if returncode:
+        print(f"\nImport of {args.module!r} failed, the profile stops at the failing import:\n{error}")
+        sys.exit(returncode)
+
+
+if __name__ == "__main__":
+    main()
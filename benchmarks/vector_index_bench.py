@@ -0,0 +1,90 @@
+# benchmarks/vector_index_bench.py
+"""
+Compares recommendation retrieval through vector_index against the old brute-force
+path (a dense cosine_similarity(active, owned) matrix, averaged per active game).
+Uses clustered synthetic embeddings, so no model needs to be loaded.
+
+    python benchmarks/vector_index_bench.py [--candidates 50000] [--owned 500] [--k 10]
+
+For each strategy it reports build and query latency and recall@k. Mean-query
+strategies are checked against the brute-force top k; per-owned strategies rank by a
+different score, so they are checked against the exact per-owned ranking.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vector_index import create_index, normalize, rank_by_mean_similarity  # noqa: E402
+
+try:
+    from sklearn.metrics.pairwise import cosine_similarity
+except ImportError:  # Same computation as sklearn's, for machines without it
+    def cosine_similarity(a, b):
+        return normalize(a) @ normalize(b).T
+
+
+def synthetic_embeddings(rng, n, dim, n_topics):
+    """Vectors scattered around `n_topics` random directions, like titles of a few genres."""
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    return topics[rng.integers(0, n_topics, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def brute_force(active, owned, k):
+    return list(np.argsort(-cosine_similarity(active, owned).mean(axis=1), kind="stable")[:k])
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=50_000)
+    parser.add_argument("--owned", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = synthetic_embeddings(rng, args.candidates + args.owned, args.dim, args.topics)
+    active, owned = data[:args.candidates], data[args.candidates:]
+    ids = list(range(args.candidates))
+
+    expected, baseline_ms = timed(lambda: brute_force(active, owned, args.k), args.repeat)
+    print(f"{'strategy':<28} {'build ms':>10} {'query ms':>10} {'recall@' + str(args.k):>10}")
+    print(f"{'brute force (baseline)':<28} {'-':>10} {baseline_ms:>10.2f} {1.0:>10.3f}")
+
+    strategies = [
+        ("exact, mean query", "exact", {}, None),
+        ("ivf, mean query", "ivf", {"nprobe": args.nprobe}, None),
+        ("exact, per-owned top 50", "exact", {}, 50),
+        ("ivf, per-owned top 50", "ivf", {"nprobe": args.nprobe}, 50),
+    ]
+    references = {None: expected}
+    for name, backend, options, per_owned_k in strategies:
+        start = time.perf_counter()
+        index = create_index(backend, args.dim, **options)
+        # Insert in batches, the way new store results arrive
+        for begin in range(0, len(ids), 5000):
+            index.add(ids[begin:begin + 5000], active[begin:begin + 5000])
+        index.search(owned[:1], 1)  # trains the IVF clusters
+        build_ms = (time.perf_counter() - start) * 1000
+        ranked, query_ms = timed(lambda: rank_by_mean_similarity(index, owned, args.k, per_owned_k), args.repeat)
+        # The first strategy of each scoring mode is exact and becomes its reference
+        reference = references.setdefault(per_owned_k, [id_ for id_, _ in ranked])
+        recall = len({id_ for id_, _ in ranked} & set(reference)) / len(reference)
+        print(f"{name:<28} {build_ms:>10.1f} {query_ms:>10.2f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# browser_pool.py
+import asyncio
+import threading
+
+# Resource types never needed to read a store page's HTML
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+class BrowserPool:
+    """
+    One warm headless Chromium shared by every scraper that needs JavaScript rendering.
+
+    Playwright objects are bound to the event loop that created them, while each
+    refresh runs in its own asyncio.run() loop, so the browser lives on a private
+    background loop and get_content() bridges to it from any loop. Pages are reused
+    between calls, at most `max_pages` are open at once, images/fonts/media are not
+    downloaded, and the browser is closed after `idle_timeout` seconds without use.
+    """
+
+    def __init__(self, max_pages=2, idle_timeout=300, blocked_resource_types=BLOCKED_RESOURCE_TYPES):
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+        self.blocked_resource_types = set(blocked_resource_types)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        # Only touched on the pool's loop
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle_pages = []
+        self._semaphore = None
+        self._launch_lock = None
+        self._busy = 0  # calls in progress or waiting for a page
+        self._idle_timer = None
+        self.launches = 0
+        self.replay = None  # a replay.Replayer serves (or records) rendered pages
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _ensure_context(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._context is None:
+                from playwright.async_api import async_playwright  # Heavy; only imported once a browser is needed
+
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._context = await self._browser.new_context()
+                if self.blocked_resource_types:
+                    await self._context.route("**/*", self._route)
+                self.launches += 1
+        return self._context
+
+    async def _route(self, route):
+        if route.request.resource_type in self.blocked_resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _get_content(self, url, wait_for_selector, timeout):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+        self._busy += 1
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        try:
+            async with self._semaphore:
+                context = await self._ensure_context()
+                browser = self._browser
+                page = None
+                reusable = False
+                try:
+                    page = self._idle_pages.pop() if self._idle_pages else await context.new_page()
+                    await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+                    try:
+                        if wait_for_selector:
+                            await page.wait_for_selector(wait_for_selector, timeout=timeout * 1000)
+                        else:
+                            await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+                    except Exception as e:
+                        # The page may legitimately have no matching element (e.g. no free games)
+                        print(f"Browser pool: {url} did not settle within {timeout}s ({type(e).__name__}); using the page as is.")
+                    content = await page.content()
+                    reusable = True
+                    return content
+                except Exception:
+                    await self._forget_if_disconnected(browser)
+                    raise
+                finally:
+                    if reusable:
+                        self._idle_pages.append(page)
+                    elif page is not None:
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass  # e.g. the browser is already gone
+        finally:
+            self._busy -= 1
+            if self._busy == 0 and self.idle_timeout:
+                self._idle_timer = asyncio.get_running_loop().call_later(
+                    self.idle_timeout, lambda: asyncio.ensure_future(self._shutdown())
+                )
+
+    async def _forget_if_disconnected(self, browser):
+        """
+        Drops `browser` if Chromium crashed or disconnected, so the next call launches a
+        new one instead of failing on the dead context until the idle shutdown.
+        """
+        if browser is None or browser is not self._browser or browser.is_connected():
+            return
+        print("Browser pool: Chromium disconnected; a new browser is launched on the next call.")
+        playwright = self._playwright
+        self._playwright = self._browser = self._context = None
+        self._idle_pages = []
+        try:
+            await playwright.stop()
+        except Exception:
+            pass
+
+    async def get_content(self, url, wait_for_selector=None, timeout=30):
+        """
+        Returns the rendered HTML of `url`. Waits up to `timeout` seconds for
+        `wait_for_selector` to appear (or, without one, for the network to go idle).
+        Can be awaited from any event loop.
+        """
+        if self.replay is not None:
+            return await self.replay.browser_content(url, self._render, wait_for_selector, timeout)
+        return await self._render(url, wait_for_selector, timeout)
+
+    async def _render(self, url, wait_for_selector, timeout):
+        future = asyncio.run_coroutine_threadsafe(
+            self._get_content(url, wait_for_selector, timeout), self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    async def _shutdown(self):
+        if self._busy or self._browser is None:
+            return
+        # Detach first so a call arriving meanwhile launches a fresh browser
+        playwright, browser, pages = self._playwright, self._browser, self._idle_pages
+        self._playwright = self._browser = self._context = None
+        self._idle_pages = []
+        for page in pages:
+            await page.close()
+        await browser.close()  # Also closes its context
+        await playwright.stop()
+
+    def close(self):
+        """Closes the browser and stops the pool's loop. Safe to call if it never started."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=10)
+        except Exception as e:
+            print(f"Error closing the browser pool: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        # Both are bound to the stopped loop; a later call starts over on a new one
+        self._semaphore = self._launch_lock = None
+
+
+# Shared by the scraper and the dataset generator
+shared_browser = BrowserPool()
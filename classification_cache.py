@@ -0,0 +1,137 @@
+# classification_cache.py
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from db_manager import DBManager
+
+# SQLite's default limit on bound parameters is 999; stay well under it
+_QUERY_CHUNK = 500
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    The form of `text` the cache is keyed on: lowercased and accent-stripped the way the
+    uncased tokenizer does it (NFD, combining marks dropped), with runs of whitespace
+    collapsed. Texts that differ in any other way ("ß"/"ss", ligatures) get separate entries.
+    """
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    stripped = "".join(ch for ch in decomposed if unicodedata.category(ch) != "Mn")
+    return _WHITESPACE.sub(" ", stripped).strip()
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    Content-addressed cache of classifier results, keyed by (hash of the normalized
+    text, model version), so unchanged page text is not run through the model again.
+
+    Results are kept in an in-memory LRU and, when a DBManager is given, also in the
+    `classifications` table so they survive restarts. Entries of other model versions
+    are dropped by invalidate() (AIModule calls it after training). It is safe to share
+    between threads; the model itself runs outside the lock.
+    """
+
+    def __init__(self, db_manager: DBManager | None = None, max_memory_items=50000):
+        self.db = db_manager
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()  # (text_hash, model_version) -> result dict, least recently used first
+        self._lock = threading.Lock()  # guards _memory and the counters
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            hits, misses, memory_items = self.hits, self.misses, len(self._memory)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_items": memory_items,
+        }
+
+    def _remember(self, key, result):
+        # Callers hold self._lock
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _load(self, hashes, model_version):
+        found = {}
+        conn = self.db.connection()
+        for start in range(0, len(hashes), _QUERY_CHUNK):
+            chunk = hashes[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for digest, is_free, score in conn.execute(
+                f"SELECT text_hash, is_free, score FROM classifications "
+                f"WHERE model_version = ? AND text_hash IN ({placeholders})",
+                (model_version, *chunk),
+            ):
+                found[digest] = {"is_free": bool(is_free), "score": score}
+        return found
+
+    def _save(self, results, model_version):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO classifications (text_hash, model_version, is_free, score) VALUES (?, ?, ?, ?)",
+                [(digest, model_version, int(r["is_free"]), r["score"]) for digest, r in results.items()],
+            )
+
+    def get_many(self, texts, model_version, classify_fn):
+        """
+        Returns one {"is_free", "score"} dict per text, in input order. Only texts whose
+        normalized form is cached neither in memory nor on disk are passed to
+        classify_fn(list_of_texts) -> list of results, and their results are stored.
+        """
+        hashes = [text_hash(text) for text in texts]
+        results = {}
+        missing = {}  # text_hash -> a text with that hash
+        with self._lock:
+            for digest, text in zip(hashes, texts):
+                key = (digest, model_version)
+                result = self._memory.get(key)
+                if result is not None:
+                    self._memory.move_to_end(key)
+                    results[digest] = result
+                elif digest not in results:
+                    missing.setdefault(digest, text)
+
+        if missing and self.db is not None:
+            loaded = self._load(list(missing), model_version)
+            with self._lock:
+                for digest, result in loaded.items():
+                    results[digest] = result
+                    self._remember((digest, model_version), result)
+                    del missing[digest]
+        with self._lock:
+            # Per distinct text: a text repeated in the batch is classified (or found) once
+            self.hits += len(results)
+            self.misses += len(missing)
+
+        if missing:
+            computed = dict(zip(missing, classify_fn(list(missing.values()))))
+            if self.db is not None:
+                self._save(computed, model_version)
+            with self._lock:
+                for digest, result in computed.items():
+                    results[digest] = result
+                    self._remember((digest, model_version), result)
+
+        return [dict(results[digest]) for digest in hashes]
+
+    def invalidate(self, keep_model_version=None):
+        """Drops every cached result except those of `keep_model_version` (all if None)."""
+        with self._lock:
+            self._memory = OrderedDict(
+                (key, result) for key, result in self._memory.items() if key[1] == keep_model_version
+            )
+        if self.db is not None:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM classifications WHERE model_version IS NOT ?", (keep_model_version,))
@@ -1,6 +1,12 @@
 # cloud_sync.py
-import boto3
 from db_manager import DBManager
+from lazy import LazyComponent
+
+
+def _create_s3_client(params):
+    import boto3
+
+    return boto3.client("s3", **params)
 
 
 class CloudSync:
@@ -17,7 +23,8 @@ class CloudSync:
             # For bypassing, we'll allow it to be None if aws_config doesn't have it.
             print("Warning: S3 bucket name not found in aws_config for CloudSync.")
 
-        self.s3 = boto3.client("s3", **s3_client_params)
+        # boto3 takes a while to import and set up; build the client on the first transfer
+        self.s3 = LazyComponent("S3 client", lambda: _create_s3_client(s3_client_params))
 
     def upload_db(self):
         self.s3.upload_file(self.db.db_path, self.bucket_name, "free_games.db")
@@ -1,5 +1,5 @@
 # community_sharing.py
-import aiohttp
+from http_client import shared_client
 from db_manager import DBManager
 
 
@@ -10,5 +10,5 @@ class CommunitySharing:
     async def share_to_discord(self, webhook_url):
         games = self.db.get_games_by_status("active")
         message = "\n".join(f"{g[1]} on {g[0]}: {g[2]}" for g in games)
-        async with aiohttp.ClientSession() as session:
+        async with shared_client.session() as session:
             await session.post(webhook_url, json={"content": message})
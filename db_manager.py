@@ -1,134 +1,533 @@
 # db_manager.py
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone # Added timezone
-import random
+from typing import NamedTuple
+
+# Applied to every connection when it is opened. WAL lets the GUI thread read while
+# a refresh thread writes, and synchronous=NORMAL avoids an fsync on every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",  # ~16 MB page cache
+    "PRAGMA mmap_size = 67108864",  # 64 MB
+    "PRAGMA busy_timeout = 30000",
+)
+
+# SQLite's default limit on bound parameters is 999; stay well under it
+_QUERY_CHUNK = 500
+
+def end_date_to_ts(end_date):
+    """UTC epoch seconds of a datetime or ISO 8601 string (naive values are taken as UTC), or None."""
+    if end_date is None:
+        return None
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+    if end_date.tzinfo is None or end_date.tzinfo.utcoffset(end_date) is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+    return int(end_date.timestamp())
+
+
+def _backfill_end_ts(conn):
+    rows = []
+    for game_id, end_date in conn.execute("SELECT id, end_date FROM games WHERE end_date IS NOT NULL").fetchall():
+        try:
+            rows.append((end_date_to_ts(end_date), game_id))
+        except ValueError:
+            print(f"Warning: Could not parse end_date string '{end_date}' for game ID {game_id}; it will not expire.")
+    conn.executemany("UPDATE games SET end_ts = ? WHERE id = ?", rows)
+
+
+# Schema migrations, applied in order by DBManager.migrate and tracked in PRAGMA user_version.
+# Each step is an SQL statement or a callable taking the connection. Append new versions;
+# never edit one that has already shipped.
+MIGRATIONS = [
+    # 1: indexes for the hot access paths. Lookups by (title, platform) are already served
+    # by the UNIQUE(title, platform, status) index, so they do not get a second one.
+    (1, [
+        # get_games_by_status / GameFilter.filter_games / get_status_counts
+        "CREATE INDEX IF NOT EXISTS idx_games_status_platform_title ON games(status, platform, title)",
+        # mark_game_claimed / claim_game
+        "CREATE INDEX IF NOT EXISTS idx_games_url ON games(url)",
+        # check_expirations / notify_expiring_games (covering: id is implicit)
+        "CREATE INDEX IF NOT EXISTS idx_games_status_end_date ON games(status, end_date)",
+    ]),
+    # 2: title embeddings cached by EmbeddingStore, one row per (title, model version)
+    (2, [
+        """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            title TEXT NOT NULL,
+            model_version TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            PRIMARY KEY (title, model_version)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    # 3: classifier results cached by ClassificationCache, keyed by a hash of the normalized text
+    (3, [
+        """
+        CREATE TABLE IF NOT EXISTS classifications (
+            text_hash TEXT NOT NULL,
+            model_version TEXT NOT NULL,
+            is_free INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (text_hash, model_version)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    # 4: prices fetched by PriceTracker, reused until expires_at (price is NULL if none was found)
+    (4, [
+        """
+        CREATE TABLE IF NOT EXISTS price_cache (
+            title TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            price REAL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (title, platform)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    # 5: price time series kept by PriceHistory, one row per run of identical prices
+    (5, [
+        """
+        CREATE TABLE IF NOT EXISTS price_history (
+            game_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            last_seen_ts INTEGER NOT NULL,
+            price REAL,
+            PRIMARY KEY (game_id, ts)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    # 6: end_date as UTC epoch seconds, so expiry checks are indexed range queries in SQL
+    (6, [
+        "ALTER TABLE games ADD COLUMN end_ts INTEGER",
+        _backfill_end_ts,
+        # check_expirations / get_expiring_games
+        "CREATE INDEX IF NOT EXISTS idx_games_status_end_ts ON games(status, end_ts)",
+        "DROP INDEX IF EXISTS idx_games_status_end_date",  # Superseded by the end_ts index
+    ]),
+    # 7: "expires soon" warnings ExpiryScheduler has sent, so a restart does not repeat them
+    (7, [
+        """
+        CREATE TABLE IF NOT EXISTS expiry_warnings (
+            title TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            end_ts INTEGER NOT NULL,
+            hours INTEGER NOT NULL,
+            PRIMARY KEY (title, platform, end_ts, hours)
+        ) WITHOUT ROWID
+        """,
+    ]),
+]
+
+# Chosen at random for each game check_expirations expires
+EPITAPHS = (
+    "Game Over: Unclaimed!",
+    "Pixel Dust in the Wind...",
+    "Lost in the Digital Abyss.",
+    "No Respawn for This One!",
+)
+
+# Leading columns of each status listing, in the positional order existing callers unpack.
+# Owned rows include claim_date to determine if an owned game was originally claimed.
+STATUS_COLUMNS = {
+    "active": ["platform", "title", "url", "end_date"],
+    "claimed": ["platform", "title", "claim_date"],
+    "expired": ["platform", "title", "epitaph"],
+    "owned": ["platform", "title", "acquisition_date", "claim_date"],
+}
+# Appended to every listing so a row is a full record.
+RECORD_COLUMNS = [
+    "id", "status", "url", "end_date", "claim_date", "epitaph", "acquisition_date",
+    "price", "genre", "language", "playtime",
+]
+
+# Statements of the hot paths. benchmarks/query_plans.py checks their query plans against
+# a large library, so they live here rather than inline. {columns} takes a
+# listing_columns() list.
+SQL_GAMES_BY_STATUS = "SELECT {columns} FROM games WHERE status = ?"
+SQL_STATUS_COUNTS = "SELECT status, COUNT(*) FROM games GROUP BY status"
+SQL_GAME_BY_KEY = "SELECT id, status FROM games WHERE title = ? AND platform = ?"
+SQL_GAME_BY_URL = "SELECT title, platform, url FROM games WHERE url = ?"
+SQL_CLAIMABLE_BY_URL = "SELECT title, platform, status FROM games WHERE url = ? AND status != 'claimed'"
+SQL_CLAIM_BY_URL = "UPDATE games SET status = 'claimed', claim_date = ? WHERE url = ?"
+SQL_EXPIRING_KEYS = "SELECT title, platform FROM games WHERE status = 'active' AND end_ts < ?"
+SQL_STALE_EXPIRED = """
+    SELECT old.id, old.title, old.platform FROM games cur
+    JOIN games old ON old.title = cur.title AND old.platform = cur.platform AND old.status = 'expired'
+    WHERE cur.status = 'active' AND cur.end_ts < ?
+"""
+# Parameters: the EPITAPHS, then the current time
+SQL_EXPIRE = (
+    f"UPDATE games SET status = 'expired', epitaph = CASE abs(random()) % {len(EPITAPHS)} "
+    + " ".join(f"WHEN {i} THEN ?" for i in range(len(EPITAPHS)))
+    + " END WHERE status = 'active' AND end_ts < ?"
+)
+SQL_EXPIRING_WITHIN = """
+    SELECT platform, title, end_date, end_ts FROM games
+    WHERE status = 'active' AND end_ts >= ? AND end_ts < ?
+    ORDER BY end_ts
+"""
+SQL_UPDATE_PRICE = "UPDATE games SET price = ? WHERE title = ? AND platform = ? AND price IS NOT ?"
+SQL_UPDATE_GENRE = "UPDATE games SET genre = ? WHERE title = ? AND genre IS NOT ?"
+# {placeholders} takes one "?" per title of a chunk
+SQL_GAMES_BY_KEYS = "SELECT {columns} FROM games WHERE status = ? AND title IN ({placeholders})"
+
+# Kinds of DBEvent delivered to subscribers
+GAME_INSERTED = "game_inserted"
+GAMES_UPSERTED = "games_upserted"  # a bulk upsert changed one or more rows of `status`
+STATUS_CHANGED = "status_changed"
+PRICE_UPDATED = "price_updated"
+GENRE_UPDATED = "genre_updated"
+PLAYTIME_UPDATED = "playtime_updated"
+
+
+class DBEvent(NamedTuple):
+    kind: str
+    status: str | None  # status of the affected row(s); None if rows of any status may be affected
+    title: str | None = None
+    platform: str | None = None
+    old_status: str | None = None  # set for STATUS_CHANGED
+    # (title, platform) pairs a bulk change touched; platform None matches every platform
+    keys: tuple = ()
+
 
 class DBManager:
     def __init__(self, db_path="free_games.db"):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections = {}  # thread -> connection, so connections of finished threads can be closed
+        self._connections_lock = threading.Lock()
+        self._subscribers = []
         self.init_db()
 
-    def init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS games (
-                id INTEGER PRIMARY KEY,
-                title TEXT,
-                platform TEXT,
-                url TEXT,
-                end_date TEXT,
-                status TEXT,
-                claim_date TEXT,
-                epitaph TEXT,
-                acquisition_date TEXT,
-                price REAL,
-                genre TEXT,
-                language TEXT,
-                playtime INTEGER,
-                UNIQUE(title, platform, status)
-            )
-        """)
-        conn.commit()
-        conn.close()
+    def subscribe(self, callback):
+        """
+        Registers callback(events) to be called with the list of DBEvents of every
+        committed transaction. It runs on the thread that committed.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _emit(self, event):
+        # Held until the outermost transaction commits; dropped if it rolls back
+        self._local.pending_events.append(event)
 
-    def add_game(self, title, platform, url, end_date=None, status="active", language=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _publish(self, events):
+        for callback in list(self._subscribers):
+            try:
+                callback(events)
+            except Exception as e:
+                print(f"DB change subscriber {callback} failed: {e}")
+
+    def connection(self):
+        """Returns the calling thread's long-lived connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly by transaction()
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.depth = 0
+            self._local.pending_events = []
+            with self._connections_lock:
+                for thread, other in list(self._connections.items()):
+                    if not thread.is_alive():
+                        other.close()
+                        del self._connections[thread]
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work on the calling thread's connection. Everything inside the block
+        commits together (or rolls back on an exception). Nested blocks become
+        savepoints of the outer one, so a whole refresh can be a single commit.
+        """
+        conn = self.connection()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+        events_before = len(self._local.pending_events)
+        conn.execute("BEGIN" if depth == 0 else f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
         try:
-            cursor.execute(
-                "INSERT INTO games (title, platform, url, end_date, status, language) VALUES (?, ?, ?, ?, ?, ?)",
-                (title, platform, url, end_date.isoformat() if end_date else None, status, language)
-            )
-        except sqlite3.IntegrityError:
-            pass  # Skip duplicates
-        conn.commit()
-        conn.close()
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            del self._local.pending_events[events_before:]
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        self._local.depth = depth
+        if depth > 0:
+            conn.execute(f"RELEASE {savepoint}")
+            return
+        conn.execute("COMMIT")
+        events, self._local.pending_events = self._local.pending_events, []
+        if events:
+            self._publish(events)
 
-    def mark_game_owned(self, title, platform, url="", acquisition_date=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, status FROM games WHERE title = ? AND platform = ?", (title, platform))
-        result = cursor.fetchone()
-        if result:
-            game_id, status = result
-            cursor.execute(
-                "UPDATE games SET status = 'owned', acquisition_date = ?, url = ? WHERE id = ?",
-                (acquisition_date or datetime.now().isoformat(), url, game_id)
+    def close(self):
+        """Closes every connection this manager has opened."""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def init_db(self):
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    platform TEXT,
+                    url TEXT,
+                    end_date TEXT,
+                    status TEXT,
+                    claim_date TEXT,
+                    epitaph TEXT,
+                    acquisition_date TEXT,
+                    price REAL,
+                    genre TEXT,
+                    language TEXT,
+                    playtime INTEGER,
+                    UNIQUE(title, platform, status)
+                )
+            """)
+            self.migrate(conn)
+
+    def migrate(self, conn):
+        """Applies every migration newer than the database's PRAGMA user_version."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target_version, steps in MIGRATIONS:
+            if target_version <= version:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {target_version}")
+            print(f"Database migrated to schema version {target_version}.")
+
+    def add_game(self, title, platform, url, end_date=None, status="active", language=None, acquisition_date=None):
+        with self.transaction() as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO games (title, platform, url, end_date, end_ts, status, language, acquisition_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (title, platform, url, end_date.isoformat() if end_date else None, end_date_to_ts(end_date),
+                     status, language, acquisition_date)
+                )
+                self._emit(DBEvent(GAME_INSERTED, status, title, platform))
+            except sqlite3.IntegrityError:
+                pass  # Skip duplicates
+
+    def upsert_games(self, games, status="active"):
+        """
+        Stores a batch of scraped FreeGame records with one executemany.
+        New games are inserted; known games only have a changed url or end_date rewritten.
+        Returns counts: {"inserted": n, "updated": n, "unchanged": n}.
+        """
+        # Last occurrence wins if a scrape lists the same game twice
+        rows = {
+            (game.title, game.platform): (
+                game.title,
+                game.platform,
+                game.url,
+                game.end_date.isoformat() if game.end_date else None,
+                end_date_to_ts(game.end_date),
+                status,
             )
-        else:
-            cursor.execute(
-                "INSERT INTO games (title, platform, url, status, acquisition_date) VALUES (?, ?, ?, ?, ?)",
-                (title, platform, url, "owned", acquisition_date or datetime.now().isoformat())
+            for game in games
+        }
+        with self.transaction() as conn:
+            rows_before = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+            changes_before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO games (title, platform, url, end_date, end_ts, status) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(title, platform, status) DO UPDATE SET
+                    url = excluded.url,
+                    end_date = COALESCE(excluded.end_date, games.end_date),
+                    end_ts = COALESCE(excluded.end_ts, games.end_ts)
+                WHERE games.url IS NOT excluded.url
+                   OR (excluded.end_date IS NOT NULL AND games.end_date IS NOT excluded.end_date)
+                """,
+                list(rows.values()),
             )
-        conn.commit()
-        conn.close()
+            changed = conn.total_changes - changes_before
+            inserted = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0] - rows_before
+            if changed:
+                self._emit(DBEvent(GAMES_UPSERTED, status, keys=tuple(rows)))
+        updated = changed - inserted
+        return {"inserted": inserted, "updated": updated, "unchanged": len(rows) - inserted - updated}
+
+    def mark_game_owned(self, title, platform, url="", acquisition_date=None):
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_GAME_BY_KEY, (title, platform))
+            result = cursor.fetchone()
+            if result:
+                game_id, status = result
+                cursor.execute(
+                    "UPDATE games SET status = 'owned', acquisition_date = ?, url = ? WHERE id = ?",
+                    (acquisition_date or datetime.now().isoformat(), url, game_id)
+                )
+                self._emit(DBEvent(STATUS_CHANGED, "owned", title, platform, old_status=status))
+            else:
+                cursor.execute(
+                    "INSERT INTO games (title, platform, url, status, acquisition_date) VALUES (?, ?, ?, ?, ?)",
+                    (title, platform, url, "owned", acquisition_date or datetime.now().isoformat())
+                )
+                self._emit(DBEvent(GAME_INSERTED, "owned", title, platform))
 
     def mark_game_claimed(self, url, claim_date=None):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            "UPDATE games SET status = 'claimed', claim_date = ? WHERE url = ?",
-            (claim_date or datetime.now().isoformat(), url)
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            claimed = conn.execute(SQL_CLAIMABLE_BY_URL, (url,)).fetchall()
+            conn.execute(SQL_CLAIM_BY_URL, (claim_date or datetime.now().isoformat(), url))
+            for title, platform, old_status in claimed:
+                self._emit(DBEvent(STATUS_CHANGED, "claimed", title, platform, old_status=old_status))
 
     def check_expirations(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        now_utc = datetime.now(timezone.utc) # Get current time in UTC, aware
+        """Marks every active game whose end_ts has passed as expired, in one UPDATE. Returns how many."""
+        now = int(time.time())
+        with self.transaction() as conn:
+            expiring = conn.execute(SQL_EXPIRING_KEYS, (now,)).fetchall()
+            if not expiring:
+                return 0
+            # A game that expired before and came back still has its old expired row, which
+            # would violate UNIQUE(title, platform, status). Drop it, but keep its price
+            # history on the row PriceHistory now resolves the game to (its lowest id).
+            stale = conn.execute(SQL_STALE_EXPIRED, (now,)).fetchall()
+            for old_id, title, platform in stale:
+                conn.execute("DELETE FROM games WHERE id = ?", (old_id,))
+                survivor = conn.execute(
+                    "SELECT MIN(id) FROM games WHERE title = ? AND platform = ?", (title, platform)
+                ).fetchone()[0]
+                conn.execute("UPDATE OR IGNORE price_history SET game_id = ? WHERE game_id = ?", (survivor, old_id))
+                conn.execute("DELETE FROM price_history WHERE game_id = ?", (old_id,))
+            conn.execute(SQL_EXPIRE, (*EPITAPHS, now))
+            for title, platform in expiring:
+                self._emit(DBEvent(STATUS_CHANGED, "expired", title, platform, old_status="active"))
+        return len(expiring)
 
-        cursor.execute("SELECT id, end_date FROM games WHERE status = 'active' AND end_date IS NOT NULL")
-        for game_id, end_date_str in cursor.fetchall():
-            try:
-                game_end_date_obj = datetime.fromisoformat(end_date_str)
-                # If the parsed datetime is naive, assume it's UTC and make it aware
-                if game_end_date_obj.tzinfo is None or game_end_date_obj.tzinfo.utcoffset(game_end_date_obj) is None:
-                    game_end_date_obj = game_end_date_obj.replace(tzinfo=timezone.utc)
-
-                if game_end_date_obj < now_utc:
-                    # Game has expired
-                    epitaph = random.choice([
-                        "Game Over: Unclaimed!",
-                        "Pixel Dust in the Wind...",
-                        "Lost in the Digital Abyss.",
-                        "No Respawn for This One!"
-                    ])
-                    cursor.execute(
-                        "UPDATE games SET status = 'expired', epitaph = ? WHERE id = ?",
-                        (epitaph, game_id)
-                    )
-            except ValueError:
-                print(f"Warning: Could not parse end_date string '{end_date_str}' for game ID {game_id}. Skipping expiration check for this game.")
-        conn.commit()
-        conn.close()
+    def get_expiring_games(self, hours=24):
+        """(platform, title, end_date, end_ts) of active games ending within `hours`, soonest first."""
+        now = int(time.time())
+        return self.connection().execute(SQL_EXPIRING_WITHIN, (now, now + int(hours * 3600))).fetchall()
+
+    def update_price(self, title, platform, price):
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                SQL_UPDATE_PRICE,
+                (price, title, platform, price),
+            )
+            if cursor.rowcount:
+                self._emit(DBEvent(PRICE_UPDATED, None, title, platform))
+
+    def update_genre(self, title, genre):
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                SQL_UPDATE_GENRE, (genre, title, genre)
+            )
+            if cursor.rowcount:
+                self._emit(DBEvent(GENRE_UPDATED, None, title))
+
+    def update_prices(self, prices):
+        """prices: iterable of (title, platform, price). Unchanged prices are not rewritten."""
+        with self.transaction() as conn:
+            # One cached statement per row, so the event can name exactly the games that changed
+            changed = [
+                (title, platform)
+                for title, platform, price in prices
+                if conn.execute(
+                    SQL_UPDATE_PRICE,
+                    (price, title, platform, price),
+                ).rowcount
+            ]
+            if changed:
+                self._emit(DBEvent(PRICE_UPDATED, None, keys=tuple(changed)))
+
+    def update_genres(self, genres):
+        """genres: iterable of (title, genre). Unchanged genres are not rewritten."""
+        with self.transaction() as conn:
+            changed = [
+                (title, None)
+                for title, genre in genres
+                if conn.execute(
+                    SQL_UPDATE_GENRE, (genre, title, genre)
+                ).rowcount
+            ]
+            if changed:
+                self._emit(DBEvent(GENRE_UPDATED, None, keys=tuple(changed)))
+
+    def update_playtimes(self, playtimes, platform="Steam"):
+        """playtimes: iterable of (title, hours)."""
+        with self.transaction() as conn:
+            changes_before = conn.total_changes
+            conn.executemany(
+                "UPDATE games SET playtime = ? WHERE title = ? AND platform = ?",
+                [(hours, title, platform) for title, hours in playtimes],
+            )
+            if conn.total_changes != changes_before:
+                self._emit(DBEvent(PLAYTIME_UPDATED, None, platform=platform))
+
+    def listing_columns(self, status):
+        """
+        SELECT list for a status listing. The status-specific columns come first, in the
+        positional order callers rely on (e.g. platform, title, claim_date), followed by
+        the rest of the record so callers never need a follow-up query per row.
+        """
+        leading = STATUS_COLUMNS[status]
+        return ", ".join(leading + [c for c in RECORD_COLUMNS if c not in leading])
 
     def get_games_by_status(self, status):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        results = []
-        try:
-            if status == "active":
-                cursor.execute("SELECT platform, title, url, end_date FROM games WHERE status = ?", (status,))
-                results = [(p, t, u, e) for p, t, u, e in cursor.fetchall()]
-            elif status == "claimed":
-                cursor.execute("SELECT platform, title, claim_date FROM games WHERE status = ?", (status,))
-                results = [(p, t, c) for p, t, c in cursor.fetchall()]
-            elif status == "expired":
-                cursor.execute("SELECT platform, title, epitaph FROM games WHERE status = ?", (status,))
-                results = [(p, t, e) for p, t, e in cursor.fetchall()]
-            elif status == "owned":
-                cursor.execute("SELECT platform, title, acquisition_date FROM games WHERE status = ?", (status,))
-                # Fetch claim_date as well to determine if an owned game was originally claimed
-                cursor.execute("SELECT platform, title, acquisition_date, claim_date FROM games WHERE status = ?", (status,))
-                results = [(p, t, a, c) for p, t, a, c in cursor.fetchall()]
-        finally:
-            conn.close()
-        return results
+        """Returns sqlite3.Row records (index- and name-addressable) for every game in a status."""
+        if status not in STATUS_COLUMNS:
+            return []
+        cursor = self.connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(SQL_GAMES_BY_STATUS.format(columns=self.listing_columns(status)), (status,))
+        return cursor.fetchall()
+
+    def get_games_by_keys(self, status, keys):
+        """
+        Like get_games_by_status(), restricted to the given (title, platform) pairs;
+        a platform of None matches every platform of that title.
+        """
+        keys = set(keys)
+        titles = list({title for title, _ in keys})
+        records = []
+        cursor = self.connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        for start in range(0, len(titles), _QUERY_CHUNK):
+            chunk = titles[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(
+                SQL_GAMES_BY_KEYS.format(columns=self.listing_columns(status), placeholders=placeholders),
+                (status, *chunk),
+            )
+            records.extend(
+                record for record in cursor.fetchall()
+                if (record["title"], record["platform"]) in keys or (record["title"], None) in keys
+            )
+        return records
 
     def get_status_counts(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT status, COUNT(*) FROM games GROUP BY status")
+        cursor = self.connection().execute(SQL_STATUS_COUNTS)
         counts = {status: count for status, count in cursor.fetchall()}
-        conn.close()
         return counts
@@ -0,0 +1,107 @@
+# embedding_store.py
+import threading
+from collections import OrderedDict
+import numpy as np
+from db_manager import DBManager
+
+# SQLite's default limit on bound parameters is 999; stay well under it
+_QUERY_CHUNK = 500
+
+
+class EmbeddingStore:
+    """
+    Persistent cache of title embeddings, keyed by (title, model version).
+
+    Vectors live as float32 BLOBs in the `embeddings` table of the games database and
+    the most recently used ones are also kept in memory. Entries for other model
+    versions are dropped when invalidate() is called (AIModule does so after training).
+    It is safe to share between threads; the model itself runs outside the lock.
+    """
+
+    def __init__(self, db_manager: DBManager, max_memory_items=10000):
+        self.db = db_manager
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()  # (title, model_version) -> np.ndarray, least recently used first
+        self._lock = threading.Lock()  # guards _memory and the counters
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key, vector):
+        # Callers hold self._lock
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _load(self, titles, model_version):
+        found = {}
+        conn = self.db.connection()
+        for start in range(0, len(titles), _QUERY_CHUNK):
+            chunk = titles[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for title, blob in conn.execute(
+                f"SELECT title, vector FROM embeddings WHERE model_version = ? AND title IN ({placeholders})",
+                (model_version, *chunk),
+            ):
+                found[title] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _save(self, vectors, model_version):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (title, model_version, vector) VALUES (?, ?, ?)",
+                [(title, model_version, vector.astype(np.float32).tobytes()) for title, vector in vectors.items()],
+            )
+
+    def get_many(self, titles, model_version, embed_fn):
+        """
+        Returns an array of shape (len(titles), dim) in the order of `titles`.
+        Only titles found neither in memory nor on disk are passed to
+        embed_fn(list_of_titles) -> array (n, dim), and their results are stored.
+        """
+        vectors = {}
+        missing = []
+        with self._lock:
+            for title in dict.fromkeys(titles):
+                key = (title, model_version)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[title] = vector
+                else:
+                    missing.append(title)
+
+        if missing:
+            loaded = self._load(missing, model_version)
+            with self._lock:
+                for title, vector in loaded.items():
+                    vectors[title] = vector
+                    self._remember((title, model_version), vector)
+            to_embed = [title for title in missing if title not in vectors]
+            with self._lock:
+                self.hits += len(vectors)
+                self.misses += len(to_embed)
+            if to_embed:
+                computed = {
+                    title: np.asarray(vector, dtype=np.float32)
+                    for title, vector in zip(to_embed, embed_fn(to_embed))
+                }
+                self._save(computed, model_version)
+                with self._lock:
+                    for title, vector in computed.items():
+                        vectors[title] = vector
+                        self._remember((title, model_version), vector)
+        else:
+            with self._lock:
+                self.hits += len(vectors)
+
+        return np.array([vectors[title] for title in titles])
+
+    def invalidate(self, keep_model_version=None):
+        """Drops every cached vector except those of `keep_model_version` (all if None)."""
+        with self._lock:
+            self._memory = OrderedDict(
+                (key, vector) for key, vector in self._memory.items() if key[1] == keep_model_version
+            )
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM embeddings WHERE model_version IS NOT ?", (keep_model_version,))
@@ -0,0 +1,214 @@
+# expiry_scheduler.py
+import heapq
+import itertools
+import threading
+import time
+from db_manager import DBManager, GAME_INSERTED, GAMES_UPSERTED, STATUS_CHANGED
+from notifications import Notifications
+
+EXPIRE = "expire"
+WARN = "warn"
+# Seconds before check_expirations() is retried after a failure (e.g. a locked database), doubling up to the max
+RETRY_DELAY = 5
+MAX_RETRY_DELAY = 300
+# SQLite's default limit on bound parameters is 999; stay well under it
+_QUERY_CHUNK = 500
+
+
+class ExpiryScheduler:
+    """
+    Expires deals and warns about them exactly when they are due, instead of waiting
+    for the next refresh.
+
+    A background thread keeps a heap of (fire time, game) entries built from the end_ts
+    of active games. It sleeps until the earliest one, then runs check_expirations()
+    (whose DB events redraw the GUI) or sends the "expires in N hours" warnings that
+    are due. Whenever games are inserted, upserted or change status, the end dates of
+    just those games are re-read and only new or moved deadlines are pushed (all active
+    end dates are read at start-up and after a bulk change that names no games); entries
+    for games that are gone or moved are skipped when they come up. Sent warnings are
+    recorded in the `expiry_warnings` table, so a restart does not send them again.
+    """
+
+    def __init__(self, db_manager: DBManager, notifications: Notifications | None = None, warn_hours=(24,)):
+        self.db = db_manager
+        self.notifications = notifications
+        self.warn_hours = tuple(warn_hours)
+        self._heap = []  # (fire_at, seq, kind, (title, platform), end_ts, hours)
+        self._seq = itertools.count()  # tie-breaker so heap entries never compare keys
+        self._deadlines = {}  # (title, platform) -> end_ts of every active game with an end date
+        self._warned = None  # (title, platform, end_ts, hours) already announced; loaded by the first _sync()
+        self._cond = threading.Condition()
+        self._dirty = True  # all deadlines must be re-read from the database
+        self._dirty_keys = set()  # (title, platform) whose deadline must be re-read
+        self._retry_delay = RETRY_DELAY
+        self._stopped = False
+        self._thread = None
+        self.expired = 0
+        self.warnings = 0
+
+    def start(self):
+        self.db.subscribe(self._on_db_events)
+        self._thread = threading.Thread(target=self._run, name="expiry-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.db.unsubscribe(self._on_db_events)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def next_due(self):
+        """Epoch seconds of the earliest pending entry, or None."""
+        heap = self._heap
+        return heap[0][0] if heap else None
+
+    def _on_db_events(self, events):
+        # Runs on the committing thread; the resync itself happens on the scheduler thread
+        keys, full = set(), False
+        for event in events:
+            if event.kind not in (GAME_INSERTED, GAMES_UPSERTED, STATUS_CHANGED):
+                continue
+            if event.keys:
+                keys.update(event.keys)
+            elif event.title is not None:
+                keys.add((event.title, event.platform))
+            else:
+                full = True
+        if keys or full:
+            with self._cond:
+                self._dirty = self._dirty or full
+                self._dirty_keys.update(keys)
+                self._cond.notify()
+
+    def _push(self, fire_at, kind, key, end_ts, hours=None):
+        heapq.heappush(self._heap, (fire_at, next(self._seq), kind, key, end_ts, hours))
+
+    def _schedule(self, key, end_ts):
+        # check_expirations() expires end_ts < now, so fire just after it
+        self._push(end_ts + 1, EXPIRE, key, end_ts)
+        for hours in self.warn_hours:
+            self._push(end_ts - hours * 3600, WARN, key, end_ts, hours)
+
+    def _sync(self):
+        """Re-reads the end dates of every active game."""
+        rows = self.db.connection().execute(
+            "SELECT title, platform, end_ts FROM games WHERE status = 'active' AND end_ts IS NOT NULL"
+        ).fetchall()
+        deadlines = {(title, platform): end_ts for title, platform, end_ts in rows}
+        if self._warned is None:
+            with self.db.transaction() as conn:
+                # Markers of deals that have ended can never match again
+                conn.execute("DELETE FROM expiry_warnings WHERE end_ts < ?", (int(time.time()),))
+                self._warned = set(conn.execute("SELECT title, platform, end_ts, hours FROM expiry_warnings"))
+        for key, end_ts in deadlines.items():
+            if self._deadlines.get(key) != end_ts:
+                self._schedule(key, end_ts)
+        self._deadlines = deadlines
+        self._warned = {marker for marker in self._warned if deadlines.get(marker[:2]) == marker[2]}
+        self._compact()
+
+    def _sync_keys(self, keys):
+        """Re-reads the end dates of the given (title, platform) games only."""
+        titles = list({title for title, _ in keys})
+        found = {}
+        conn = self.db.connection()
+        for start in range(0, len(titles), _QUERY_CHUNK):
+            chunk = titles[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for title, platform, end_ts in conn.execute(
+                f"SELECT title, platform, end_ts FROM games "
+                f"WHERE status = 'active' AND end_ts IS NOT NULL AND title IN ({placeholders})",
+                chunk,
+            ):
+                if (title, platform) in keys:
+                    found[(title, platform)] = end_ts
+        for key in keys:
+            end_ts = found.get(key)
+            if self._deadlines.get(key) == end_ts:
+                continue
+            if end_ts is None:
+                self._deadlines.pop(key, None)
+            else:
+                self._deadlines[key] = end_ts
+                self._schedule(key, end_ts)
+            self._warned = {marker for marker in self._warned if marker[:2] != key}
+        self._compact()
+
+    def _compact(self):
+        # Drop stale entries once they dominate the heap
+        deadlines = self._deadlines
+        if len(self._heap) > 4 * len(deadlines) * (1 + len(self.warn_hours)) + 64:
+            self._heap = [entry for entry in self._heap if deadlines.get(entry[3]) == entry[4]]
+            heapq.heapify(self._heap)
+
+    def _fire(self, due, now):
+        live = [entry for entry in due if self._deadlines.get(entry[3]) == entry[4]]
+        expiring = [entry for entry in live if entry[2] == EXPIRE]
+        if expiring:
+            try:
+                # One set-based UPDATE also catches any other game due at the same moment
+                self.expired += self.db.check_expirations()
+                self._retry_delay = RETRY_DELAY
+            except Exception as e:
+                # The popped entries are not pushed again by a resync (their deadline did not move)
+                print(f"Expiry scheduler: expiring games failed ({e}); retrying in {self._retry_delay}s.")
+                for _, _, kind, key, end_ts, hours in expiring:
+                    self._push(now + self._retry_delay, kind, key, end_ts, hours)
+                self._retry_delay = min(self._retry_delay * 2, MAX_RETRY_DELAY)
+        warnings = []
+        markers = []
+        for _, _, kind, (title, platform), end_ts, hours in live:
+            marker = (title, platform, end_ts, hours)
+            if kind == WARN and end_ts > now and marker not in self._warned:
+                self._warned.add(marker)
+                markers.append(marker)
+                left = end_ts - now
+                left_text = f"{round(left / 3600)}h" if left >= 3600 else f"{max(1, round(left / 60))} min"
+                warnings.append(f"{title} on {platform} expires in {left_text}")
+        if markers:
+            try:
+                with self.db.transaction() as conn:
+                    conn.executemany("INSERT OR IGNORE INTO expiry_warnings VALUES (?, ?, ?, ?)", markers)
+            except Exception as e:
+                # Still announce them; at worst a restart repeats these warnings
+                print(f"Expiry scheduler: recording sent warnings failed ({e}).")
+        if warnings and self.notifications is not None:
+            self.warnings += len(warnings)
+            self.notifications.send_desktop_notification("Expiring Free Games", "\n".join(warnings))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                dirty, self._dirty = self._dirty, False
+                dirty_keys, self._dirty_keys = self._dirty_keys, set()
+            try:
+                if dirty:
+                    self._sync()
+                elif dirty_keys:
+                    self._sync_keys(dirty_keys)
+            except Exception as e:
+                print(f"Expiry scheduler: reading end dates failed ({e}); retrying in {RETRY_DELAY}s.")
+                with self._cond:
+                    self._dirty = self._dirty or dirty
+                    self._dirty_keys |= dirty_keys
+                    self._cond.wait(RETRY_DELAY)
+                continue
+            try:
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap))
+                if due:
+                    self._fire(due, now)
+            except Exception as e:
+                print(f"Expiry scheduler error: {e}")
+            with self._cond:
+                if self._stopped or self._dirty or self._dirty_keys:
+                    continue
+                next_due = self.next_due()
+                self._cond.wait(None if next_due is None else max(0.0, next_due - time.time()))
@@ -1,7 +1,6 @@
 # export_backup.py
 import csv
 import json
-import sqlite3
 from db_manager import DBManager
 
 
@@ -12,20 +11,14 @@ class ExportBackup:
     def export_to_csv(self, filename="games_export.csv"):
         games = []
         for status in ["active", "claimed", "owned", "expired"]:
-            games.extend([(status, *g) for g in self.db.get_games_by_status(status)])
+            games.extend([(status, g) for g in self.db.get_games_by_status(status)])
         with open(filename, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(["Status", "Platform", "Title", "Detail", "Price", "Genre"])
-            for game in games:
-                status, platform, title, detail = game[:4]
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT price, genre FROM games WHERE title = ? AND platform = ?",
-                    (title, platform),
-                )
-                price, genre = cursor.fetchone()
-                conn.close()
+            for status, game in games:
+                platform, title, detail = game[:3]
+                # Status listings carry the full record, so price and genre need no extra query
+                price, genre = game["price"], game["genre"]
                 writer.writerow(
                     [status, platform, title, detail, price or "", genre or ""]
                 )
@@ -1,23 +1,26 @@
 # game_filter.py
-from db_manager import DBManager
-from typing import List, Tuple, Optional
+from db_manager import DBManager, STATUS_COLUMNS, SQL_GAMES_BY_STATUS
+from typing import List, Optional, Tuple
 import sqlite3
 
 class GameFilter:
     def __init__(self, db_manager: DBManager):
         self.db = db_manager
 
-    def filter_games(self, status: str, platform: Optional[str] = None, genre: Optional[str] = None, search_term: Optional[str] = None) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
-        # Determine the correct date/detail column based on status
-        detail_column = 'end_date' # Default for active
-        if status == 'claimed':
-            detail_column = 'claim_date'
-        elif status == 'expired':
-            detail_column = 'epitaph'
-        elif status == 'owned': # Though 'owned' status is usually handled differently for display
-            detail_column = 'acquisition_date'
+    def filter_games(self, status: str, platform: Optional[str] = None, genre: Optional[str] = None, search_term: Optional[str] = None) -> List[sqlite3.Row]:
+        # Same full records as DBManager.get_games_by_status (platform, title, detail..., url, price, genre, ...)
+        if status not in STATUS_COLUMNS:
+            return []
+        query, params = self.filter_query(status, platform, genre, search_term)
+        cursor = self.db.connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        return results
 
-        query = f"SELECT platform, title, {detail_column} FROM games WHERE status = ?"
+    def filter_query(self, status: str, platform: Optional[str] = None, genre: Optional[str] = None, search_term: Optional[str] = None) -> Tuple[str, list]:
+        """The (SQL, parameters) filter_games() runs; benchmarks/query_plans.py checks its plan."""
+        query = SQL_GAMES_BY_STATUS.format(columns=self.db.listing_columns(status))
         params = [status]
         if platform:
             query += " AND platform = ?"
@@ -32,10 +35,4 @@ class GameFilter:
         if status == "active":
             # Ensure active games listed are not already in the owned 'Trophy Case'
             query += " AND NOT EXISTS (SELECT 1 FROM games g2 WHERE g2.title = games.title AND g2.platform = games.platform AND g2.status = 'owned')"
-
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return query, params
@@ -0,0 +1,155 @@
+# game_table.py
+from ttkbootstrap import Button, Frame
+import ttkbootstrap as ttk
+
+
+def format_price(value):
+    return f"${value:.2f}" if value else "N/A"
+
+
+def format_text(value, default="N/A"):
+    return value if value else default
+
+
+class GameTable(Frame):
+    """
+    Table of game records backed by a single ttk.Treeview.
+
+    Unlike a grid of Label widgets, Tk only draws the rows that are visible, so the
+    table stays responsive with thousands of games. Rows are keyed by the game's
+    database id and set_rows() applies only the difference to what is on screen.
+    Clicking a heading sorts by that column; action buttons act on the selected row.
+    """
+
+    def __init__(self, master, columns, actions=(), row_image=None, height=15, **kwargs):
+        """
+        columns: list of (key, heading, width, formatter). `key` names a field of the
+            record; formatter (or None) turns its raw value into display text.
+        actions: list of (button text, callback(record), bootstyle).
+        row_image: optional image shown at the start of every row.
+        """
+        super().__init__(master, **kwargs)
+        self.columns = columns
+        self.row_image = row_image
+        self._records = {}  # iid -> record currently shown
+        self._shown_values = {}  # iid -> display values, to skip no-op updates
+        self._sort_key = None
+        self._sort_reverse = False
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=[key for key, _, _, _ in columns],
+            show="tree headings" if row_image else "headings",
+            height=height,
+            selectmode="browse",
+            bootstyle="info",  # type: ignore
+        )
+        if row_image:
+            self.tree.column("#0", width=32, stretch=False)
+        for key, heading, width, _ in columns:
+            self.tree.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width, anchor="w")
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.action_buttons = []
+        if actions:
+            action_frame = Frame(self)
+            action_frame.grid(row=1, column=0, columnspan=2, pady=5, sticky="w")
+            for index, (text, callback, bootstyle) in enumerate(actions):
+                button = Button(
+                    action_frame,
+                    text=text,
+                    command=lambda cb=callback: self._run_action(cb),
+                    bootstyle=bootstyle,  # type: ignore
+                    state="disabled",
+                )
+                button.grid(row=0, column=index, padx=5)
+                self.action_buttons.append(button)
+            # Double-clicking a row runs the first action
+            self.tree.bind("<Double-1>", lambda _event: self._run_action(actions[0][1]))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    def _values(self, record):
+        values = []
+        for key, _, _, formatter in self.columns:
+            raw = record[key]
+            values.append(formatter(raw) if formatter else ("" if raw is None else raw))
+        return tuple(str(v) for v in values)
+
+    def set_rows(self, records):
+        """Makes the table show exactly `records`, touching only rows that changed."""
+        incoming = {str(record["id"]): record for record in records}
+        for iid in [iid for iid in self._records if iid not in incoming]:
+            self.tree.delete(iid)
+            del self._records[iid]
+            del self._shown_values[iid]
+        for iid, record in incoming.items():
+            values = self._values(record)
+            if iid not in self._records:
+                self.tree.insert("", "end", iid=iid, values=values, image=self.row_image or "")
+            elif self._shown_values[iid] != values:
+                self.tree.item(iid, values=values)
+            self._records[iid] = record
+            self._shown_values[iid] = values
+        if self._sort_key:
+            self._apply_sort()
+        self._on_select()
+
+    def update_rows(self, records):
+        """Refreshes the shown rows among `records` in place; records not on screen are ignored."""
+        changed = False
+        for record in records:
+            iid = str(record["id"])
+            if iid not in self._records:
+                continue
+            values = self._values(record)
+            if self._shown_values[iid] != values:
+                self.tree.item(iid, values=values)
+                self._shown_values[iid] = values
+                changed = True
+            self._records[iid] = record
+        if changed and self._sort_key:
+            self._apply_sort()
+
+    def sort_by(self, key):
+        """Sorts by `key`; clicking the same heading again reverses the order."""
+        self._sort_reverse = not self._sort_reverse if self._sort_key == key else False
+        self._sort_key = key
+        self._apply_sort()
+
+    def _apply_sort(self):
+        def sort_value(iid):
+            # Numbers numerically, everything else by text
+            value = self._records[iid][self._sort_key]
+            if isinstance(value, (int, float)):
+                return (value, "")
+            return (0, str(value).lower())
+
+        # Empty values sort last in either direction
+        empty = [iid for iid in self._records if self._records[iid][self._sort_key] is None]
+        filled = [iid for iid in self._records if self._records[iid][self._sort_key] is not None]
+        ordered = sorted(filled, key=sort_value, reverse=self._sort_reverse) + empty
+        for index, iid in enumerate(ordered):
+            self.tree.move(iid, "", index)
+
+    def selected_record(self):
+        selection = self.tree.selection()
+        return self._records.get(selection[0]) if selection else None
+
+    def _on_select(self, _event=None):
+        state = "normal" if self.selected_record() is not None else "disabled"
+        for button in self.action_buttons:
+            button.configure(state=state)
+
+    def _run_action(self, callback):
+        record = self.selected_record()
+        if record is not None:
+            callback(record)
+
+    def __len__(self):
+        return len(self._records)
@@ -1,16 +1,16 @@
-import aiohttp
+from http_client import shared_client
+from browser_pool import shared_browser
 import asyncio
-from bs4 import BeautifulSoup
+from html_parser import parse_html
 import json
 import re
 from datetime import datetime
-from playwright.async_api import async_playwright
 
 
 async def scrape_epic_games():
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            "https://store-site-backend-static-ipv4.ak.epicgames.com/freeGamesPromotions?locale=en-US&country=US&allowCountries=US"
+    async with shared_client.session() as session:
+        async with shared_client.request(
+            "GET", "https://store-site-backend-static-ipv4.ak.epicgames.com/freeGamesPromotions?locale=en-US&country=US&allowCountries=US", session=session
         ) as resp:
             data = await resp.json()
             samples = []
@@ -78,10 +78,10 @@ async def scrape_epic_games():
 
 
 async def scrape_amazon_prime():
-    async with aiohttp.ClientSession() as session:
-        async with session.get("https://gaming.amazon.com/home") as resp:
+    async with shared_client.session() as session:
+        async with shared_client.request("GET", "https://gaming.amazon.com/home", session=session) as resp:
             html = await resp.text()
-            soup = BeautifulSoup(html, "html.parser")
+            soup = parse_html(html)  # two different card selectors, so the whole page
             samples = []
             for div in soup.select("div[data-a-target='offer-card']"):
                 if "Free with Prime" in div.text:
@@ -126,9 +126,9 @@ async def scrape_amazon_prime():
 
 
 async def scrape_gog():
-    async with aiohttp.ClientSession() as session:
-        async with session.get("https://www.gog.com/en/games?priceRange=0,0") as resp:
-            soup = BeautifulSoup(await resp.text(), "html.parser")
+    async with shared_client.session() as session:
+        async with shared_client.request("GET", "https://www.gog.com/en/games?priceRange=0,0", session=session) as resp:
+            soup = parse_html(await resp.text(), "div", class_="product-tile")
             samples = []
             for div in soup.select("div.product-tile"):
                 if "Free" in div.text:
@@ -155,11 +155,11 @@ async def scrape_gog():
 
 
 async def scrape_steam_non_free():
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            "https://store.steampowered.com/search/?sort_by=Released_DESC"
+    async with shared_client.session() as session:
+        async with shared_client.request(
+            "GET", "https://store.steampowered.com/search/?sort_by=Released_DESC", session=session
         ) as resp:
-            soup = BeautifulSoup(await resp.text(), "html.parser")
+            soup = parse_html(await resp.text(), "div", class_="search_result_row")
             samples = []
             for div in soup.select("div.search_result_row")[:10]:
                 title = (
@@ -186,73 +186,69 @@ async def scrape_steam_non_free():
 
 
 async def scrape_ubisoft():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        try:
-            await page.goto("https://store.ubi.com/us/free-games", timeout=30000)
-            await page.wait_for_load_state("networkidle", timeout=30000)
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
-            samples = []
-            for div in soup.select("div.product-tile"):
-                if "Free" in div.text.lower():
-                    title = (
-                        div.find("h3").text.strip()
-                        if div.find("h3")
-                        else "Unknown Game"
-                    )
-                    url = div.find("a")["href"] if div.find("a") else ""
-                    if not url.startswith("http"):
-                        url = f"https://store.ubi.com{url}"
-                    text = f"Free on Ubisoft: {title} {url}"
+    try:
+        # Rendered by the shared warm browser instead of launching Chromium per call
+        content = await shared_browser.get_content(
+            "https://store.ubi.com/us/free-games", wait_for_selector="div.product-tile", timeout=30
+        )
+        soup = parse_html(content, "div", class_="product-tile")
+        samples = []
+        for div in soup.select("div.product-tile"):
+            if "Free" in div.text.lower():
+                title = (
+                    div.find("h3").text.strip()
+                    if div.find("h3")
+                    else "Unknown Game"
+                )
+                url = div.find("a")["href"] if div.find("a") else ""
+                if not url.startswith("http"):
+                    url = f"https://store.ubi.com{url}"
+                text = f"Free on Ubisoft: {title} {url}"
+                samples.append(
+                    {
+                        "text": text,
+                        "labels": {
+                            "is_free": 1,
+                            "title": title,
+                            "url": url,
+                            "end_date": "",
+                        },
+                    }
+                )
+            else:
+                title = (
+                    div.find("h3").text.strip()
+                    if div.find("h3")
+                    else "Unknown Game"
+                )
+                price = div.find("span", class_="price") or div.find(
+                    "span", class_="amount"
+                )
+                if price and "Free" not in price.text:
+                    text = f"{title} for {price.text.strip()}"
                     samples.append(
                         {
                             "text": text,
                             "labels": {
-                                "is_free": 1,
+                                "is_free": 0,
                                 "title": title,
-                                "url": url,
+                                "url": "",
                                 "end_date": "",
                             },
                         }
                     )
-                else:
-                    title = (
-                        div.find("h3").text.strip()
-                        if div.find("h3")
-                        else "Unknown Game"
-                    )
-                    price = div.find("span", class_="price") or div.find(
-                        "span", class_="amount"
-                    )
-                    if price and "Free" not in price.text:
-                        text = f"{title} for {price.text.strip()}"
-                        samples.append(
-                            {
-                                "text": text,
-                                "labels": {
-                                    "is_free": 0,
-                                    "title": title,
-                                    "url": "",
-                                    "end_date": "",
-                                },
-                            }
-                        )
-            print(f"scrape_ubisoft: {len(samples)} samples")
-            return samples
-        except Exception as e:
-            print(f"Error in scrape_ubisoft: {e}")
-            return []
-        finally:
-            await browser.close()
+        print(f"scrape_ubisoft: {len(samples)} samples")
+        return samples
+    except Exception as e:
+        print(f"Error in scrape_ubisoft: {e}")
+        return []
 
 
 async def scrape_itch_io():
-    async with aiohttp.ClientSession() as session:
+    async with shared_client.session() as session:
         try:
-            async with session.get("https://itch.io/games/free") as resp:
-                soup = BeautifulSoup(await resp.text(), "html.parser")
+            async with shared_client.request("GET", "https://itch.io/games/free", session=session) as resp:
+                soup = parse_html(await resp.text(), "div", class_="game_cell")
                 samples = []
                 for div in soup.select("div.game_cell"):
                     price = div.find("span", class_="price_value")
@@ -287,10 +283,10 @@ async def scrape_itch_io():
 
 
 async def scrape_indiegala():
-    async with aiohttp.ClientSession() as session:
+    async with shared_client.session() as session:
         try:
-            async with session.get("https://www.indiegala.com/freebies") as resp:
-                soup = BeautifulSoup(await resp.text(), "html.parser")
+            async with shared_client.request("GET", "https://www.indiegala.com/freebies", session=session) as resp:
+                soup = parse_html(await resp.text(), "div", class_="product-box")
                 samples = []
                 for div in soup.select("div.product-box"):
                     if "Free" in div.text.lower():
@@ -320,12 +316,12 @@ async def scrape_indiegala():
 
 
 async def scrape_humble_bundle():
-    async with aiohttp.ClientSession() as session:
+    async with shared_client.session() as session:
         try:
-            async with session.get(
-                "https://www.humblebundle.com/store/free-games"
+            async with shared_client.request(
+                "GET", "https://www.humblebundle.com/store/free-games", session=session
             ) as resp:
-                soup = BeautifulSoup(await resp.text(), "html.parser")
+                soup = parse_html(await resp.text(), "div", class_="product-card")
                 samples = []
                 for div in soup.select("div.product-card"):
                     if "Free" in div.text.lower():
@@ -355,35 +351,32 @@ async def scrape_humble_bundle():
 
 
 async def scrape_microsoft_store():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.goto("https://www.microsoft.com/en-us/store/b/free-games")
-        await page.wait_for_load_state("networkidle")
-        content = await page.content()
-        soup = BeautifulSoup(content, "html.parser")
-        samples = []
-        for div in soup.select("div.card"):
-            if "Free" in div.text.lower():
-                title = (
-                    div.find("h3").text.strip() if div.find("h3") else "Unknown Game"
-                )
-                url = div.find("a")["href"] if div.find("a") else ""
-                text = f"Free on Microsoft: {title} {url}"
-                samples.append(
-                    {
-                        "text": text,
-                        "labels": {
-                            "is_free": 1,
-                            "title": title,
-                            "url": url,
-                            "end_date": "",
-                        },
-                    }
-                )
-        await browser.close()
-        print(f"scrape_microsoft_store: {len(samples)} samples")
-        return samples
+    # Rendered by the shared warm browser instead of launching Chromium per call
+    content = await shared_browser.get_content(
+        "https://www.microsoft.com/en-us/store/b/free-games", wait_for_selector="div.card", timeout=30
+    )
+    soup = parse_html(content, "div", class_="card")
+    samples = []
+    for div in soup.select("div.card"):
+        if "Free" in div.text.lower():
+            title = (
+                div.find("h3").text.strip() if div.find("h3") else "Unknown Game"
+            )
+            url = div.find("a")["href"] if div.find("a") else ""
+            text = f"Free on Microsoft: {title} {url}"
+            samples.append(
+                {
+                    "text": text,
+                    "labels": {
+                        "is_free": 1,
+                        "title": title,
+                        "url": url,
+                        "end_date": "",
+                    },
+                }
+            )
+    print(f"scrape_microsoft_store: {len(samples)} samples")
+    return samples
 
 
 async def scrape_x_posts():
@@ -433,12 +426,14 @@ async def generate_dataset(output_file="dataset.jsonl"):
         scrape_x_posts,
     ]
 
-    for scraper in scrapers:
-        try:
-            scraper_samples = await scraper()
-            samples.extend(scraper_samples)
-        except Exception as e:
-            print(f"Error in {scraper.__name__}: {e}")
+    # Keep one pooled session open so the scrapers reuse connections
+    async with shared_client.cycle():
+        for scraper in scrapers:
+            try:
+                scraper_samples = await scraper()
+                samples.extend(scraper_samples)
+            except Exception as e:
+                print(f"Error in {scraper.__name__}: {e}")
 
     manual_samples = [
         {
@@ -480,3 +475,4 @@ async def generate_dataset(output_file="dataset.jsonl"):
 
 if __name__ == "__main__":
     asyncio.run(generate_dataset())
+    shared_browser.close()
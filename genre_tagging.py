@@ -1,12 +1,13 @@
 # genre_tagging.py
 from db_manager import DBManager
-import sqlite3 # Import for database operations
 
 class GenreTagging:
     def __init__(self, db_manager: DBManager):
         self.db = db_manager
 
-    def tag_game(self, title, description):
+    @staticmethod
+    def genres_for(description):
+        """Comma-separated genres found in `description` by keyword, or "" if none."""
         # The AIModule's parse_text method no longer extracts genres.
         # It's now focused on "is_free" classification and providing embeddings.
         # Genre tagging would require a different approach:
@@ -17,8 +18,7 @@ class GenreTagging:
         # We will implement a simple keyword-based approach.
 
         found_genres = []
-        if not description: # Handle cases where description might be None or empty
-            print(f"No description provided for '{title}', cannot tag genres.")
+        if not description:
             return ""
 
         description_lower = description.lower()
@@ -39,11 +39,15 @@ class GenreTagging:
         if "simulation" in description_lower:
             found_genres.append("Simulation")
 
-        genre_str = ",".join(list(set(found_genres))) # Use set to avoid duplicate genres
+        return ",".join(sorted(set(found_genres))) # Use set to avoid duplicate genres; sorted so re-tagging is stable
+
+    def tag_game(self, title, description):
+        if not description: # Handle cases where description might be None or empty
+            print(f"No description provided for '{title}', cannot tag genres.")
+            return ""
+
+        genre_str = self.genres_for(description)
         if genre_str:
-            conn = sqlite3.connect(self.db.db_path)
-            conn.execute("UPDATE games SET genre = ? WHERE title = ?", (genre_str, title))
-            conn.commit()
-            conn.close()
+            self.db.update_genre(title, genre_str)
             print(f"Tagged '{title}' with genres: {genre_str}")
         return genre_str
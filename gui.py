@@ -3,12 +3,11 @@ import tkinter as tk
 from tkinter import simpledialog, messagebox # Added simpledialog and messagebox
 from ttkbootstrap import Style, Notebook, Button, Label, Entry, Frame # Removed Window
 import ttkbootstrap as ttk
-import sqlite3
 import asyncio
 import threading
 import webbrowser
 from PIL import Image, ImageTk
-from db_manager import DBManager
+from db_manager import DBManager, GAME_INSERTED, GAMES_UPSERTED, STATUS_CHANGED, PRICE_UPDATED, GENRE_UPDATED, SQL_GAME_BY_URL
 from owned_games import OwnedGames
 from game_filter import GameFilter
 from notifications import Notifications
@@ -20,7 +19,9 @@ from cloud_sync import CloudSync
 from genre_tagging import GenreTagging
 from multi_language import MultiLanguage
 from analytics import Analytics
-from scraper import FreeGame # For type hinting
+from refresh_pipeline import RefreshPipeline
+from http_client import shared_client
+from game_table import GameTable, format_price, format_text
 
 
 class FreeGamesGUI:
@@ -55,6 +56,13 @@ class FreeGamesGUI:
         self.multi_language = multi_language
         self.analytics = analytics
         self.scraper = scraper # Store scraper instance
+        # Pending DB changes not yet drawn (see _queue_db_events)
+        self._dirty_statuses = set()
+        self._dirty_keys = set()  # (title, platform) of price/genre changes, patched row by row
+        self._value_dirty = False  # prices changed, so the status bar total is stale
+        self._recommendations_dirty = False
+        self._pending_redraw = False
+        self._waiting_for_model = False  # polling for a lazily loaded AI model
         self.root.title("Free Games Arcade")
         Style("cyborg")
         self.root.geometry("1000x700")
@@ -94,30 +102,11 @@ class FreeGamesGUI:
         self.notebook.add(self.recommend_tab, text="Recommendations")
         self.notebook.add(self.stats_tab, text="Stats")
         self.notebook.pack(expand=True, fill="both")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         # Active Games Table
-        self.active_headers = [
-            "Platform",
-            "Title",
-            "Claim",
-            "Mark Owned",
-            "End Date",
-            "Price",
-            "Genre",
-        ]
-        self.active_labels = [
-            Label(
-                self.active_tab,
-                text=h,
-                font=("Press Start 2P", 10),
-                foreground="#FF69B4",
-            )
-            for h in self.active_headers
-        ]
-        for i, label in enumerate(self.active_labels):
-            label.grid(row=0, column=i, padx=5, pady=5, sticky="w")
         self.active_filter_frame = Frame(self.active_tab)
-        self.active_filter_frame.grid(row=1, column=0, columnspan=7, pady=5)
+        self.active_filter_frame.grid(row=0, column=0, pady=5)
         Label(self.active_filter_frame, text="Search:", foreground="#FFFFFF").grid(
             row=0, column=0
         )
@@ -149,68 +138,92 @@ class FreeGamesGUI:
             command=self.update_active_gui,
             bootstyle="info-outline",  # type: ignore
         ).grid(row=0, column=6, padx=5)
+        self.active_table = GameTable(
+            self.active_tab,
+            columns=[
+                ("platform", "Platform", 120, None),
+                ("title", "Title", 320, None),
+                ("end_date", "End Date", 200, lambda e: e or "Unknown"),
+                ("price", "Price", 80, format_price),
+                ("genre", "Genre", 140, format_text),
+            ],
+            actions=[
+                ("Claim", lambda game: self.claim_game(game["url"]), "info-outline"),
+                ("Mark Owned", lambda game: self.mark_owned(game["title"], game["platform"], game["url"]), "warning-outline"),
+            ],
+        )
+        self.active_table.grid(row=1, column=0, sticky="nsew")
+        self.active_tab.rowconfigure(1, weight=1)
+        self.active_tab.columnconfigure(0, weight=1)
 
         # Claimed Games Table
-        self.claimed_headers = ["Platform", "Title", "Claim Date", "Price", "Genre"]
-        self.claimed_labels = [
-            Label(
-                self.claimed_tab,
-                text=h,
-                font=("Press Start 2P", 10),
-                foreground="#00FF00",
-            )
-            for h in self.claimed_headers
-        ]
-        for i, label in enumerate(self.claimed_labels):
-            label.grid(row=0, column=i, padx=5, pady=5, sticky="w")
         Label(
             self.claimed_tab,
             text="Mission Complete",
             font=("Orbitron", 14),
             foreground="#00FF00",
-        ).grid(row=1, column=0, columnspan=5, pady=5)
+        ).grid(row=0, column=0, pady=5)
+        self.claimed_table = GameTable(
+            self.claimed_tab,
+            columns=[
+                ("platform", "Platform", 120, None),
+                ("title", "Title", 320, None),
+                ("claim_date", "Claim Date", 200, None),
+                ("price", "Price", 80, format_price),
+                ("genre", "Genre", 140, format_text),
+            ],
+        )
+        self.claimed_table.grid(row=1, column=0, sticky="nsew")
+        self.claimed_tab.rowconfigure(1, weight=1)
+        self.claimed_tab.columnconfigure(0, weight=1)
 
         # Expired Games Table
-        self.expired_headers = ["Platform", "Title", "Epitaph", "Price", "Genre"]
-        self.expired_labels = [
-            Label(
-                self.expired_tab,
-                text=h,
-                font=("Press Start 2P", 10),
-                foreground="#FF4500",
-            )
-            for h in self.expired_headers
-        ]
-        for i, label in enumerate(self.expired_labels):
-            label.grid(row=0, column=i, padx=5, pady=5, sticky="w")
         Label(
             self.expired_tab,
             text="Missed Opportunities",
             font=("Orbitron", 14),
             foreground="#FF4500",
-        ).grid(row=1, column=0, columnspan=5, pady=5)
+        ).grid(row=0, column=0, pady=5)
+        self.expired_table = GameTable(
+            self.expired_tab,
+            columns=[
+                ("platform", "Platform", 120, None),
+                ("title", "Title", 320, None),
+                ("epitaph", "Epitaph", 220, None),
+                ("price", "Price", 80, format_price),
+                ("genre", "Genre", 140, format_text),
+            ],
+        )
+        self.expired_table.grid(row=1, column=0, sticky="nsew")
+        self.expired_tab.rowconfigure(1, weight=1)
+        self.expired_tab.columnconfigure(0, weight=1)
 
         # Owned Games Table
-        self.owned_headers = ["Platform", "Title", "Acquisition Date", "Price", "Genre", "Origin"]
-        self.owned_labels = [
-            Label(
-                self.owned_tab,
-                text=h,
-                font=("Press Start 2P", 10),
-                foreground="#FFD700",
-            )
-            for h in self.owned_headers
-        ]
-        for i, label in enumerate(self.owned_labels):
-            label.grid(row=0, column=i, padx=5, pady=5, sticky="w")
         Label(
             self.owned_tab,
             text="Your Epic Collection",
             font=("Orbitron", 14),
             foreground="#FFD700",
-        ).grid(row=1, column=0, columnspan=len(self.owned_headers), pady=5) # Adjusted columnspan
+        ).grid(row=0, column=0, pady=5)
+        self.owned_table = GameTable(
+            self.owned_tab,
+            columns=[
+                ("platform", "Platform", 120, None),
+                ("title", "Title", 300, None),
+                ("acquisition_date", "Acquisition Date", 180, None),
+                ("price", "Price", 80, format_price),
+                ("genre", "Genre", 120, format_text),
+                # An owned game with a claim_date was originally claimed for free
+                ("claim_date", "Origin", 110, lambda c: "Claimed Free" if c else "Purchased"),
+            ],
+            row_image=self.gamepad_icon,
+            height=10,
+        )
+        self.owned_table.grid(row=1, column=0, sticky="nsew")
+        self.owned_tab.rowconfigure(1, weight=1)
+        self.owned_tab.columnconfigure(0, weight=1)
         self.owned_form_frame = Frame(self.owned_tab, bootstyle="dark")  # type: ignore
-        self.owned_form_frame.grid(row=2, column=0, columnspan=len(self.owned_headers), pady=10) # Adjusted columnspan
+        self.owned_form_frame.grid(row=2, column=0, pady=10)
         Label(
             self.owned_form_frame,
             text="Add to Trophy Case",
@@ -303,8 +316,11 @@ class FreeGamesGUI:
                 bootstyle="warning-outline",  # type: ignore
             ).grid(row=0, column=2, padx=5)
 
-        # Status Bar
+        # Status Bar: what is going on (e.g. refresh progress), then the collection summary.
+        # Each part is updated on its own so DB changes never overwrite the progress text.
         self.status_var = tk.StringVar()
+        self._status_activity = ""
+        self._status_summary = ""
         Label(
             self.main_frame,
             textvariable=self.status_var,
@@ -313,19 +329,22 @@ class FreeGamesGUI:
         ).pack(side="bottom", fill="x")
         self.update_status()
 
+        # Redraw only what changed whenever the database commits a change
+        self.db.subscribe(self._on_db_events)
+
         self.update_gui()
 
-    async def _async_process_single_game(self, game_info: FreeGame):
-        """Processes one game: add to DB, get price, tag genre."""
-        self.db.add_game(game_info.title, game_info.platform, game_info.url, game_info.end_date)
-        # Fetch price and update DB (price_tracker.get_game_price is async)
-        await self.price_tracker.get_game_price(game_info.title, game_info.platform)
-        # Tag genre and update DB (genre_tagging.tag_game is sync)
-        self.genre_tagging.tag_game(game_info.title, game_info.title) # Using title as placeholder description
+    def _show_refresh_progress(self, stats):
+        """RefreshPipeline progress callback. Runs on the refresh thread, so hand over to the Tk thread."""
+        message = (
+            f"Refreshing Arcade... {stats['stores_done']}/{stats['stores_total']} stores, "
+            f"{stats['written']}/{stats['scraped']} games stored"
+        )
+        self.root.after(0, lambda: self.set_activity(message))
 
     def on_refresh_arcade_button_click(self):
         """Handles the 'Refresh Arcade' button click by running the refresh cycle in a new thread."""
-        self.root.after(0, lambda: self.status_var.set("Refreshing Arcade... Please wait..."))
+        self.root.after(0, lambda: self.set_activity("Refreshing Arcade... Please wait..."))
         def threaded_task():
             asyncio.run(self._execute_full_refresh_cycle())
 
@@ -343,35 +362,41 @@ class FreeGamesGUI:
         Scrapes games, processes them, updates DB, notifies, and updates GUI.
         """
         try:
-            # Scrape main games
-            scraped_main_games = await self.scraper.scrape_all()
-            for game_info in scraped_main_games:
-                await self._async_process_single_game(game_info)
-
-            # Scrape multi-language games (e.g., Epic DE)
-            # This directly adds to DB via self.multi_language.ai_module & self.multi_language.db
-            await self.multi_language.scrape_non_english(
-                "https://store.epicgames.com/de-DE/free-games", "Epic", "de"
-            )
+            # One pooled HTTP session serves every scraper and price lookup in this cycle
+            async with shared_client.cycle():
+                # Stores stream into price/genre enrichment and batched writes as each one finishes
+                pipeline = RefreshPipeline(
+                    self.db, self.scraper, self.price_tracker, self.genre_tagging,
+                    on_progress=self._show_refresh_progress,
+                )
+                stats = await pipeline.run()
+                print(
+                    f"Stored scrape: {stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged "
+                    f"(first games stored after {stats['first_write_seconds']}s, all after {stats['seconds']}s)"
+                )
+
+                # Scrape multi-language games (e.g., Epic DE)
+                # This directly adds to DB via self.multi_language.ai_module & self.multi_language.db
+                await self.multi_language.scrape_non_english(
+                    "https://store.epicgames.com/de-DE/free-games", "Epic", "de"
+                )
 
-            # DB maintenance
+            # DB maintenance (ExpiryScheduler also expires each deal as it ends)
             self.db.check_expirations()
 
-            # Notifications
+            # Notifications. "Expires soon" warnings are sent by ExpiryScheduler when each is due.
             self.notifications.notify_new_games()
-            self.notifications.notify_expiring_games()
 
             # Final GUI updates (scheduled to run in the main Tkinter thread)
             def final_updates():
-                self.update_gui()
-                self.update_status()
-                self.status_var.set("Arcade refreshed successfully!")
+                self.apply_pending_changes()
+                self.set_activity("Arcade refreshed successfully!")
             self.root.after(0, final_updates)
 
         except Exception as e:
             print(f"Error during refresh cycle: {e}")
             # Schedule error message update to main thread
-            self.root.after(0, lambda err=e: self.status_var.set(f"Refresh error: {str(err)[:100]}"))
+            self.root.after(0, lambda err=e: self.set_activity(f"Refresh error: {str(err)[:100]}"))
 
     def add_owned_game(self):
         title = self.title_entry.get()
@@ -382,8 +407,6 @@ class FreeGamesGUI:
             self.title_entry.delete(0, tk.END)
             self.platform_entry.set("")
             self.url_entry.delete(0, tk.END)
-            self.update_gui()
-            self.update_status()
 
     def import_steam_library(self):
         steam_id = simpledialog.askstring(
@@ -394,264 +417,90 @@ class FreeGamesGUI:
         )
         if steam_id and api_key:
             asyncio.run(self.library_import.import_steam_library(steam_id, api_key))
-            self.update_gui()
-            self.update_status() # This update_status is fine here as it's after asyncio.run
+
+    def set_activity(self, message):
+        """Sets the activity part of the status bar ("" to clear it); the summary is kept."""
+        self._status_activity = message
+        self._render_status()
+
+    def _render_status(self):
+        parts = [part for part in (self._status_activity, self._status_summary) if part]
+        self.status_var.set(" | ".join(parts))
 
     def update_status(self):
+        """Recomputes the collection summary part of the status bar (counts and total value)."""
         counts = self.db.get_status_counts()
         owned_count = counts.get("owned", 0)
         claimed_count = counts.get("claimed", 0)
         active_count = counts.get("active", 0)
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         cursor.execute("SELECT SUM(price) FROM games WHERE price IS NOT NULL")
         total_value = cursor.fetchone()[0] or 0
-        conn.close()
-        self.status_var.set(
+        self._status_summary = (
             f"Collection: {owned_count} Games | Missions Completed: {claimed_count} | Active Deals: {active_count} | Value: ${total_value:.2f}"
         )
+        self._render_status()
 
     def update_active_gui(self):
-        for widget in self.active_tab.winfo_children()[len(self.active_headers) + 1 :]:
-            widget.destroy()
         platform = (
             self.active_platform.get() if self.active_platform.get() != "All" else None
         )
         genre = self.active_genre.get() if self.active_genre.get() != "All" else None
         search_term = self.active_search.get()
-        games = self.game_filter.filter_games("active", platform, genre, search_term)
-        for row_idx, (platform, title, end_date) in enumerate(games, 2):
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT url, price, genre FROM games WHERE title = ? AND platform = ?",
-                (title, platform),
-            )
-            # Explicitly type hint the expected return from fetchone for this query
-            fetched_active_details: tuple[str | None, float | None, str | None] | None = cursor.fetchone()
-            conn.close()
-            if fetched_active_details:
-                url, price, genre = fetched_active_details
-            else:
-                url, price, genre = None, None, None # Should ideally not happen if game is from filtered list
-            Label(
-                self.active_tab,
-                text=platform,
-                font=("Orbitron", 10),
-                foreground="#FFFFFF",
-            ).grid(row=row_idx, column=0, padx=5, sticky="w")
-            Label(
-                self.active_tab, text=title, font=("Orbitron", 10), foreground="#FFFFFF"
-            ).grid(row=row_idx, column=1, padx=5, sticky="w")
-            Button(
-                self.active_tab,
-                text="Claim",
-                command=lambda u=url: self.claim_game(u),
-                bootstyle="info-outline",  # type: ignore
-            ).grid(row=row_idx, column=2, padx=5)
-            Button(
-                self.active_tab,
-                text="Mark Owned",
-                command=lambda t=title, p=platform, u=url: self.mark_owned(t, p, u),
-                bootstyle="warning-outline",  # type: ignore
-            ).grid(row=row_idx, column=3, padx=5)
-            Label(
-                self.active_tab,
-                text=end_date or "Unknown",
-                font=("Orbitron", 10),
-                foreground="#FF69B4",
-            ).grid(row=row_idx, column=4, padx=5, sticky="w")
-            Label(
-                self.active_tab,
-                text=f"${price:.2f}" if price else "N/A",
-                font=("Orbitron", 10),
-                foreground="#FFD700",
-            ).grid(row=row_idx, column=5, padx=5, sticky="w")
-            Label(
-                self.active_tab,
-                text=genre or "N/A",
-                font=("Orbitron", 10),
-                foreground="#00FF00",
-            ).grid(row=row_idx, column=6, padx=5, sticky="w")
+        self.active_table.set_rows(
+            self.game_filter.filter_games("active", platform, genre, search_term)
+        )
 
     def update_gui(self):
-        for widget in self.active_tab.winfo_children()[len(self.active_headers) + 1 :]:
-            widget.destroy()
-        for widget in self.claimed_tab.winfo_children()[
-            len(self.claimed_headers) + 1 :
-        ]:
-            widget.destroy()
-        for widget in self.expired_tab.winfo_children()[
-            len(self.expired_headers) + 1 :
-        ]:
-            widget.destroy()
-        for widget in self.owned_tab.winfo_children()[len(self.owned_headers) + 2 :]:
-            widget.destroy()
-        for widget in self.recommend_tab.winfo_children()[
-            len(self.recommend_headers) + 1 :
-        ]:
-            widget.destroy()
+        """Full redraw of every tab. After startup, DB change events keep the tabs current."""
         for widget in self.stats_tab.winfo_children()[1:]:
             widget.destroy()
 
-        # Active Games (use filter)
+        # Game tables only apply the difference to what is already shown
         self.update_active_gui()
+        self.claimed_table.set_rows(self.db.get_games_by_status("claimed"))
+        self.expired_table.set_rows(self.db.get_games_by_status("expired"))
+        self.owned_table.set_rows(self.db.get_games_by_status("owned"))
 
-        # Claimed Games
-        for row_idx, (platform, title, claim_date) in enumerate(
-            self.db.get_games_by_status("claimed"), 2
-        ):
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT price, genre FROM games WHERE title = ? AND platform = ?",
-                (title, platform),
-            )
-            # Explicitly type hint the expected return from fetchone for this query (price, genre)
-            fetched_details: tuple[float | None, str | None] | None = cursor.fetchone()
-            conn.close()
-            # Unpack the fetched details, handling the case where no row was found
-            price, genre = fetched_details if fetched_details else (None, None)
-
-            Label(
-                self.claimed_tab,
-                text=platform,
-                font=("Orbitron", 10),
-                foreground="#FFFFFF",
-            ).grid(row=row_idx, column=0, padx=5, sticky="w")
-            Label(
-                self.claimed_tab,
-                text=title,
-                font=("Orbitron", 10),
-                foreground="#FFFFFF",
-            ).grid(row=row_idx, column=1, padx=5, sticky="w")
-            Label(
-                self.claimed_tab,
-                text=claim_date,
-                font=("Orbitron", 10),
-                foreground="#00FF00",
-            ).grid(row=row_idx, column=2, padx=5, sticky="w")
-            Label(
-                self.claimed_tab,
-                text=f"${price:.2f}" if price else "N/A",
-                font=("Orbitron", 10),
-                foreground="#FFD700",
-            ).grid(row=row_idx, column=3, padx=5, sticky="w")
-            Label(
-                self.claimed_tab,
-                text=genre or "N/A",
-                font=("Orbitron", 10),
-                foreground="#00FF00",
-            ).grid(row=row_idx, column=4, padx=5, sticky="w")
-
-        # Expired Games
-        for row_idx, (platform, title, epitaph) in enumerate(
-            self.db.get_games_by_status("expired"), 2
-        ):
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT price, genre FROM games WHERE title = ? AND platform = ?",
-                (title, platform),
-            )
-            # Explicitly type hint the expected return from fetchone for this query
-            fetched_expired_details: tuple[float | None, str | None] | None = cursor.fetchone()
-            conn.close()
-            if fetched_expired_details:
-                price, genre = fetched_expired_details
-            else:
-                price, genre = None, None
-            Label(
-                self.expired_tab,
-                text=platform,
-                font=("Orbitron", 10),
-                foreground="#FFFFFF",
-            ).grid(row=row_idx, column=0, padx=5, sticky="w")
-            Label(
-                self.expired_tab,
-                text=title,
-                font=("Orbitron", 10),
-                foreground="#FFFFFF",
-            ).grid(row=row_idx, column=1, padx=5, sticky="w")
-            Label(
-                self.expired_tab,
-                text=epitaph,
-                font=("Orbitron", 10),
-                foreground="#FF4500",
-            ).grid(row=row_idx, column=2, padx=5, sticky="w")
-            Label(
-                self.expired_tab,
-                text=f"${price:.2f}" if price else "N/A",
-                font=("Orbitron", 10),
-                foreground="#FFD700",
-            ).grid(row=row_idx, column=3, padx=5, sticky="w")
-            Label(
-                self.expired_tab,
-                text=genre or "N/A",
-                font=("Orbitron", 10),
-                foreground="#00FF00",
-            ).grid(row=row_idx, column=4, padx=5, sticky="w")
+        self.update_recommendations()
 
-        # Owned Games
-        for row_idx, (platform, title, acquisition_date, claim_date) in enumerate( # Added claim_date
-            self.db.get_games_by_status("owned"), 3 # Start row index from 3
-        ):
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT price, genre FROM games WHERE title = ? AND platform = ?",
-                (title, platform),
-            )
-            # Explicitly type hint the expected return from fetchone for this query
-            fetched_owned_details: tuple[float | None, str | None] | None = cursor.fetchone()
-            conn.close()
-            if fetched_owned_details:
-                price, genre = fetched_owned_details
-            else:
-                price, genre = None, None
+        # Stats (Chart.js placeholder)
+        # chart = self.analytics.get_platform_chart() # This variable was assigned but not used.
+        Label(
+            self.stats_tab,
+            text="Platform Distribution",
+            font=("Orbitron", 12),
+            foreground="#FFD700",
+        ).grid(row=1, column=0, pady=5)
+        # Chart.js rendering handled by frontend integration
 
-            origin_text = "Claimed Free" if claim_date else "Purchased"
+    def update_recommendations(self):
+        self._recommendations_dirty = False
+        for widget in self.recommend_tab.winfo_children()[
+            len(self.recommend_headers) + 1 :
+        ]:
+            widget.destroy()
 
+        if not self.ai_recommendations.ready:
+            # The AI model loads in the background; check back until it is ready
             Label(
-                self.owned_tab,
-                image=self.gamepad_icon,
-                compound="left",
-                text=platform,
+                self.recommend_tab,
+                text="Warming up the AI model...",
                 font=("Orbitron", 10),
                 foreground="#FFFFFF",
-            ).grid(row=row_idx, column=0, padx=5, sticky="w")
-            Label(
-                self.owned_tab, text=title, font=("Orbitron", 10), foreground="#FFFFFF"
-            ).grid(row=row_idx, column=1, padx=5, sticky="w")
-            Label(
-                self.owned_tab,
-                text=acquisition_date,
-                font=("Orbitron", 10),
-                foreground="#FFD700",
-            ).grid(row=row_idx, column=2, padx=5, sticky="w")
-            Label(
-                self.owned_tab,
-                text=f"${price:.2f}" if price else "N/A",
-                font=("Orbitron", 10),
-                foreground="#FFD700",
-            ).grid(row=row_idx, column=3, padx=5, sticky="w")
-            Label(
-                self.owned_tab,
-                text=genre or "N/A",
-                font=("Orbitron", 10),
-                foreground="#00FF00",
-            ).grid(row=row_idx, column=4, padx=5, sticky="w")
-            Label(
-                self.owned_tab,
-                text=origin_text,
-                font=("Orbitron", 10),
-                foreground="#00FFFF", # Cyan color for origin text
-            ).grid(row=row_idx, column=4, padx=5, sticky="w")
+            ).grid(row=2, column=0, columnspan=4, pady=5)
+            if not self._waiting_for_model:
+                self._waiting_for_model = True
+                self.root.after(1000, self._refresh_recommendations_when_ready)
+            return
+        try:
+            recommendations = self.ai_recommendations.recommend_games()
+        except RuntimeError as e:  # The lazily loaded model failed to load
+            print(f"Recommendations unavailable: {e}")
+            recommendations = []
 
-        # Recommendations
-        for row_idx, (platform, title, url, end_date) in enumerate(
-            self.ai_recommendations.recommend_games(), 2
-        ):
+        for row_idx, game in enumerate(recommendations, 2):
+            platform, title, url, end_date = game[:4]
             Label(
                 self.recommend_tab,
                 text=platform,
@@ -677,15 +526,82 @@ class FreeGamesGUI:
                 foreground="#00FFFF",
             ).grid(row=row_idx, column=3, padx=5, sticky="w")
 
-        # Stats (Chart.js placeholder)
-        # chart = self.analytics.get_platform_chart() # This variable was assigned but not used.
-        Label(
-            self.stats_tab,
-            text="Platform Distribution",
-            font=("Orbitron", 12),
-            foreground="#FFD700",
-        ).grid(row=1, column=0, pady=5)
-        # Chart.js rendering handled by frontend integration
+    def _refresh_recommendations_when_ready(self):
+        if not self.ai_recommendations.ready:
+            self.root.after(1000, self._refresh_recommendations_when_ready)
+            return
+        self._waiting_for_model = False
+        if self._recommendations_visible():
+            self.update_recommendations()
+        else:
+            self._recommendations_dirty = True
+
+    def _on_db_events(self, events):
+        """DBManager subscriber. May run on a worker thread, so hand over to the Tk thread."""
+        self.root.after(0, lambda: self._queue_db_events(events))
+
+    def _queue_db_events(self, events):
+        for event in events:
+            keys = event.keys or (((event.title, event.platform),) if event.title else ())
+            if event.kind in (PRICE_UPDATED, GENRE_UPDATED) and keys:
+                # Only cell values change, so the affected rows are updated in place
+                self._dirty_keys.update(keys)
+                self._value_dirty = self._value_dirty or event.kind == PRICE_UPDATED
+                if event.kind == GENRE_UPDATED and self.active_genre.get() != "All":
+                    self._dirty_statuses.add("active")  # may move games in or out of the genre filter
+            elif event.status is None:
+                # e.g. a playtime update, which touches rows of any status
+                self._dirty_statuses.update(["active", "claimed", "expired", "owned"])
+            else:
+                self._dirty_statuses.add(event.status)
+                if event.old_status:
+                    self._dirty_statuses.add(event.old_status)
+            # Recommendations depend only on which games are active and owned
+            if event.kind in (GAME_INSERTED, GAMES_UPSERTED, STATUS_CHANGED) and (
+                {event.status, event.old_status} & {"active", "owned"}
+            ):
+                self._recommendations_dirty = True
+        # Coalesce bursts of commits into a single redraw
+        if not self._pending_redraw:
+            self._pending_redraw = True
+            self.root.after_idle(self.apply_pending_changes)
+
+    def apply_pending_changes(self):
+        """Redraws only the tabs touched by queued DB events and patches rows whose price or genre changed."""
+        self._pending_redraw = False
+        dirty, self._dirty_statuses = self._dirty_statuses, set()
+        dirty_keys, self._dirty_keys = self._dirty_keys, set()
+        if dirty_keys:
+            tables = {
+                "active": self.active_table,
+                "claimed": self.claimed_table,
+                "expired": self.expired_table,
+                "owned": self.owned_table,
+            }
+            for status, table in tables.items():
+                if status not in dirty and len(table):  # a full redraw below covers it anyway
+                    table.update_rows(self.db.get_games_by_keys(status, dirty_keys))
+        if "active" in dirty:
+            self.update_active_gui()
+        if "claimed" in dirty:
+            self.claimed_table.set_rows(self.db.get_games_by_status("claimed"))
+        if "expired" in dirty:
+            self.expired_table.set_rows(self.db.get_games_by_status("expired"))
+        if "owned" in dirty:
+            self.owned_table.set_rows(self.db.get_games_by_status("owned"))
+        # Recommendations embed every title, so they are only rebuilt while visible
+        if self._recommendations_dirty and self._recommendations_visible():
+            self.update_recommendations()
+        if dirty or self._value_dirty:
+            self._value_dirty = False
+            self.update_status()
+
+    def _recommendations_visible(self):
+        return self.notebook.select() == str(self.recommend_tab)
+
+    def _on_tab_changed(self, _event=None):
+        if self._recommendations_dirty and self._recommendations_visible():
+            self.update_recommendations()
 
     def claim_game(self, url):
         webbrowser.open(url)
@@ -696,24 +612,16 @@ class FreeGamesGUI:
             if messagebox.askyesno(
                 "Owned?", "Is this game now in your library?", parent=self.root
             ):
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT title, platform, url FROM games WHERE url = ?", (url,)
-                )
+                cursor = self.db.connection().cursor()
+                cursor.execute(SQL_GAME_BY_URL, (url,))
                 # Explicitly type hint the expected return from fetchone for this query
                 fetched_claim_details: tuple[str | None, str | None, str | None] | None = cursor.fetchone()
-                conn.close()
                 if fetched_claim_details:
                     title_claimed, platform_claimed, url_claimed = fetched_claim_details
                     self.owned_games.add_owned_game(title_claimed, platform_claimed, url_claimed)
                 else:
                     # Handle case where game is not found by URL after claiming, though unlikely
                     print(f"Warning: Could not find game by URL {url} after claiming.")
-            self.update_gui()
-            self.update_status()
 
     def mark_owned(self, title, platform, url):
         self.owned_games.add_owned_game(title, platform, url)
-        self.update_gui()
-        self.update_status()
@@ -0,0 +1,25 @@
+# html_parser.py
+try:
+    import lxml  # noqa: F401 # C parser, several times faster than html.parser on large pages
+    BACKEND = "lxml"
+except ImportError:
+    BACKEND = "html.parser"
+
+# When False, parse_html() ignores the scope and builds the whole document
+# (benchmarks/parse_bench.py compares both).
+SCOPED_PARSING = True
+
+
+def parse_html(markup, name=None, **attrs):
+    """
+    Parses `markup` into a BeautifulSoup tree with the fastest available backend.
+
+    `name` and `attrs` take the same arguments as bs4.SoupStrainer (e.g.
+    parse_html(html, "div", class_="game_cell")); when given, only matching elements
+    and their subtrees are built, so selectors run against a much smaller tree. Parts
+    of the page outside those elements (including their ancestors) are not available.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer  # Imported on first parse, not at app startup
+
+    parse_only = SoupStrainer(name, **attrs) if SCOPED_PARSING and (name or attrs) else None
+    return BeautifulSoup(markup, BACKEND, parse_only=parse_only)
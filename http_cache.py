@@ -0,0 +1,251 @@
+# http_cache.py
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from http_client import shared_client
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*\"?(\d+)")
+
+
+def parse_freshness(headers, now):
+    """
+    Returns (store, expires_at) for a response: store is False for Cache-Control:
+    no-store; expires_at is when the response must be revalidated (now if no-cache or
+    no freshness information is given).
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control:
+        return False, now
+    if "no-cache" in cache_control:
+        return True, now
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        try:
+            age = int(headers.get("Age", 0))
+        except ValueError:
+            age = 0
+        return True, now + max(0, int(match.group(1)) - age)
+    if headers.get("Expires"):
+        try:
+            return True, max(now, parsedate_to_datetime(headers["Expires"]).timestamp())
+        except (TypeError, ValueError):
+            pass
+    return True, now
+
+
+class CachedResponse:
+    """Body of a GET served by HttpCache. `unchanged` is True if it matches the previously cached body."""
+
+    def __init__(self, url, body, encoding, unchanged, from_cache):
+        self.url = url
+        self.body = body
+        self.encoding = encoding or "utf-8"
+        self.unchanged = unchanged  # fresh cache hit, 304, or a 200 with an identical body
+        self.from_cache = from_cache  # no body was downloaded
+
+    def text(self):
+        return self.body.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text())
+
+
+class HttpCache:
+    """
+    On-disk cache of GET responses for the store pages the scraper polls.
+
+    A response is reused without a request while Cache-Control max-age (or Expires)
+    says it is fresh; after that it is revalidated with If-None-Match/If-Modified-Since
+    and a 304 reuses the stored body. Callers can also store what they parsed from a
+    body (save_parsed) and get it back while the body is unchanged, so an unchanged
+    page is not parsed again. Least recently used entries are evicted once the bodies
+    exceed max_bytes.
+
+    get() does its file I/O in worker threads (asyncio.to_thread) so it never blocks the
+    event loop the scrapers share. The total body size is kept as a running count; the
+    directory is only scanned when it first needs to be known and when eviction is due.
+    """
+
+    def __init__(self, directory="http_cache", max_bytes=50 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0  # served fresh from disk, no request made
+        self.revalidated = 0  # 304 Not Modified
+        self.misses = 0  # full body downloaded
+        self._total_bytes = None  # size of all cached bodies; None until first counted
+        self._size_lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def _load(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return (meta, body) if meta.get("url") == url else (None, None)
+
+    def _write(self, path, data):
+        tmp_path = f"{path}.tmp-{threading.get_ident()}"  # concurrent writers never share a temp file
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _save_meta(self, meta):
+        meta_path, _ = self._paths(meta["url"])
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _store(self, url, headers, body, encoding, expires_at):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        replaced = self._size(body_path)
+        self._write(body_path, body)
+        self._save_meta({
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "encoding": encoding,
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "expires_at": expires_at,
+            "parsed": None,
+        })
+        with self._size_lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(body) - replaced
+            if self._total_bytes is None or self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Deletes least recently used entries (by metadata mtime) until under max_bytes
+        and recounts the total size. Callers hold _size_lock.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".body"):
+                continue
+            body_path = os.path.join(self.directory, name)
+            meta_path = body_path[:-len(".body")] + ".json"
+            try:
+                size = os.path.getsize(body_path)
+            except OSError:
+                continue
+            # An orphaned body (no metadata) goes first
+            used = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0
+            entries.append((used, size, meta_path, body_path))
+            total += size
+        for used, size, meta_path, body_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        self._total_bytes = total
+
+    def _remove(self, url):
+        _, body_path = self._paths(url)
+        size = self._size(body_path)
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._size_lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(0, self._total_bytes - size)
+
+    def _touch(self, url):
+        try:
+            os.utime(self._paths(url)[0])
+        except OSError:
+            pass
+
+    async def get(self, session, url, **kwargs):
+        """
+        GETs `url` with `session` (an aiohttp session), through the cache.
+        Raises aiohttp.ClientResponseError for error statuses, like raise_for_status().
+        """
+        meta, body = await asyncio.to_thread(self._load, url)
+        now = time.time()
+        if meta and now < meta["expires_at"]:
+            self.hits += 1
+            await asyncio.to_thread(self._touch, url)
+            return CachedResponse(url, body, meta["encoding"], unchanged=True, from_cache=True)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        # Rate limited and retried per host; may raise rate_limit.CircuitOpen
+        async with shared_client.request("GET", url, session=session, headers=headers, **kwargs) as resp:
+            if resp.status == 304 and meta:
+                self.revalidated += 1
+                _, meta["expires_at"] = parse_freshness(resp.headers, now)
+                meta["etag"] = resp.headers.get("ETag", meta.get("etag"))
+                meta["last_modified"] = resp.headers.get("Last-Modified", meta.get("last_modified"))
+                await asyncio.to_thread(self._save_meta, meta)
+                return CachedResponse(url, body, meta["encoding"], unchanged=True, from_cache=True)
+            resp.raise_for_status()
+            new_body = await resp.read()
+            encoding = resp.charset or "utf-8"
+            store, expires_at = parse_freshness(resp.headers, now)
+
+        self.misses += 1
+        unchanged = meta is not None and meta["sha256"] == hashlib.sha256(new_body).hexdigest()
+        if unchanged:
+            # Same body without validators (or ignored ones): keep the parsed result
+            meta["expires_at"] = expires_at
+            meta["etag"] = resp.headers.get("ETag")
+            meta["last_modified"] = resp.headers.get("Last-Modified")
+            await asyncio.to_thread(self._save_meta, meta)
+        elif store:
+            await asyncio.to_thread(self._store, url, resp.headers, new_body, encoding, expires_at)
+        elif meta:
+            await asyncio.to_thread(self._remove, url)
+        return CachedResponse(url, new_body, encoding, unchanged=unchanged, from_cache=False)
+
+    def load_parsed(self, url):
+        """What save_parsed() stored for the current body of `url`, or None."""
+        meta, _ = self._load(url)
+        return meta.get("parsed") if meta else None
+
+    def save_parsed(self, url, parsed):
+        """Stores a JSON-serialisable parse result next to the cached body of `url`."""
+        meta, _ = self._load(url)
+        if meta:
+            meta["parsed"] = parsed
+            self._save_meta(meta)
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+        with self._size_lock:
+            self._total_bytes = 0
+
+
+# Used by GameScraper for the store pages it polls on every refresh
+shared_cache = HttpCache()
@@ -0,0 +1,102 @@
+# http_client.py
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+import aiohttp
+from rate_limit import RateLimiter, shared_limiter
+
+try:
+    import brotli  # noqa: F401 # aiohttp decodes "br" responses only when Brotli is installed
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class HttpClient:
+    """
+    Owns the pooled aiohttp sessions used by every network module.
+
+    aiohttp sessions are bound to the event loop that created them, and each refresh
+    runs in its own asyncio.run() loop, so one session is kept per running loop.
+    All callers on that loop share it (and its keep-alive connections and DNS cache)
+    until the last user leaves, at which point it is closed.
+    """
+
+    def __init__(self, limit=100, limit_per_host=8, dns_cache_ttl=300, keepalive_timeout=30, total_timeout=60,
+                 limiter: RateLimiter = shared_limiter):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self.limiter = limiter
+        self._sessions = {}  # event loop -> [session, number of active users]
+        self._lock = threading.Lock()
+        self.replay = None  # a replay.Replayer answers requests from recorded fixtures
+
+    def _new_session(self):
+        if self.replay is not None:
+            return self.replay.wrap_session(self._create_session)
+        return self._create_session()
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+            headers={"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": USER_AGENT},
+        )
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Yields the shared session for the current event loop, creating it if needed.
+        Nested and concurrent users on the same loop get the same session.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._sessions.get(loop)
+            if entry is None or entry[0].closed:
+                entry = [self._new_session(), 0]
+                self._sessions[loop] = entry
+            entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                last_user = entry[1] == 0
+                if last_user and self._sessions.get(loop) is entry:
+                    del self._sessions[loop]
+            if last_user:
+                await entry[0].close()
+
+    # A refresh cycle holds the session open across all of its steps.
+    cycle = session
+
+    @asynccontextmanager
+    async def request(self, method, url, session=None, **kwargs):
+        """
+        Sends a request through the per-host rate limiter (with retries and the circuit
+        breaker, see rate_limit.py) and yields the response. Uses the loop's shared
+        session unless one is given.
+        """
+        if session is None:
+            async with self.session() as session:
+                async with self.limiter.request(session, method, url, **kwargs) as resp:
+                    yield resp
+        else:
+            async with self.limiter.request(session, method, url, **kwargs) as resp:
+                yield resp
+
+
+# Shared by scraper, price tracking, library import, playtime, wishlist, etc.
+shared_client = HttpClient()
@@ -0,0 +1,162 @@
+# inference_backends.py
+import copy
+import os
+import torch
+
+# Sample inputs for the parity check, shaped like the texts the classifier sees
+PARITY_TEXTS = [
+    "Free on Epic: Dead Island 2",
+    "Get Hogwarts Legacy for free on Prime Gaming until Friday",
+    "Celeste",
+    "50% off this weekend only, don't miss the summer sale on all strategy games",
+    "Giveaway: claim Tomb Raider GOTY free on GOG before the offer expires at 15:00 UTC",
+    "Patch notes 1.4.2: fixed a crash when loading saves, improved controller support",
+]
+
+
+class TorchBackend:
+    """Runs a DistilBertForSequenceClassification model as is."""
+
+    name = "torch"
+    # How far another backend may drift from this one and still pass check_parity()
+    max_probability_diff = 0.0
+    min_embedding_cosine = 1.0
+
+    def __init__(self, model):
+        self.model = model
+
+    def logits(self, inputs):
+        return self.model(**inputs).logits
+
+    def last_hidden_state(self, inputs):
+        return self.model.distilbert(**inputs).last_hidden_state
+
+
+class QuantizedBackend(TorchBackend):
+    """
+    int8 dynamic quantization of every Linear layer (weights stored as int8,
+    activations quantized on the fly). CPU only. Roughly halves resident memory
+    and speeds up inference at a small cost in precision.
+    """
+
+    name = "quantized"
+    max_probability_diff = 0.1
+    min_embedding_cosine = 0.95
+
+    @classmethod
+    def from_model(cls, model, device):
+        if device.type != "cpu":
+            raise RuntimeError("dynamic quantization only runs on CPU")
+        quantized = torch.quantization.quantize_dynamic(copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8)
+        quantized.eval()
+        return cls(quantized)
+
+
+class OnnxBackend:
+    """
+    The model exported to ONNX and run by onnxruntime on CPU. One graph returns
+    both the classifier logits and the encoder's last hidden state.
+    """
+
+    name = "onnx"
+    max_probability_diff = 1e-3
+    min_embedding_cosine = 0.999
+
+    def __init__(self, session):
+        self.session = session
+
+    @classmethod
+    def from_model(cls, model, onnx_path, num_threads=None):
+        import onnxruntime  # Optional dependency; AIModule falls back to torch without it
+
+        if not os.path.exists(onnx_path):
+            export_onnx(model, onnx_path)
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        return cls(session)
+
+    def _run(self, inputs):
+        logits, last_hidden_state = self.session.run(
+            ["logits", "last_hidden_state"],
+            {name: inputs[name].cpu().numpy() for name in ("input_ids", "attention_mask")},
+        )
+        device = inputs["input_ids"].device
+        return torch.from_numpy(logits).to(device), torch.from_numpy(last_hidden_state).to(device)
+
+    def logits(self, inputs):
+        return self._run(inputs)[0]
+
+    def last_hidden_state(self, inputs):
+        return self._run(inputs)[1]
+
+
+class _ExportWrapper(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        outputs = self.model(input_ids=input_ids, attention_mask=attention_mask, output_hidden_states=True)
+        return outputs.logits, outputs.hidden_states[-1]
+
+
+def export_onnx(model, onnx_path):
+    """Exports `model` with dynamic batch and sequence axes. Writes to a temp file first."""
+    os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+    model = copy.deepcopy(model).cpu().eval()
+    sample = {
+        "input_ids": torch.ones((2, 8), dtype=torch.long),
+        "attention_mask": torch.ones((2, 8), dtype=torch.long),
+    }
+    tmp_path = onnx_path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            _ExportWrapper(model),
+            (sample["input_ids"], sample["attention_mask"]),
+            tmp_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits", "last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    os.replace(tmp_path, onnx_path)
+    print(f"Exported model to {onnx_path}")
+
+
+def check_parity(reference, candidate, batches):
+    """
+    Compares `candidate` against `reference` on tokenized `batches`.
+    Returns {"max_probability_diff", "label_agreement", "min_embedding_cosine", "passed"},
+    judged by the candidate's tolerances.
+    """
+    max_diff, agree, total, min_cosine = 0.0, 0, 0, 1.0
+    with torch.inference_mode():
+        for inputs in batches:
+            expected = torch.softmax(reference.logits(inputs).float().cpu(), dim=-1)
+            actual = torch.softmax(candidate.logits(inputs).float().cpu(), dim=-1)
+            max_diff = max(max_diff, (expected - actual).abs().max().item())
+            agree += (expected.argmax(dim=-1) == actual.argmax(dim=-1)).sum().item()
+            total += len(expected)
+
+            mask = inputs["attention_mask"].cpu().unsqueeze(-1).float()
+            pooled = [
+                (hidden.float().cpu() * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                for hidden in (reference.last_hidden_state(inputs), candidate.last_hidden_state(inputs))
+            ]
+            min_cosine = min(min_cosine, torch.nn.functional.cosine_similarity(*pooled, dim=-1).min().item())
+    return {
+        "max_probability_diff": max_diff,
+        "label_agreement": agree / total if total else 1.0,
+        "min_embedding_cosine": min_cosine,
+        "passed": max_diff <= candidate.max_probability_diff and min_cosine >= candidate.min_embedding_cosine,
+    }
+
+
+BACKENDS = {backend.name: backend for backend in (TorchBackend, QuantizedBackend, OnnxBackend)}
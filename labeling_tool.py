@@ -15,6 +15,7 @@ from generate_dataset import (
     scrape_humble_bundle,
     scrape_x_posts,
 )
+from browser_pool import shared_browser
 from stats_chart import generate_chart_config
 from datetime import datetime
 import pygame
@@ -325,5 +326,6 @@ async def load_samples():
 
 if __name__ == "__main__":
     samples = asyncio.run(load_samples())
+    shared_browser.close()  # Rendering is done; don't keep Chromium around while labeling
     app = LabelingTool(samples)
     app.root.mainloop()
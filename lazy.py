@@ -0,0 +1,73 @@
+# lazy.py
+import threading
+import time
+
+
+class LazyComponent:
+    """
+    Stands in for a component that is slow to build (an ML model, a browser, a cloud
+    client) so it can be created on first use instead of at startup.
+
+    The factory runs exactly once: on the first attribute access, on get(), or in a
+    background thread started by warm_up(). Attribute access is forwarded to the built
+    object, so a LazyComponent can be passed wherever the real component is expected.
+    Other threads asking for it while it builds wait for the same result.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._instance = None
+        self._error = None
+        self._ready = threading.Event()
+        self.load_seconds = None
+
+    @property
+    def ready(self):
+        """True once the component was built (or failed to build)."""
+        return self._ready.is_set()
+
+    def get(self):
+        """Returns the component, building it in the calling thread if nobody has yet."""
+        if not self._ready.is_set():
+            with self._lock:
+                if not self._ready.is_set():
+                    start = time.perf_counter()
+                    try:
+                        self._instance = self._factory()
+                    except Exception as e:
+                        self._error = e
+                        print(f"Failed to load {self.name}: {e}")
+                    self.load_seconds = time.perf_counter() - start
+                    self._ready.set()
+                    if self._error is None:
+                        print(f"{self.name} loaded in {self.load_seconds:.1f}s")
+        if self._error is not None:
+            raise RuntimeError(f"{self.name} is unavailable: {self._error}") from self._error
+        return self._instance
+
+    def warm_up(self):
+        """Starts building the component in a daemon thread; returns immediately."""
+        if self._ready.is_set():
+            return None
+        thread = threading.Thread(target=self._warm, name=f"warm-up {self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm(self):
+        try:
+            self.get()
+        except RuntimeError:
+            pass  # Already reported; callers of get() see the error
+
+    def __getattr__(self, item):
+        # Only called for attributes LazyComponent itself does not have. Private names are
+        # not forwarded, so copy/pickle probes cannot trigger a load or recurse.
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self.get(), item)
+
+    def __repr__(self):
+        state = "ready" if self.ready else "not loaded"
+        return f"<LazyComponent {self.name} ({state})>"
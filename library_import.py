@@ -1,5 +1,5 @@
 # library_import.py
-import aiohttp
+from http_client import shared_client
 from db_manager import DBManager
 
 
@@ -8,23 +8,24 @@ class LibraryImport:
         self.db = db_manager
 
     async def import_steam_library(self, steam_id, api_key):
-        async with aiohttp.ClientSession() as session:
+        async with shared_client.session() as session:
             async with session.get(
                 f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={api_key}&steamid={steam_id}&include_appinfo=1"
             ) as resp:
                 data = await resp.json()
-                for game in data["response"].get("games", []):
-                    self.db.add_game(
-                        title=game["name"],
-                        platform="Steam",
-                        url=f"https://store.steampowered.com/app/{game['appid']}",
-                        status="owned",
-                        acquisition_date=None,
-                    )
+                with self.db.transaction():
+                    for game in data["response"].get("games", []):
+                        self.db.add_game(
+                            title=game["name"],
+                            platform="Steam",
+                            url=f"https://store.steampowered.com/app/{game['appid']}",
+                            status="owned",
+                            acquisition_date=None,
+                        )
 
     async def import_epic_library(self, user_id, auth_token):
         # Note: Epic's API requires OAuth, which may need user login. Placeholder for GraphQL query.
-        async with aiohttp.ClientSession() as session:
+        async with shared_client.session() as session:
             async with session.get(
                 f"https://graphql.epicgames.com/graphql",
                 headers={"Authorization": f"Bearer {auth_token}"},
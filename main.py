@@ -5,7 +5,6 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from db_manager import DBManager
 from scraper import GameScraper
 from owned_games import OwnedGames
-from ai_module import AIModule
 from gui import FreeGamesGUI
 from library_import import LibraryImport
 from price_tracker import PriceTracker
@@ -17,9 +16,24 @@ from cloud_sync import CloudSync
 from genre_tagging import GenreTagging
 from multi_language import MultiLanguage
 from analytics import Analytics
+from lazy import LazyComponent
+from browser_pool import shared_browser
+from classification_cache import ClassificationCache
+from expiry_scheduler import ExpiryScheduler
 import asyncio
 
 
+# Inference backend for the classifier: "torch", "quantized" (int8, CPU) or "onnx" (needs onnxruntime)
+AI_INFERENCE_BACKEND = "torch"
+
+
+def load_ai_module(db):
+    # Imported here: transformers and torch alone take seconds to import
+    from ai_module import AIModule
+
+    return AIModule(backend=AI_INFERENCE_BACKEND, classification_cache=ClassificationCache(db))
+
+
 def schedule_scraping(scraper, gui, multi_language):
     # The new _execute_full_refresh_cycle in gui handles all scraping and processing
     scheduler = BackgroundScheduler()
@@ -37,7 +51,8 @@ def schedule_scraping(scraper, gui, multi_language):
 
 if __name__ == "__main__":
     db = DBManager()
-    ai = AIModule()
+    # The model loads in the background once the window is up (or on first use)
+    ai = LazyComponent("AI model", lambda: load_ai_module(db))
     scraper = GameScraper(ai_module=ai)
     owned_games = OwnedGames(db)
     game_filter = GameFilter(db)
@@ -90,4 +105,11 @@ if __name__ == "__main__":
         target=schedule_scraping, args=(scraper, gui, multi_language), daemon=True
     )
     scheduler_thread.start()
+    # Expires deals and sends "expires soon" warnings at their exact end dates
+    expiry_scheduler = ExpiryScheduler(db, notifications, warn_hours=(24,))
+    expiry_scheduler.start()
+    root.after_idle(ai.warm_up)
     root.mainloop()
+    expiry_scheduler.stop()
+    shared_browser.close()
+    db.close()
@@ -1,7 +1,7 @@
 # multi_language.py
 from db_manager import DBManager
-import aiohttp
-from bs4 import BeautifulSoup # For HTML parsing
+from http_client import shared_client
+from html_parser import parse_html # For HTML parsing
 
 
 class MultiLanguage:
@@ -13,15 +13,15 @@ class MultiLanguage:
             "Accept-Language": locale,
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
+        async with shared_client.session() as session:
+            async with shared_client.request("GET", url, headers=headers, session=session) as resp:
                 if resp.status != 200:
                     response_text_preview = await resp.text(errors='ignore')
                     print(f"Failed to fetch non-English page {url} with locale {locale}, status: {resp.status}. Response: {response_text_preview[:200]}...")
                     return
 
                 html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
+                soup = parse_html(html, class_="some-game-container-class")  # Keep in sync with the selector below
 
                 # --- Placeholder for actual HTML parsing logic ---
                 # This part is highly dependent on the structure of the target non-English page.
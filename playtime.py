@@ -1,6 +1,5 @@
 # playtime.py
-import aiohttp
-import sqlite3
+from http_client import shared_client
 from db_manager import DBManager
 
 
@@ -9,16 +8,12 @@ class Playtime:
         self.db = db_manager
 
     async def get_steam_playtime(self, steam_id, api_key):
-        async with aiohttp.ClientSession() as session:
+        async with shared_client.session() as session:
             async with session.get(
                 f"https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v1/?key={api_key}&steamid={steam_id}"
             ) as resp:
                 data = await resp.json()
-                for game in data["response"].get("games", []):
-                    conn = sqlite3.connect(self.db.db_path)
-                    conn.execute(
-                        "UPDATE games SET playtime = ? WHERE title = ? AND platform = 'Steam'",
-                        (game["playtime_forever"] / 60, game["name"]),
-                    )
-                    conn.commit()
-                    conn.close()
+                # One transaction for the whole batch instead of a commit per game
+                self.db.update_playtimes(
+                    (game["name"], game["playtime_forever"] / 60) for game in data["response"].get("games", [])
+                )
@@ -0,0 +1,156 @@
+# price_history.py
+import time
+from db_manager import DBManager
+
+# SQLite's default limit on bound parameters is 999; stay well under it
+_QUERY_CHUNK = 500
+# Oldest games row of each (title, platform) in a chunk of titles
+SQL_GAME_IDS = "SELECT title, platform, MIN(id) FROM games WHERE title IN ({placeholders}) GROUP BY title, platform"
+# Latest run of each game in a chunk ({placeholders}: one "?" per game_id). With MAX(),
+# SQLite takes the other columns from the row holding the maximum.
+SQL_LATEST_RUNS = (
+    "SELECT game_id, MAX(ts), last_seen_ts, price FROM price_history WHERE game_id IN ({placeholders}) GROUP BY game_id"
+)
+
+
+class PriceHistory:
+    """
+    Time series of observed game prices in the `price_history` table.
+
+    Rows are run-length encoded: one row per run of identical prices, keyed by
+    (game_id, ts) where ts is when the price was first seen and last_seen_ts when it was
+    last confirmed. Observing an unchanged price only moves last_seen_ts, so polling a
+    game every refresh adds a row only when its price actually changes. Timestamps are
+    Unix seconds; observations older than a game's latest one are ignored.
+    """
+
+    def __init__(self, db_manager: DBManager):
+        self.db = db_manager
+
+    def _game_ids(self, conn, pairs):
+        """{(title, platform): id}; a game listed under several statuses uses its oldest row."""
+        wanted = set(pairs)
+        titles = list({title for title, _ in wanted})
+        ids = {}
+        for start in range(0, len(titles), _QUERY_CHUNK):
+            chunk = titles[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for title, platform, game_id in conn.execute(SQL_GAME_IDS.format(placeholders=placeholders), chunk):
+                if (title, platform) in wanted:
+                    ids[(title, platform)] = game_id
+        return ids
+
+    def _latest(self, conn, game_ids):
+        """{game_id: (ts, last_seen_ts, price)} of each game's most recent run."""
+        latest = {}
+        for start in range(0, len(game_ids), _QUERY_CHUNK):
+            chunk = game_ids[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for game_id, ts, last_seen_ts, price in conn.execute(SQL_LATEST_RUNS.format(placeholders=placeholders), chunk):
+                latest[game_id] = (ts, last_seen_ts, price)
+        return latest
+
+    def record(self, observations, ts=None):
+        """
+        Records (game_id, price) observations taken at `ts` (default: now), in one
+        transaction. Returns how many new rows were written (the rest extended a run).
+        """
+        ts = int(ts if ts is not None else time.time())
+        observations = dict(observations)
+        inserts, extends = [], []
+        with self.db.transaction() as conn:
+            latest = self._latest(conn, list(observations))
+            for game_id, price in observations.items():
+                last = latest.get(game_id)
+                if last is not None and ts <= last[1]:
+                    continue  # Already have a newer observation
+                if last is not None and last[2] == price:
+                    extends.append((ts, game_id, last[0]))
+                else:
+                    inserts.append((game_id, ts, ts, price))
+            conn.executemany("UPDATE price_history SET last_seen_ts = ? WHERE game_id = ? AND ts = ?", extends)
+            conn.executemany(
+                "INSERT INTO price_history (game_id, ts, last_seen_ts, price) VALUES (?, ?, ?, ?)", inserts
+            )
+        return len(inserts)
+
+    def record_prices(self, prices, ts=None):
+        """Like record(), for (title, platform, price) triples. Games not in the database are skipped."""
+        prices = list(prices)
+        with self.db.transaction() as conn:
+            ids = self._game_ids(conn, [(title, platform) for title, platform, _ in prices])
+            return self.record(
+                [(ids[(title, platform)], price) for title, platform, price in prices if (title, platform) in ids], ts
+            )
+
+    def range(self, game_id, start=None, end=None):
+        """Runs (ts, last_seen_ts, price) of a game overlapping [start, end], oldest first."""
+        return self.db.connection().execute(
+            """
+            SELECT ts, last_seen_ts, price FROM price_history
+            WHERE game_id = ? AND ts <= ? AND last_seen_ts >= ?
+            ORDER BY ts
+            """,
+            (game_id, end if end is not None else 2**62, start if start is not None else 0),
+        ).fetchall()
+
+    def summary(self, game_id, start=None, end=None):
+        """{"min", "max", "last", "last_ts", "runs"} of a game's prices in [start, end], or None without data."""
+        rows = self.range(game_id, start, end)
+        prices = [price for _, _, price in rows if price is not None]
+        if not prices:
+            return None
+        last_ts, _, last = rows[-1]
+        return {"min": min(prices), "max": max(prices), "last": last, "last_ts": last_ts, "runs": len(rows)}
+
+    def platform_summary(self, platform, start=None, end=None):
+        """{title: {"min", "max", "last", "last_ts"}} for every game of `platform` with prices in [start, end]."""
+        end = end if end is not None else 2**62
+        start = start if start is not None else 0
+        rows = self.db.connection().execute(
+            """
+            SELECT g.title, MIN(h.price), MAX(h.price),
+                   (SELECT l.price FROM price_history l
+                    WHERE l.game_id = g.id AND l.ts <= ? ORDER BY l.ts DESC LIMIT 1),
+                   MAX(h.ts)
+            FROM games g JOIN price_history h ON h.game_id = g.id
+            WHERE g.platform = ? AND h.ts <= ? AND h.last_seen_ts >= ?
+            GROUP BY g.id
+            """,
+            (end, platform, end, start),
+        ).fetchall()
+        return {
+            title: {"min": low, "max": high, "last": last, "last_ts": last_ts}
+            for title, low, high, last, last_ts in rows
+        }
+
+    def downsample(self, game_id, start, end, buckets=100):
+        """
+        Splits [start, end] into `buckets` equal intervals for charting and returns
+        (bucket_start, min, max, last) for each interval the game had a known price in.
+        A price counts as held from its run's ts until the next run starts.
+        """
+        rows = self.range(game_id, None, end)
+        if not rows or end <= start:
+            return []
+        width = (end - start) / buckets
+        # (from, until, price): each run holds until the next one begins
+        runs = [
+            (ts, rows[i + 1][0] if i + 1 < len(rows) else max(last_seen, end), price)
+            for i, (ts, last_seen, price) in enumerate(rows)
+            if price is not None
+        ]
+        points = []
+        first = 0  # index of the first run that may still overlap the current bucket
+        for b in range(buckets):
+            lo, hi = start + b * width, start + (b + 1) * width
+            while first < len(runs) and runs[first][1] <= lo:
+                first += 1
+            overlapping = []
+            for run in runs[first:]:
+                if run[0] >= hi:
+                    break
+                overlapping.append(run[2])
+            if overlapping:
+                points.append((int(lo), min(overlapping), max(overlapping), overlapping[-1]))
+        return points
@@ -1,27 +1,192 @@
 # price_tracker.py
-import aiohttp
-from bs4 import BeautifulSoup
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from http_client import shared_client
+from html_parser import parse_html
 from db_manager import DBManager
+from price_history import PriceHistory
+
+# SQLite's default limit on bound parameters is 999; stay well under it
+_QUERY_CHUNK = 500
+# Unexpired cache entries of a chunk of titles ({placeholders}: one "?" per title)
+SQL_CACHED_PRICES = "SELECT title, platform, price FROM price_cache WHERE expires_at > ? AND title IN ({placeholders})"
 
 
 class PriceTracker:
-    def __init__(self, db_manager: DBManager):
+    """
+    Looks up game prices on isthereanydeal.com.
+
+    Results (including "no price found") are kept in the `price_cache` table with an
+    expiry, so a game looked up within its TTL is not fetched again. The TTL is
+    `default_ttl` seconds unless overridden per game with set_ttl(); misses use the
+    shorter `not_found_ttl`. Lookups run concurrently, at most `concurrency` at once per
+    event loop across all callers, and callers asking for a title that is already being
+    fetched share that request.
+    """
+
+    def __init__(self, db_manager: DBManager, default_ttl=6 * 3600, not_found_ttl=3600, concurrency=8):
         self.db = db_manager
+        self.default_ttl = default_ttl
+        self.not_found_ttl = not_found_ttl
+        self.concurrency = concurrency
+        self.ttls = {}  # (title, platform) -> seconds, overrides default_ttl
+        self.history = PriceHistory(db_manager)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=1000)  # ms of the most recent network lookups
+        self._lock = threading.Lock()
+        # event loop -> (asyncio.Semaphore, {title: asyncio.Future of its price lookup});
+        # asyncio objects belong to one loop, and each refresh runs in its own asyncio.run()
+        self._loops = weakref.WeakKeyDictionary()
+
+    def set_ttl(self, title, platform, seconds):
+        """How long a fetched price of this game stays valid (e.g. shorter while it is on sale)."""
+        self.ttls[(title, platform)] = seconds
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        latencies = sorted(self._latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1) if latencies else None
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_ms_avg": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1], 1) if latencies else None,
+        }
+
+    async def fetch_price(self, title):
+        """Looks up the current price of `title` without storing it. None if not found."""
+        async with shared_client.request(
+            "GET", f"https://isthereanydeal.com/search/?q={title}"
+        ) as resp:
+            soup = parse_html(await resp.text(), class_="price")
+            price_elem = soup.select_one(".price")
+            return float(price_elem.text.replace("$", "")) if price_elem else None
+
+    def _load_cached(self, pairs, now):
+        """{(title, platform): price} of the pairs with an unexpired cache entry."""
+        wanted = set(pairs)
+        titles = list({title for title, _ in wanted})
+        cached = {}
+        conn = self.db.connection()
+        for start in range(0, len(titles), _QUERY_CHUNK):
+            chunk = titles[start:start + _QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for title, platform, price in conn.execute(
+                SQL_CACHED_PRICES.format(placeholders=placeholders),
+                (now, *chunk),
+            ):
+                if (title, platform) in wanted:
+                    cached[(title, platform)] = price
+        return cached
+
+    def _store_cached(self, rows):
+        """Caches (title, platform, price, fetched_at, expires_at) rows."""
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_cache (title, platform, price, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _store_prices(self, found, observed):
+        """Stores the (title, platform, price) found on the games and records the observed ones."""
+        with self.db.transaction():
+            self.db.update_prices(found)
+            self.history.record_prices(observed)
+
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = (asyncio.Semaphore(self.concurrency), {})
+            return state
+
+    async def _timed_fetch(self, title, semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                return await self.fetch_price(title)
+            except Exception as e:
+                self.errors += 1
+                print(f"Price lookup failed for '{title}': {e}")
+                raise
+            finally:
+                self._latencies.append((time.perf_counter() - start) * 1000)
+
+    async def _fetch(self, title):
+        """fetch_price(title) under the shared concurrency cap, joining a lookup of `title` already in flight."""
+        semaphore, in_flight = self._loop_state()
+        future = in_flight.get(title)
+        if future is None:
+            future = in_flight[title] = asyncio.ensure_future(self._timed_fetch(title, semaphore))
+
+            def finished(done):
+                in_flight.pop(title, None)
+                if not done.cancelled():
+                    done.exception()  # Retrieved here too, in case every caller was cancelled
+
+            future.add_done_callback(finished)
+        # A caller being cancelled must not cancel the lookup other callers wait for
+        return await asyncio.shield(future)
+
+    async def lookup_prices(self, pairs):
+        """
+        Returns ({(title, platform): price or None}, fetched) for the given pairs without
+        touching the games table. Cached prices are reused while unexpired; the rest are
+        fetched concurrently (once per title) and cached. Failed lookups give None and are
+        not cached. `fetched` is the set of pairs whose price was actually looked up now,
+        i.e. the ones that are new observations for the price history.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        now = time.time()
+        # SQLite work goes through worker threads so the loop keeps serving other lookups
+        prices = await asyncio.to_thread(self._load_cached, pairs, now)
+        missing = [pair for pair in pairs if pair not in prices]
+        self.hits += len(pairs) - len(missing)
+        self.misses += len(missing)
+        if not missing:
+            return prices, set()
+
+        titles = list(dict.fromkeys(title for title, _ in missing))
+        results = await asyncio.gather(*(self._fetch(title) for title in titles), return_exceptions=True)
+        fetched = {title: result for title, result in zip(titles, results) if not isinstance(result, Exception)}
+
+        rows = []
+        observed = set()
+        for title, platform in missing:
+            price = fetched.get(title)
+            prices[(title, platform)] = price
+            if title in fetched:
+                observed.add((title, platform))
+                ttl = self.ttls.get((title, platform), self.default_ttl if price is not None else self.not_found_ttl)
+                rows.append((title, platform, price, now, now + ttl))
+        if rows:
+            await asyncio.to_thread(self._store_cached, rows)
+        return prices, observed
+
+    async def get_prices(self, pairs):
+        """
+        lookup_prices(), then stores the prices found on the games and records the freshly
+        fetched ones in the price history. Returns {(title, platform): price or None}.
+        """
+        prices, fetched = await self.lookup_prices(pairs)
+        found = [(title, platform, price) for (title, platform), price in prices.items() if price]
+        # Cached prices were not observed again, so they must not extend a history run
+        observed = [entry for entry in found if entry[:2] in fetched]
+        await asyncio.to_thread(self._store_prices, found, observed)
+        return prices
 
     async def get_game_price(self, title, platform):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://isthereanydeal.com/search/?q={title}"
-            ) as resp:
-                soup = BeautifulSoup(await resp.text(), "html.parser")
-                price_elem = soup.select_one(".price")
-                price = float(price_elem.text.replace("$", "")) if price_elem else None
-                if price:
-                    conn = sqlite3.connect(self.db.db_path)
-                    conn.execute(
-                        "UPDATE games SET price = ? WHERE title = ? AND platform = ?",
-                        (price, title, platform),
-                    )
-                    conn.commit()
-                    conn.close()
-                return price
+        return (await self.get_prices([(title, platform)]))[(title, platform)]
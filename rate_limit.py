@@ -0,0 +1,252 @@
+# rate_limit.py
+import asyncio
+import random
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+from yarl import URL
+
+
+@dataclass
+class HostPolicy:
+    """How hard one host may be hit. `rate` is requests per second, adapted between min_rate and max_rate."""
+    rate: float = 2.0
+    burst: int = 4
+    max_concurrency: int = 4
+    min_rate: float = 0.2
+    max_rate: float = 10.0
+    rate_step: float = 0.2  # added to the rate per successful response
+    backoff_factor: float = 0.5  # rate multiplier when the host throttles us
+    failure_threshold: int = 5  # consecutive failures that open the circuit
+    cooldown: float = 60.0  # seconds the circuit stays open
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    max_retry_after: float = 120.0  # give up rather than wait longer than this for a Retry-After
+    retry_statuses: frozenset = field(default_factory=lambda: frozenset({429, 500, 502, 503, 504}))
+    throttle_statuses: frozenset = field(default_factory=lambda: frozenset({429, 503}))
+
+    def backoff(self, attempt):
+        """Exponential backoff with full jitter for the given (0-based) retry."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitOpen(aiohttp.ClientConnectionError):
+    """The host failed too often recently; requests to it are skipped until its cool-down ends."""
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (now or time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """Token bucket, AIMD-adapted rate and circuit breaker of a single host."""
+
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.rate = policy.rate
+        self.tokens = float(policy.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0  # set from Retry-After; no request leaves before it
+        self.consecutive_failures = 0
+        self.opened_at = None  # circuit open since (monotonic), None while closed
+        self.trial = None  # half-open: token of the one attempt probing the host
+        self.lock = threading.Lock()
+        self.semaphores = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "rejected": 0}
+
+    def reserve(self):
+        """Takes a token and returns how long to wait before using it (tokens can go negative: a queue)."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.policy.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def semaphore(self):
+        # asyncio primitives belong to one loop, and each refresh runs in its own asyncio.run()
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            semaphore = self.semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self.semaphores[loop] = asyncio.Semaphore(self.policy.max_concurrency)
+            return semaphore
+
+    def allow(self, token):
+        """
+        False while the circuit is open. After the cool-down one trial request is let through;
+        `token` identifies the attempt, so only that attempt's outcome settles the trial.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.policy.cooldown or self.trial is not None:
+                self.stats["rejected"] += 1
+                return False
+            self.trial = token
+            return True
+
+    def succeeded(self, token):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            if self.trial is token:
+                self.trial = None
+            self.rate = min(self.policy.max_rate, self.rate + self.policy.rate_step)
+
+    def settled(self, token):
+        """
+        The host answered with a client error (4xx): it is up, but the answer says nothing
+        about its health, so only a trial the attempt held is released.
+        """
+        self.abandoned(token)
+
+    def abandoned(self, token):
+        """A request ended before the host answered; a half-open trial it held may be retried."""
+        with self.lock:
+            if self.trial is token:
+                self.trial = None
+
+    def failed(self, token, throttled=False, retry_after=None):
+        with self.lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            if throttled:
+                self.stats["throttled"] += 1
+                self.rate = max(self.policy.min_rate, self.rate * self.policy.backoff_factor)
+                self.tokens = min(self.tokens, 0.0)  # drop the burst allowance too
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            if self.trial is token or self.consecutive_failures >= self.policy.failure_threshold:
+                self.opened_at = time.monotonic()
+            if self.trial is token:
+                self.trial = None
+
+
+class RateLimiter:
+    """
+    Per-host request control for the network modules: a token bucket whose rate
+    grows additively while a host answers and is cut multiplicatively when it
+    throttles (429/503), a cap on concurrent requests, retries with exponential
+    backoff and jitter (waiting out Retry-After), and a circuit breaker that skips
+    a host for `cooldown` seconds after `failure_threshold` consecutive failures.
+    """
+
+    def __init__(self, default_policy: HostPolicy | None = None, policies: dict[str, HostPolicy] | None = None,
+                 retry: RetryPolicy | None = None):
+        self.default_policy = default_policy or HostPolicy()
+        self.policies = dict(policies or {})  # host -> HostPolicy
+        self.retry = retry or RetryPolicy()
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url):
+        host = URL(str(url)).host or ""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostState(self.policies.get(host, self.default_policy))
+            return state
+
+    def stats(self):
+        """{host: {"rate", "circuit", "requests", "retries", "throttled", "failures", "rejected"}}"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {
+                "rate": round(state.rate, 2),
+                "circuit": "closed" if state.opened_at is None else "open",
+                **state.stats,
+            }
+            for host, state in hosts.items()
+        }
+
+    @asynccontextmanager
+    async def request(self, session, method, url, **kwargs):
+        """
+        Sends `method url` with `session` under the host's limits and yields the response,
+        retrying connection errors, timeouts and retryable statuses. Raises CircuitOpen if the
+        host is cooling down; once retries run out the last error is raised, or the last
+        retryable response is yielded for the caller's own status handling.
+        """
+        state = self.host(url)
+        retry = self.retry
+        for attempt in range(retry.max_attempts):
+            token = object()  # identifies this attempt to the host's circuit breaker
+            if not state.allow(token):
+                raise CircuitOpen(f"{URL(str(url)).host} is cooling down after repeated failures")
+            settled = False  # whether the host's answer (or error) has been recorded for this attempt
+            try:
+                last_attempt = attempt == retry.max_attempts - 1
+                delay = state.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                async with state.semaphore():
+                    state.stats["requests"] += 1
+                    try:
+                        resp = await session.request(method, url, **kwargs)
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        state.failed(token)
+                        settled = True
+                        if last_attempt:
+                            raise
+                        print(f"Request to {url} failed ({type(e).__name__}: {e}); retrying.")
+                        wait = retry.backoff(attempt)
+                    else:
+                        if resp.status not in retry.retry_statuses or last_attempt:
+                            try:
+                                if resp.status in retry.retry_statuses or resp.status >= 500:
+                                    state.failed(token, throttled=resp.status in retry.throttle_statuses)
+                                elif resp.status < 400:
+                                    state.succeeded(token)
+                                else:
+                                    state.settled(token)
+                                settled = True
+                                yield resp
+                            finally:
+                                resp.release()
+                            return
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        resp.release()
+                        state.failed(token, throttled=resp.status in retry.throttle_statuses,
+                                     retry_after=retry_after)
+                        settled = True
+                        if retry_after is not None and retry_after > retry.max_retry_after:
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, (), status=resp.status,
+                                message=f"Retry-After of {retry_after:.0f}s is longer than we wait",
+                            )
+                        wait = max(retry.backoff(attempt), retry_after or 0.0)
+                        print(f"{url} answered {resp.status}; retrying in {wait:.1f}s.")
+            finally:
+                if not settled:
+                    # Cancelled (e.g. by a per-store time budget) or failed unexpectedly
+                    # before the host answered
+                    state.abandoned(token)
+            state.stats["retries"] += 1
+            await asyncio.sleep(wait)
+
+
+# Shared by every module that goes through http_client.request()
+shared_limiter = RateLimiter()
@@ -0,0 +1,191 @@
+# refresh_pipeline.py
+import asyncio
+import time
+
+from db_manager import DBManager
+from genre_tagging import GenreTagging
+from price_tracker import PriceTracker
+from scraper import GameScraper
+
+_DONE = object()  # Tells the writer that no more items will come
+
+
+async def _get(queue, timeout):
+    """
+    queue.get(), or None once `timeout` seconds (None: no limit) pass. Unlike
+    asyncio.wait_for() before Python 3.12, it never swallows a cancellation that
+    arrives just as an item does, which would leave the writer running after run().
+    """
+    if timeout is None:
+        return await queue.get()
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        await asyncio.wait({getter}, timeout=timeout)
+    finally:
+        if not getter.done():
+            getter.cancel()  # a cancelled get() leaves its item in the queue
+    return getter.result() if getter.done() and not getter.cancelled() else None
+
+
+class RefreshPipeline:
+    """
+    The scrape -> enrich -> ingest part of a refresh, as a streaming pipeline.
+
+    Each store's games enter a bounded queue as soon as that store finishes. A pool of
+    `workers` looks up prices (through PriceTracker's cache) and tags genres
+    concurrently, and a single writer stores the enriched games in batches: every
+    `batch_size` games or `flush_interval`
+    seconds, whichever comes first, as one transaction. Full queues make the earlier
+    stages wait (backpressure). The first games are therefore stored about when the
+    fastest store answers, not the slowest.
+
+    on_progress(stats) is called from the event loop after every store and flush with a
+    copy of self.stats.
+    """
+
+    def __init__(
+        self,
+        db_manager: DBManager,
+        scraper: GameScraper,
+        price_tracker: PriceTracker | None = None,
+        genre_tagging: GenreTagging | None = None,
+        workers=8,
+        queue_size=100,
+        batch_size=50,
+        flush_interval=0.25,
+        on_progress=None,
+    ):
+        self.db = db_manager
+        self.scraper = scraper
+        self.price_tracker = price_tracker
+        self.genre_tagging = genre_tagging
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_progress = on_progress
+        self.stats = {}
+
+    def _progress(self):
+        if self.on_progress is not None:
+            try:
+                self.on_progress(dict(self.stats))
+            except Exception as e:
+                print(f"Refresh progress callback failed: {e}")
+
+    async def _produce(self, enrich_queue):
+        async for store, games in self.scraper.scrape_stream():
+            for game in games:
+                await enrich_queue.put(game)  # Waits while the enrichment workers are behind
+            self.stats["scraped"] += len(games)
+            self.stats["stores_done"] += 1
+            self._progress()
+
+    async def _feed(self, enrich_queue, write_queue):
+        await self._produce(enrich_queue)
+        await enrich_queue.join()
+        await write_queue.put(_DONE)
+
+    async def _enrich(self, enrich_queue, write_queue):
+        while True:
+            # Take whatever is queued (up to a batch) so prices are looked up, and the
+            # price cache read and written, per chunk rather than per game
+            games = [await enrich_queue.get()]
+            while len(games) < self.batch_size and not enrich_queue.empty():
+                games.append(enrich_queue.get_nowait())
+            try:
+                prices, fetched = {}, set()
+                if self.price_tracker is not None:
+                    try:
+                        prices, fetched = await self.price_tracker.lookup_prices(
+                            [(game.title, game.platform) for game in games]
+                        )
+                    except Exception as e:
+                        print(f"Price lookup failed for {len(games)} games: {e}")
+                for game in games:
+                    genre = None
+                    if self.genre_tagging is not None:
+                        genre = self.genre_tagging.genres_for(game.title)  # Using title as placeholder description
+                    key = (game.title, game.platform)
+                    await write_queue.put((game, prices.get(key), key in fetched, genre))
+                    self.stats["enriched"] += 1
+            finally:
+                for _ in games:
+                    enrich_queue.task_done()
+
+    def _write_batch(self, batch):
+        """Commits one batch and returns the upsert counts. Runs in a worker thread."""
+        games = [game for game, _, _, _ in batch]
+        prices = [(game.title, game.platform, price) for game, price, _, _ in batch if price]
+        # Only prices fetched just now are new observations; cached ones are already recorded
+        observed = [(game.title, game.platform, price) for game, price, fetched, _ in batch if price and fetched]
+        # One commit per batch: the games, then their prices (and price history) and genres
+        with self.db.transaction():
+            counts = self.db.upsert_games(games)
+            self.db.update_prices(prices)
+            if self.price_tracker is not None:
+                self.price_tracker.history.record_prices(observed)
+            self.db.update_genres([(game.title, genre) for game, _, _, genre in batch if genre])
+        return counts
+
+    async def _flush(self, batch):
+        # The commit (and the DB events published after it) happens off the event loop
+        counts = await asyncio.to_thread(self._write_batch, batch)
+        for key in ("inserted", "updated", "unchanged"):
+            self.stats[key] += counts[key]
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        if self.stats["first_write_seconds"] is None:
+            self.stats["first_write_seconds"] = round(time.perf_counter() - self._started, 3)
+        self._progress()
+
+    async def _write(self, write_queue):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            item = await _get(write_queue, timeout)  # None: flush_interval passed with a partial batch
+            if item is _DONE:
+                if batch:
+                    await self._flush(batch)
+                return
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                await self._flush(batch)
+                batch = []
+                deadline = None
+
+    async def run(self):
+        """Runs one scrape -> enrich -> ingest cycle and returns its stats."""
+        self._started = time.perf_counter()
+        self.stats = {
+            "stores_done": 0, "stores_total": len(self.scraper.stores()),
+            "scraped": 0, "enriched": 0, "written": 0, "batches": 0,
+            "inserted": 0, "updated": 0, "unchanged": 0,
+            "first_write_seconds": None, "seconds": None,
+        }
+        enrich_queue = asyncio.Queue(self.queue_size)
+        write_queue = asyncio.Queue(self.queue_size)
+        writer = asyncio.ensure_future(self._write(write_queue))
+        workers = [asyncio.ensure_future(self._enrich(enrich_queue, write_queue)) for _ in range(self.workers)]
+        feeder = asyncio.ensure_future(self._feed(enrich_queue, write_queue))
+        tasks = workers + [feeder, writer]
+        try:
+            # Done once the writer has stored everything. Any stage that fails (the workers
+            # only ever stop by failing) fails the refresh, instead of leaving the queues
+            # undrained and the other stages waiting forever
+            pending = set(tasks)
+            while not writer.done():
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.stats["seconds"] = round(time.perf_counter() - self._started, 3)
+        self._progress()
+        return dict(self.stats)
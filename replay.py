@@ -0,0 +1,382 @@
+# replay.py
+"""
+Record/replay of store responses, so the scrapers and the dataset generator can run
+without the live sites:
+
+    python replay.py record            # scrape every store once, saving what they return
+    python replay.py list              # show the recorded responses
+    python replay.py serve --port 8765 # serve them from a local stand-in server
+
+In code, `with Replayer("replay_fixtures", "replay"):` makes every session handed out by
+shared_client, and every page rendered by shared_browser, answer from the fixtures.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from browser_pool import shared_browser
+from http_client import shared_client
+
+FIXTURE_DIR = "replay_fixtures"
+# Response headers kept with a fixture; enough for HttpCache and content decoding
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Expires")
+# Sent by HttpCache; stripped while recording so every fixture holds a full body
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+# Pages rendered by the browser pool are recorded apart from plain GETs of the same URL
+RENDER = "RENDER"
+_SECRET_PARAMS = re.compile(r"([?&](?:key|api_key|apikey|token|access_token)=)[^&]*", re.IGNORECASE)
+
+
+class FixtureMissing(aiohttp.ClientConnectionError):
+    """No recorded response for a request. Scrapers handle it like any connection failure."""
+
+
+def _full_url(url, params=None):
+    return str(URL(str(url)).update_query(params)) if params else str(url)
+
+
+class FixtureStore:
+    """
+    Recorded responses on disk: <directory>/<sha256 of "METHOD url">.json holds the
+    status, headers and encoding, and the matching .body file the raw body.
+    """
+
+    def __init__(self, directory=FIXTURE_DIR):
+        self.directory = directory
+
+    def _paths(self, method, url):
+        key = hashlib.sha256(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def save(self, method, url, status, headers, body, encoding=None):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path, body_path = self._paths(method, url)
+        with open(body_path, "wb") as f:
+            f.write(body)
+        meta = {
+            "method": method.upper(),
+            "url": _SECRET_PARAMS.sub(r"\1REDACTED", url),  # The key still matches the real URL
+            "status": status,
+            "headers": {name: headers[name] for name in KEPT_HEADERS if name in headers},
+            "encoding": encoding,
+            "recorded_at": time.time(),
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def load(self, method, url):
+        """Returns (meta, body) for a recorded request, or raises FixtureMissing."""
+        meta_path, body_path = self._paths(method, url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            raise FixtureMissing(f"No recorded response for {method.upper()} {url} in {self.directory}")
+        return meta, body
+
+    def entries(self):
+        """Metadata of every recorded response."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    entries.append(json.load(f))
+        return entries
+
+
+class ReplayResponse:
+    """The parts of aiohttp.ClientResponse the network modules use, over a recorded body."""
+
+    def __init__(self, method, url, status, headers, body, encoding=None):
+        self.method = method
+        self.url = URL(url)
+        self.status = status
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self._body = body
+        self._encoding = encoding
+
+    @property
+    def request_info(self):
+        return aiohttp.RequestInfo(self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url)
+
+    @property
+    def charset(self):
+        if self._encoding:
+            return self._encoding
+        match = re.search(r"charset=([\w-]+)", self.headers.get("Content-Type", ""))
+        return match.group(1) if match else None
+
+    async def read(self):
+        return self._body
+
+    async def text(self, encoding=None, errors="strict"):
+        return self._body.decode(encoding or self.charset or "utf-8", errors=errors)
+
+    async def json(self, content_type=None, **kwargs):
+        return json.loads(await self.text())
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(self.request_info, (), status=self.status, message="Replayed error status")
+
+    def release(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class _RequestContext:
+    """Lets session.get(...) be used with `async with`, as with aiohttp."""
+
+    def __init__(self, coro):
+        self._coro = coro
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._response = await self._coro
+        return self._response
+
+    async def __aexit__(self, *exc_info):
+        self._response.release()
+
+
+class ReplaySession:
+    """
+    Stand-in for the aiohttp.ClientSession shared_client hands out. In "replay" mode
+    requests are answered from the fixtures (directly, or through a ReplayServer when
+    the Replayer has a server_url); in "record" mode they go to the real site and the
+    responses are saved first.
+    """
+
+    def __init__(self, replayer, create_session):
+        self.replayer = replayer
+        self._create_session = create_session  # the real session, only made when needed
+        self._session = None
+        self.closed = False
+
+    def _real(self):
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    def get(self, url, **kwargs):
+        return _RequestContext(self._request("GET", url, **kwargs))
+
+    def post(self, url, **kwargs):
+        return _RequestContext(self._request("POST", url, **kwargs))
+
+    def request(self, method, url, **kwargs):
+        return _RequestContext(self._request(method, url, **kwargs))
+
+    async def _request(self, method, url, params=None, headers=None, **kwargs):
+        url = _full_url(url, params)
+        replayer = self.replayer
+        if replayer.mode == "record":
+            headers = {k: v for k, v in (headers or {}).items() if k not in CONDITIONAL_HEADERS}
+            async with self._real().request(method, url, headers=headers, **kwargs) as resp:
+                body = await resp.read()
+                replayer.store.save(method, url, resp.status, resp.headers, body, resp.charset)
+                return ReplayResponse(method, url, resp.status, resp.headers, body, resp.charset)
+
+        if replayer.latency:
+            await asyncio.sleep(replayer.latency)
+        if replayer.server_url:
+            forwarded = {**(headers or {}), "X-Replay-Method": method, "X-Replay-Url": url}
+            async with self._real().get(replayer.server_url, headers=forwarded) as resp:
+                if resp.status == 404 and "X-Replay-Missing" in resp.headers:
+                    raise FixtureMissing(await resp.text())
+                return ReplayResponse(method, url, resp.status, resp.headers, await resp.read(), resp.charset)
+        meta, body = replayer.store.load(method, url)
+        status, body = _conditional(meta, body, headers or {})
+        return ReplayResponse(method, url, status, meta["headers"], body, meta["encoding"])
+
+    async def close(self):
+        self.closed = True
+        if self._session is not None:
+            await self._session.close()
+
+
+def _conditional(meta, body, request_headers):
+    """A recorded 200 becomes a 304 when the request's validators match the fixture's."""
+    etag = meta["headers"].get("ETag")
+    last_modified = meta["headers"].get("Last-Modified")
+    if meta["status"] == 200 and (
+        (etag and request_headers.get("If-None-Match") == etag)
+        or (last_modified and request_headers.get("If-Modified-Since") == last_modified)
+    ):
+        return 304, b""
+    return meta["status"], body
+
+
+class Replayer:
+    """
+    Routes shared_client sessions and shared_browser renders through a FixtureStore
+    while installed (install()/uninstall(), or as a context manager).
+
+    mode is "record" (hit the real sites and save the responses) or "replay" (serve
+    saved responses; missing ones raise FixtureMissing). `latency` adds a delay per
+    replayed request; `server_url` sends replayed requests through a ReplayServer so
+    they go over real sockets.
+    """
+
+    def __init__(self, directory=FIXTURE_DIR, mode="replay", latency=0.0, server_url=None,
+                 client=shared_client, browser=shared_browser):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode!r}")
+        self.store = FixtureStore(directory)
+        self.mode = mode
+        self.latency = latency
+        self.server_url = server_url
+        self.client = client
+        self.browser = browser
+
+    def wrap_session(self, create_session):
+        return ReplaySession(self, create_session)
+
+    async def browser_content(self, url, render, *args):
+        """Rendered HTML of `url`: recorded from render(url, *args), or replayed."""
+        if self.mode == "record":
+            content = await render(url, *args)
+            self.store.save(RENDER, url, 200, {"Content-Type": "text/html; charset=utf-8"}, content.encode("utf-8"), "utf-8")
+            return content
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        _, body = self.store.load(RENDER, url)
+        return body.decode("utf-8")
+
+    def install(self):
+        self.client.replay = self
+        self.browser.replay = self
+        return self
+
+    def uninstall(self):
+        if self.client.replay is self:
+            self.client.replay = None
+        if self.browser.replay is self:
+            self.browser.replay = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+
+class ReplayServer:
+    """
+    Local stand-in server for the recorded responses. Clients send the original
+    request as X-Replay-Method/X-Replay-Url headers (ReplaySession does this when
+    the Replayer has a server_url); conditional requests get 304s.
+    """
+
+    def __init__(self, directory=FIXTURE_DIR, host="127.0.0.1", port=0):
+        self.store = FixtureStore(directory)
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        method = request.headers.get("X-Replay-Method", "GET")
+        url = request.headers.get("X-Replay-Url")
+        if not url:
+            return web.Response(status=400, text="X-Replay-Url header required")
+        try:
+            meta, body = self.store.load(method, url)
+        except FixtureMissing as e:
+            return web.Response(status=404, text=str(e), headers={"X-Replay-Missing": "1"})
+        status, body = _conditional(meta, body, request.headers)
+        headers = {name: value for name, value in meta["headers"].items() if name != "Content-Type"}
+        response = web.Response(status=status, body=body, headers=headers)
+        if status != 304 and "Content-Type" in meta["headers"]:
+            response.headers["Content-Type"] = meta["headers"]["Content-Type"]
+        return response
+
+    async def start(self):
+        """Starts serving and returns the server's URL."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_route("*", "/", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return f"http://{self.host}:{self.port}/"
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def record_stores(directory=FIXTURE_DIR, include_dataset=False):
+    """Scrapes every store once (and the dataset generator's pages if asked), saving the responses."""
+    import tempfile
+    from http_cache import HttpCache
+    from scraper import GameScraper
+
+    with Replayer(directory, "record"), tempfile.TemporaryDirectory() as cache_dir:
+        async with shared_client.cycle():
+            # An empty cache, so no page is skipped as still fresh
+            games = await GameScraper(http_cache=HttpCache(cache_dir)).scrape_all()
+            if include_dataset:
+                from generate_dataset import generate_dataset
+                await generate_dataset(os.path.join(cache_dir, "dataset.jsonl"))
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["record", "list", "serve"])
+    parser.add_argument("--dir", default=FIXTURE_DIR, help="Fixture directory")
+    parser.add_argument("--dataset", action="store_true", help="record: also record generate_dataset.py's pages")
+    parser.add_argument("--port", type=int, default=8765, help="serve: port to listen on")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        try:
+            games = asyncio.run(record_stores(args.dir, args.dataset))
+        finally:
+            shared_browser.close()
+        print(f"Recorded {len(FixtureStore(args.dir).entries())} responses ({len(games)} games) to {args.dir}")
+    elif args.command == "list":
+        for meta in FixtureStore(args.dir).entries():
+            print(f"{meta['status']} {meta['method']:<6} {meta['url']}")
+    else:
+        async def serve():
+            server = ReplayServer(args.dir, port=args.port)
+            print(f"Serving {args.dir} at {await server.start()} (Ctrl+C to stop)")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await server.close()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 # scraper.py
-import aiohttp
-from bs4 import BeautifulSoup
+import asyncio
+import time
+from http_client import shared_client
+from http_cache import HttpCache, shared_cache
+from browser_pool import shared_browser
+from html_parser import parse_html
 from pydantic import BaseModel
 from datetime import datetime
-from playwright.async_api import async_playwright # For Ubisoft
-from ai_module import AIModule
+from typing import NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:  # ai_module imports torch; only needed for type hints here
+    from ai_module import AIModule
 
 
 class FreeGame(BaseModel):
@@ -14,215 +20,336 @@ class FreeGame(BaseModel):
     end_date: datetime | None
 
 
+class StoreBudget(NamedTuple):
+    timeout: float  # Seconds before the store is abandoned for this run
+    max_results: int  # Games kept from the store per run
+
+
+# Page each store is scraped from
+STORE_URLS = {
+    "Epic": "https://store-site-backend-static-ipv4.ak.epicgames.com/freeGamesPromotions?locale=en-US&country=US&allowCountries=US",
+    "Amazon Prime": "https://gaming.amazon.com/home",
+    "GOG": "https://www.gog.com/en/games?priceRange=0,0&discounted=true", # Added discounted=true
+    "Ubisoft": "https://store.ubi.com/us/free-events",
+    "Itch.io": "https://itch.io/games/free",
+    "IndieGala": "https://freebies.indiegala.com/", # More specific URL
+    "Humble Bundle": "https://www.humblebundle.com/store/search?sort=discount&filter=price_free",
+}
+UBISOFT_PRODUCT_SELECTOR = ".product-slot__main-link, .game-product-card__link" # Example selectors
+
+
 class GameScraper:
-    def __init__(self, ai_module: AIModule = None):
+    # Ubisoft has to render in a browser, so it gets a longer budget than the plain HTTP stores.
+    DEFAULT_BUDGETS = {
+        "Epic": StoreBudget(timeout=20, max_results=100),
+        "Amazon Prime": StoreBudget(timeout=20, max_results=100),
+        "GOG": StoreBudget(timeout=20, max_results=200),
+        "Ubisoft": StoreBudget(timeout=75, max_results=50),
+        "Itch.io": StoreBudget(timeout=20, max_results=200),
+        "IndieGala": StoreBudget(timeout=20, max_results=100),
+        "Humble Bundle": StoreBudget(timeout=20, max_results=100),
+    }
+
+    def __init__(
+        self,
+        ai_module: "AIModule | None" = None,
+        store_budgets: dict[str, StoreBudget] | None = None,
+        http_cache: HttpCache | None = None,
+    ):
         self.ai = ai_module
+        # Conditional requests for the store pages; unchanged pages are not re-parsed
+        self.http_cache = http_cache or shared_cache
+        self.store_budgets = {**self.DEFAULT_BUDGETS, **(store_budgets or {})}
+        # Per-store outcome of the most recent scrape_all: {store: {"status", "seconds", "count"}}
+        self.last_run_stats: dict[str, dict] = {}
+
+    def stores(self):
+        """Maps each store name to the coroutine function that scrapes it."""
+        return {
+            "Epic": self.check_epic_games,
+            "Amazon Prime": self.check_amazon_prime,
+            "GOG": self.check_gog_games,
+            "Ubisoft": self.check_ubisoft_games,
+            "Itch.io": self.check_itch_io_games,
+            "IndieGala": self.check_indiegala_games,
+            "Humble Bundle": self.check_humble_bundle_games,
+        }
+
+    async def _fetch_parsed(self, url, parse, as_json=False):
+        """
+        GETs `url` through the HTTP cache and returns parse(body) as a list of FreeGame.
+        While the page is unchanged (still fresh, 304 Not Modified, or an identical
+        body) the games parsed from it last time are returned without parsing again.
+        """
+        async with shared_client.session() as session:
+            response = await self.http_cache.get(session, url)
+        if response.unchanged:
+            parsed = await asyncio.to_thread(self.http_cache.load_parsed, url)
+            if parsed is not None:
+                return [FreeGame(**game) for game in parsed]
+        games = parse(response.json() if as_json else response.text())
+        await asyncio.to_thread(self.http_cache.save_parsed, url, [game.model_dump(mode="json") for game in games])
+        return games
 
     async def check_epic_games(self):
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    "https://store-site-backend-static-ipv4.ak.epicgames.com/freeGamesPromotions?locale=en-US&country=US&allowCountries=US"
-                ) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-                    games_list = []
-                    for game_data in data.get("data", {}).get("Catalog", {}).get("searchStore", {}).get("elements", []):
-                        if game_data.get("price", {}).get("totalPrice", {}).get("discountPrice", -1) == 0:
-                            title = game_data.get("title")
-
-                            slug = None
-                            if "slug" in game_data and game_data["slug"]:
-                                slug = game_data["slug"]
-                            elif "productSlug" in game_data and game_data["productSlug"]:
-                                slug = game_data["productSlug"]
-                            elif "catalogNs" in game_data and game_data["catalogNs"].get("mappings"):
-                                mappings = game_data["catalogNs"]["mappings"]
-                                if mappings and len(mappings) > 0:
-                                    slug = mappings[0].get("pageSlug")
-
-                            if not title or not slug:
-                                print(f"Epic Games: Skipping game due to missing title or slug: {game_data.get('id', 'Unknown ID')}")
-                                continue
-
-                            url = f"https://store.epicgames.com/en-US/p/{slug}"
-
-                            end_date_obj = None
-                            try:
-                                promotions = game_data.get("promotions")
-                                if promotions:
-                                    promo_offers_wrapper = promotions.get("promotionalOffers")
-                                    if promo_offers_wrapper and len(promo_offers_wrapper) > 0:
-                                        first_promo_group = promo_offers_wrapper[0]
-                                        actual_offers = first_promo_group.get("promotionalOffers")
-                                        if actual_offers and len(actual_offers) > 0:
-                                            end_date_str = actual_offers[0].get("endDate")
-                                            if end_date_str:
-                                                end_date_obj = datetime.fromisoformat(end_date_str.replace("Z", "+00:00"))
-                            except (IndexError, TypeError, AttributeError, ValueError) as e:
-                                print(f"Epic Games: Error parsing end_date for {title}: {e}")
-
-                            games_list.append(FreeGame(title=title, platform="Epic", url=url, end_date=end_date_obj))
-                    return games_list
-            except Exception as e:
-                print(f"Error scraping Epic Games: {e}")
-                return []
+        try:
+            return await self._fetch_parsed(STORE_URLS["Epic"], self.parse_epic_games, as_json=True)
+        except Exception as e:
+            print(f"Error scraping Epic Games: {e}")
+            return []
+
+    @staticmethod
+    def parse_epic_games(data):
+        games_list = []
+        for game_data in data.get("data", {}).get("Catalog", {}).get("searchStore", {}).get("elements", []):
+            if game_data.get("price", {}).get("totalPrice", {}).get("discountPrice", -1) == 0:
+                title = game_data.get("title")
+
+                slug = None
+                if "slug" in game_data and game_data["slug"]:
+                    slug = game_data["slug"]
+                elif "productSlug" in game_data and game_data["productSlug"]:
+                    slug = game_data["productSlug"]
+                elif "catalogNs" in game_data and game_data["catalogNs"].get("mappings"):
+                    mappings = game_data["catalogNs"]["mappings"]
+                    if mappings and len(mappings) > 0:
+                        slug = mappings[0].get("pageSlug")
+
+                if not title or not slug:
+                    print(f"Epic Games: Skipping game due to missing title or slug: {game_data.get('id', 'Unknown ID')}")
+                    continue
+
+                url = f"https://store.epicgames.com/en-US/p/{slug}"
+
+                end_date_obj = None
+                try:
+                    promotions = game_data.get("promotions")
+                    if promotions:
+                        promo_offers_wrapper = promotions.get("promotionalOffers")
+                        if promo_offers_wrapper and len(promo_offers_wrapper) > 0:
+                            first_promo_group = promo_offers_wrapper[0]
+                            actual_offers = first_promo_group.get("promotionalOffers")
+                            if actual_offers and len(actual_offers) > 0:
+                                end_date_str = actual_offers[0].get("endDate")
+                                if end_date_str:
+                                    end_date_obj = datetime.fromisoformat(end_date_str.replace("Z", "+00:00"))
+                except (IndexError, TypeError, AttributeError, ValueError) as e:
+                    print(f"Epic Games: Error parsing end_date for {title}: {e}")
+
+                games_list.append(FreeGame(title=title, platform="Epic", url=url, end_date=end_date_obj))
+        return games_list
 
     async def check_amazon_prime(self):
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get("https://gaming.amazon.com/home") as resp:
-                    resp.raise_for_status() # Good practice to check for HTTP errors
-                    html = await resp.text()
-                    soup = BeautifulSoup(html, "html.parser")
-                    games = [
-                        FreeGame(title=div.find("h3").text.strip(), platform="Amazon Prime", url=div.find("a")["href"] if div.find("a") else "", end_date=None)
-                        for div in soup.select("div[data-a-target='offer-card']")
-                        if "Free with Prime" in div.text
-                    ]
-                    # The AI fallback for Amazon Prime is removed for now due to issues with the current AI module setup.
-                    # If you have a working AI parser for HTML, it could be re-added.
-                    return games
-            except Exception as e:
-                print(f"Error scraping Amazon Prime: {e}")
-                return []
+        try:
+            return await self._fetch_parsed(STORE_URLS["Amazon Prime"], self.parse_amazon_prime)
+        except Exception as e:
+            print(f"Error scraping Amazon Prime: {e}")
+            return []
 
+    @staticmethod
+    def parse_amazon_prime(html):
+        soup = parse_html(html, "div", attrs={"data-a-target": "offer-card"})
+        games = [
+            FreeGame(title=div.find("h3").text.strip(), platform="Amazon Prime", url=div.find("a")["href"] if div.find("a") else "", end_date=None)
+            for div in soup.select("div[data-a-target='offer-card']")
+            if "Free with Prime" in div.text
+        ]
+        # The AI fallback for Amazon Prime is removed for now due to issues with the current AI module setup.
+        # If you have a working AI parser for HTML, it could be re-added.
+        return games
 
     async def check_gog_games(self):
-        games_list = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://www.gog.com/en/games?priceRange=0,0&discounted=true") as resp: # Added discounted=true
-                    resp.raise_for_status()
-                    soup = BeautifulSoup(await resp.text(), "html.parser")
-                    for div in soup.select("product-tile"): # GOG uses custom elements
-                        # Check if it's actually free, GOG sometimes lists "free weekends" or demos here.
-                        # Looking for a clear "Free" indicator or $0.00 price.
-                        # This might need more specific selectors if GOG's layout changes.
-                        is_free_text = div.select_one("span[price-value='0.00']") # More specific
-                        if is_free_text or "free" in str(div.select_one(".product-state")).lower():
-                            title_tag = div.select_one("product-tile-title > span[translate]")
-                            title = title_tag.text.strip() if title_tag else None
-
-                            url_tag = div.select_one("a.product-tile__content")
-                            url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
-
-                            if title and url:
-                                games_list.append(FreeGame(title=title, platform="GOG", url=url, end_date=None))
+            return await self._fetch_parsed(STORE_URLS["GOG"], self.parse_gog_games)
         except Exception as e:
             print(f"Error scraping GOG: {e}")
+            return []
+
+    @staticmethod
+    def parse_gog_games(html):
+        games_list = []
+        soup = parse_html(html, "product-tile")
+        for div in soup.select("product-tile"): # GOG uses custom elements
+            # Check if it's actually free, GOG sometimes lists "free weekends" or demos here.
+            # Looking for a clear "Free" indicator or $0.00 price.
+            # This might need more specific selectors if GOG's layout changes.
+            is_free_text = div.select_one("span[price-value='0.00']") # More specific
+            if is_free_text or "free" in str(div.select_one(".product-state")).lower():
+                title_tag = div.select_one("product-tile-title > span[translate]")
+                title = title_tag.text.strip() if title_tag else None
+
+                url_tag = div.select_one("a.product-tile__content")
+                url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
+
+                if title and url:
+                    games_list.append(FreeGame(title=title, platform="GOG", url=url, end_date=None))
         return games_list
 
     async def check_ubisoft_games(self):
         games_list = []
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                await page.goto("https://store.ubi.com/us/free-events", timeout=60000) # Free events page
-                await page.wait_for_load_state("networkidle", timeout=30000)
-                content = await page.content()
-                await browser.close()
-
-                soup = BeautifulSoup(content, "html.parser")
-                # Ubisoft selectors can be tricky and change often.
-                # This is a guess based on common patterns.
-                for item in soup.select(".product-slot__main-link, .game-product-card__link"): # Example selectors
-                    title_tag = item.select_one(".game-title, .prod-title")
-                    title = title_tag.text.strip() if title_tag else None
-
-                    url = item.get("href", "")
-                    if not url.startswith("http"):
-                        url = f"https://store.ubi.com{url}"
-
-                    # Check for "free" text explicitly, as this page might list trials
-                    if title and url and ("free" in item.text.lower() or "play for free" in item.text.lower()):
-                         # Ubisoft free games are often timed events, end_date might be hard to scrape reliably
-                        games_list.append(FreeGame(title=title, platform="Ubisoft", url=url, end_date=None))
+            # Rendered by the shared warm browser instead of launching Chromium per run
+            content = await shared_browser.get_content(
+                STORE_URLS["Ubisoft"], wait_for_selector=UBISOFT_PRODUCT_SELECTOR, timeout=30
+            )
+            games_list = self.parse_ubisoft_games(content)
         except Exception as e:
             print(f"Error scraping Ubisoft: {e}")
         return games_list
 
-    async def check_itch_io_games(self):
+    @staticmethod
+    def parse_ubisoft_games(html):
         games_list = []
+        soup = parse_html(html, class_=["product-slot__main-link", "game-product-card__link"])
+        # Ubisoft selectors can be tricky and change often.
+        # This is a guess based on common patterns.
+        for item in soup.select(UBISOFT_PRODUCT_SELECTOR):
+            title_tag = item.select_one(".game-title, .prod-title")
+            title = title_tag.text.strip() if title_tag else None
+
+            url = item.get("href", "")
+            if not url.startswith("http"):
+                url = f"https://store.ubi.com{url}"
+
+            # Check for "free" text explicitly, as this page might list trials
+            if title and url and ("free" in item.text.lower() or "play for free" in item.text.lower()):
+                 # Ubisoft free games are often timed events, end_date might be hard to scrape reliably
+                games_list.append(FreeGame(title=title, platform="Ubisoft", url=url, end_date=None))
+        return games_list
+
+    async def check_itch_io_games(self):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://itch.io/games/free") as resp:
-                    resp.raise_for_status()
-                    soup = BeautifulSoup(await resp.text(), "html.parser")
-                    for div in soup.select("div.game_cell"):
-                        price_tag = div.select_one(".price_value")
-                        if price_tag and price_tag.text.strip().lower() in ["free", "$0.00", "download"]:
-                            title_tag = div.select_one("a.title.game_link, .game_title a")
-                            title = title_tag.text.strip() if title_tag else None
-
-                            url_tag = div.select_one("a.title.game_link, .game_title a")
-                            url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
-                            if url and not url.startswith("http"):
-                                url = f"https://itch.io{url}"
-
-                            if title and url:
-                                games_list.append(FreeGame(title=title, platform="Itch.io", url=url, end_date=None))
+            return await self._fetch_parsed(STORE_URLS["Itch.io"], self.parse_itch_io_games)
         except Exception as e:
             print(f"Error scraping Itch.io: {e}")
+            return []
+
+    @staticmethod
+    def parse_itch_io_games(html):
+        games_list = []
+        soup = parse_html(html, "div", class_="game_cell")
+        for div in soup.select("div.game_cell"):
+            price_tag = div.select_one(".price_value")
+            if price_tag and price_tag.text.strip().lower() in ["free", "$0.00", "download"]:
+                title_tag = div.select_one("a.title.game_link, .game_title a")
+                title = title_tag.text.strip() if title_tag else None
+
+                url_tag = div.select_one("a.title.game_link, .game_title a")
+                url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
+                if url and not url.startswith("http"):
+                    url = f"https://itch.io{url}"
+
+                if title and url:
+                    games_list.append(FreeGame(title=title, platform="Itch.io", url=url, end_date=None))
         return games_list
 
     async def check_indiegala_games(self):
-        games_list = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://freebies.indiegala.com/") as resp: # More specific URL
-                    resp.raise_for_status()
-                    soup = BeautifulSoup(await resp.text(), "html.parser")
-                    for div in soup.select("div.product-row-info"): # Selector from their freebies page
-                        title_tag = div.select_one("h3.product-title-big a, .article-title-medium a")
-                        title = title_tag.text.strip() if title_tag else None
-
-                        url_tag = div.select_one("h3.product-title-big a, .article-title-medium a")
-                        url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
-
-                        # Check for "free" text or $0 price if available
-                        if title and url and "free" in div.text.lower(): # Simple check
-                            games_list.append(FreeGame(title=title, platform="IndieGala", url=url, end_date=None))
+            return await self._fetch_parsed(STORE_URLS["IndieGala"], self.parse_indiegala_games)
         except Exception as e:
             print(f"Error scraping IndieGala: {e}")
+            return []
+
+    @staticmethod
+    def parse_indiegala_games(html):
+        games_list = []
+        soup = parse_html(html, "div", class_="product-row-info")
+        for div in soup.select("div.product-row-info"): # Selector from their freebies page
+            title_tag = div.select_one("h3.product-title-big a, .article-title-medium a")
+            title = title_tag.text.strip() if title_tag else None
+
+            url_tag = div.select_one("h3.product-title-big a, .article-title-medium a")
+            url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
+
+            # Check for "free" text or $0 price if available
+            if title and url and "free" in div.text.lower(): # Simple check
+                games_list.append(FreeGame(title=title, platform="IndieGala", url=url, end_date=None))
         return games_list
 
     async def check_humble_bundle_games(self):
-        games_list = []
         # Humble Bundle free games are rare and often part of specific promotions.
         # A dedicated "free games" page might not always have items.
         # This is a placeholder and might need adjustment based on current Humble layout.
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://www.humblebundle.com/store/search?sort=discount&filter=price_free") as resp:
-                    resp.raise_for_status()
-                    soup = BeautifulSoup(await resp.text(), "html.parser")
-                    for item in soup.select(".entity-details"): # Generic selector, needs verification
-                        title_tag = item.select_one(".entity-title")
-                        title = title_tag.text.strip() if title_tag else None
-
-                        # URL might be on a parent element or a specific link
-                        url_tag = item.find_parent("a")
-                        url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
-                        if url and not url.startswith("http"):
-                            url = f"https://www.humblebundle.com{url}"
-
-                        if title and url: # Assuming items on this page are indeed free
-                            games_list.append(FreeGame(title=title, platform="Humble Bundle", url=url, end_date=None))
+            return await self._fetch_parsed(STORE_URLS["Humble Bundle"], self.parse_humble_bundle_games)
         except Exception as e:
             print(f"Error scraping Humble Bundle: {e}")
+            return []
+
+    @staticmethod
+    def parse_humble_bundle_games(html):
+        games_list = []
+        soup = parse_html(html, "a")  # find_parent("a") below needs the enclosing links
+        for item in soup.select(".entity-details"): # Generic selector, needs verification
+            title_tag = item.select_one(".entity-title")
+            title = title_tag.text.strip() if title_tag else None
+
+            # URL might be on a parent element or a specific link
+            url_tag = item.find_parent("a")
+            url = url_tag['href'] if url_tag and url_tag.has_attr('href') else None
+            if url and not url.startswith("http"):
+                url = f"https://www.humblebundle.com{url}"
+
+            if title and url: # Assuming items on this page are indeed free
+                games_list.append(FreeGame(title=title, platform="Humble Bundle", url=url, end_date=None))
         return games_list
 
+    async def _run_store(self, store, check):
+        """Runs one store scraper inside its budget. Never raises; failures yield []."""
+        budget = self.store_budgets.get(store, StoreBudget(timeout=30, max_results=100))
+        start = time.perf_counter()
+        status = "ok"
+        games = []
+        try:
+            games = await asyncio.wait_for(check(), timeout=budget.timeout)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            print(f"{store}: gave up after {budget.timeout}s, continuing with the other stores.")
+        except Exception as e:
+            status = "error"
+            print(f"Error scraping {store}: {e}")
+        games = games or []
+        if len(games) > budget.max_results:
+            status = "truncated"
+            games = games[:budget.max_results]
+        self.last_run_stats[store] = {
+            "status": status,
+            "seconds": round(time.perf_counter() - start, 3),
+            "count": len(games),
+        }
+        return games
+
+    async def scrape_stream(self):
+        """
+        Scrapes every store concurrently and yields (store, games) as each one finishes,
+        fastest first, so callers can process results before the slowest store is done.
+        Timings per store are left in self.last_run_stats.
+        """
+        self.last_run_stats = {}
+
+        async def run(store, check):
+            return store, await self._run_store(store, check)
+
+        tasks = [asyncio.ensure_future(run(store, check)) for store, check in self.stores().items()]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:  # The caller stopped early
+                task.cancel()
+
     async def scrape_all(self):
-        all_games = []
-        all_games.extend(await self.check_epic_games())
-        all_games.extend(await self.check_amazon_prime())
-        all_games.extend(await self.check_gog_games())
-        all_games.extend(await self.check_ubisoft_games())
-        all_games.extend(await self.check_itch_io_games())
-        all_games.extend(await self.check_indiegala_games())
-        all_games.extend(await self.check_humble_bundle_games())
+        """
+        Scrapes every store concurrently. A store that errors or runs past its
+        timeout contributes nothing, but the results of the others are still returned.
+        Timings per store are left in self.last_run_stats.
+        """
+        all_games = [game async for _, games in self.scrape_stream() for game in games]
+        summary = ", ".join(
+            f"{store} {stats['count']} in {stats['seconds']:.1f}s ({stats['status']})"
+            for store, stats in self.last_run_stats.items()
+        )
+        print(f"Scrape finished: {summary}")
         # Note: Steam free promotional games are harder to scrape directly from a single page.
         # They are often announced on news sites or specific product pages.
         # For now, Steam is omitted from this general storefront scrape.
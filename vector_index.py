@@ -0,0 +1,253 @@
+# vector_index.py
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+def normalize(vectors):
+    """Returns the rows of `vectors` scaled to unit length as float32 (all-zero rows stay zero)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _top_k(scores, k):
+    """Column indices and values of the k largest entries in each row of `scores`, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64), np.zeros((scores.shape[0], 0), dtype=scores.dtype)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+class VectorIndex(ABC):
+    """
+    Cosine-similarity index over vectors keyed by arbitrary hashable ids.
+
+    Vectors are normalised on insert, so inner products are cosine similarities.
+    Inserts and removals are incremental: removed rows are only flagged dead and the
+    storage is compacted once most of it is dead. Subclasses implement _search_rows().
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0  # rows of _vectors in use, live or dead
+        self._ids = []  # row -> id
+        self._rows = {}  # id -> row, live entries only
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, id_):
+        return id_ in self._rows
+
+    def ids(self):
+        return list(self._rows)
+
+    def _reserve(self, size):
+        if size <= len(self._vectors):
+            return
+        capacity = max(size, 2 * len(self._vectors), 64)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._vectors, self._live = vectors, live
+
+    def add(self, ids, vectors):
+        """Inserts `vectors` (n, dim) under `ids`; an id already present is replaced."""
+        ids = list(ids)
+        vectors = normalize(vectors) if ids else np.zeros((0, self.dim), dtype=np.float32)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dim}, got shape {vectors.shape}")
+        self.remove([id_ for id_ in ids if id_ in self._rows])
+        start = self._size
+        self._reserve(start + len(ids))
+        self._vectors[start:start + len(ids)] = vectors
+        self._live[start:start + len(ids)] = True
+        for offset, id_ in enumerate(ids):
+            self._rows[id_] = start + offset
+            self._ids.append(id_)
+        self._size += len(ids)
+        self._on_add(np.arange(start, self._size))
+
+    def remove(self, ids):
+        for id_ in ids:
+            row = self._rows.pop(id_, None)
+            if row is not None:
+                self._live[row] = False
+        dead = self._size - len(self._rows)
+        if dead > 1024 and dead > len(self._rows):
+            self._compact()
+
+    def _compact(self):
+        rows = np.array(sorted(self._rows.values()), dtype=np.int64)
+        self._vectors = self._vectors[rows].copy()
+        self._live = np.ones(len(rows), dtype=bool)
+        self._ids = [self._ids[row] for row in rows]
+        self._rows = {id_: row for row, id_ in enumerate(self._ids)}
+        self._size = len(rows)
+        self._on_compact()
+
+    def search(self, queries, k):
+        """
+        Returns, for each row of `queries`, up to k (id, cosine similarity) pairs, best first.
+        """
+        queries = normalize(queries)
+        if not self._rows or k <= 0:
+            return [[] for _ in range(len(queries))]
+        return [
+            [(self._ids[row], float(score)) for row, score in zip(rows, scores)]
+            for rows, scores in self._search_rows(queries, k)
+        ]
+
+    def _on_add(self, rows):
+        pass
+
+    def _on_compact(self):
+        pass
+
+    @abstractmethod
+    def _search_rows(self, queries, k):
+        """Returns one (rows, scores) pair of arrays per query, best first, live rows only."""
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force search: one matrix product against every stored vector."""
+
+    def _search_rows(self, queries, k):
+        scores = queries @ self._vectors[:self._size].T
+        scores[:, ~self._live[:self._size]] = -np.inf
+        rows, top_scores = _top_k(scores, min(k, len(self)))
+        return list(zip(rows, top_scores))
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are clustered with spherical k-means and a query only
+    scores the vectors of its `nprobe` nearest clusters. Recall rises with nprobe.
+
+    Until `min_train_size` vectors are stored the index searches exhaustively. Vectors
+    added after training join their nearest existing cluster; the clusters are
+    recomputed on the next search once the index has grown `retrain_growth` times.
+    """
+
+    def __init__(self, dim, n_lists=None, nprobe=8, min_train_size=1024, retrain_growth=4, seed=0):
+        super().__init__(dim)
+        self.n_lists = n_lists  # None: about sqrt(number of vectors)
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.retrain_growth = retrain_growth
+        self._rng = np.random.default_rng(seed)
+        self._centroids = None
+        self._trained_size = 0
+        self._lists = []  # cluster -> list of rows
+        self._list_arrays = None  # cluster -> np.ndarray of rows, rebuilt after inserts
+
+    def _assign(self, vectors, chunk=4096):
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            assignments[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ self._centroids.T, axis=1)
+        return assignments
+
+    def train(self, iterations=10):
+        """(Re)clusters the stored vectors. Called automatically by search()."""
+        rows = np.flatnonzero(self._live[:self._size])
+        n_lists = max(1, min(self.n_lists or int(np.sqrt(len(rows))), len(rows)))
+        sample = rows if len(rows) <= 256 * n_lists else self._rng.choice(rows, 256 * n_lists, replace=False)
+        data = self._vectors[sample]
+        centroids = data[self._rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            self._centroids = centroids
+            assignments = self._assign(data)
+            sums = np.zeros_like(centroids)
+            for start in range(0, len(data), 4096):
+                # Per-cluster sums as a one-hot matrix product, a chunk at a time
+                chunk = assignments[start:start + 4096]
+                one_hot = np.zeros((len(chunk), n_lists), dtype=np.float32)
+                one_hot[np.arange(len(chunk)), chunk] = 1
+                sums += one_hot.T @ data[start:start + 4096]
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            # Reseed empty clusters with random vectors so every list stays useful
+            sums[empty] = data[self._rng.choice(len(data), int(empty.sum()))]
+            centroids = normalize(sums)
+        self._centroids = centroids
+        self._lists = [[] for _ in range(n_lists)]
+        for row, cluster in zip(rows, self._assign(self._vectors[rows])):
+            self._lists[cluster].append(row)
+        self._list_arrays = None
+        self._trained_size = len(rows)
+
+    def _on_add(self, rows):
+        if self._centroids is None:
+            return
+        for row, cluster in zip(rows, self._assign(self._vectors[rows])):
+            self._lists[cluster].append(row)
+        self._list_arrays = None
+
+    def _on_compact(self):
+        # Row numbers changed; cluster again on the next search
+        self._centroids = None
+        self._lists = []
+        self._list_arrays = None
+
+    def _search_rows(self, queries, k):
+        if self._centroids is None and len(self) >= self.min_train_size:
+            self.train()
+        elif self._centroids is not None and len(self) > self.retrain_growth * self._trained_size:
+            self.train()
+        if self._centroids is None:
+            return ExactIndex._search_rows(self, queries, k)
+
+        if self._list_arrays is None:
+            self._list_arrays = [np.array(rows, dtype=np.int64) for rows in self._lists]
+        probed, _ = _top_k(queries @ self._centroids.T, self.nprobe)
+        results = []
+        for query, clusters in zip(queries, probed):
+            rows = np.concatenate([self._list_arrays[cluster] for cluster in clusters])
+            rows = rows[self._live[rows]]
+            top, scores = _top_k((self._vectors[rows] @ query)[None, :], k)
+            results.append((rows[top[0]], scores[0]))
+        return results
+
+
+INDEX_BACKENDS = {"exact": ExactIndex, "ivf": IVFIndex}
+
+
+def create_index(backend, dim, **options):
+    """Builds an empty index; `backend` is a key of INDEX_BACKENDS."""
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown vector index backend {backend!r}; expected one of {sorted(INDEX_BACKENDS)}")
+    return INDEX_BACKENDS[backend](dim, **options)
+
+
+def rank_by_mean_similarity(index, owned_vectors, k, per_owned_k=None):
+    """
+    Returns the k indexed ids with the highest mean cosine similarity to
+    `owned_vectors`, as (id, score) pairs, best first.
+
+    By default the owned vectors are normalised and averaged into a single query:
+    the mean of cos(a, o_j) over j equals a . mean(o_j / |o_j|), so this ranks exactly
+    like the full active x owned similarity matrix at the cost of one search.
+    With per_owned_k, every owned game instead retrieves its own per_owned_k nearest
+    candidates and each candidate scores the sum of the similarities it received,
+    divided by the number of owned games.
+    """
+    owned = normalize(owned_vectors)
+    if per_owned_k is None:
+        centroid = owned.mean(axis=0)
+        scale = float(np.linalg.norm(centroid))
+        if scale == 0:
+            return []
+        return [(id_, score * scale) for id_, score in index.search(centroid[None, :], k)[0]]
+
+    totals = {}
+    for hits in index.search(owned, per_owned_k):
+        for id_, score in hits:
+            totals[id_] = totals.get(id_, 0.0) + score
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(id_, total / len(owned)) for id_, total in ranked]
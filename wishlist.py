@@ -1,5 +1,5 @@
 # wishlist.py
-import aiohttp
+from http_client import shared_client
 from db_manager import DBManager
 from notifications import Notifications
 
@@ -10,7 +10,7 @@ class Wishlist:
         self.notifications = notifications
 
     async def check_steam_wishlist(self, steam_id, api_key):
-        async with aiohttp.ClientSession() as session:
+        async with shared_client.session() as session:
             async with session.get(
                 f"https://store.steampowered.com/wishlist/profiles/{steam_id}/wishlistdata/"
             ) as resp: